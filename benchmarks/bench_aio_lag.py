@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Event loop lag while rendering many drafts with `letrista.aio`.
+
+A ticker coroutine sleeps 1 ms at a time and records how late it wakes up,
+while hundreds of drafts are rendered concurrently.
+
+Run it from the root of the repository:
+
+    PYTHONPATH=. python benchmarks/bench_aio_lag.py [DRAFTS] [LINES]
+"""
+
+import asyncio
+import sys
+import time
+
+from letrista import aio
+
+
+def draft_text(lines):
+    """Builds a draft with verses of eight lines."""
+
+    text = []
+    for number in range(lines // 9):
+        text.append('[Verse]')
+        text.extend(['A 08 Verse %d line with^B inner rhyme -- note' % number] * 8)
+
+    return '\n'.join(text)
+
+
+async def measure_lag(lags, done):
+    """Records how late each 1 ms sleep wakes up."""
+
+    while not done.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+
+async def main(drafts, lines):
+    text = draft_text(lines)
+    lags = []
+    done = asyncio.Event()
+
+    ticker = asyncio.ensure_future(measure_lag(lags, done))
+    start = time.perf_counter()
+    await asyncio.gather(*[aio.render_text(text) for _ in range(drafts)])
+    elapsed = time.perf_counter() - start
+    done.set()
+    await ticker
+
+    lags.sort()
+    print('drafts:        %d x %d lines' % (drafts, lines))
+    print('elapsed:       %.2f s' % elapsed)
+    print('lag p50:       %.2f ms' % (lags[len(lags) // 2] * 1000))
+    print('lag p99:       %.2f ms' % (lags[int(len(lags) * 0.99)] * 1000))
+    print('lag max:       %.2f ms' % (lags[-1] * 1000))
+
+
+if __name__ == '__main__':
+    drafts = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 900
+    asyncio.run(main(drafts, lines))
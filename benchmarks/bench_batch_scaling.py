@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Scaling of `batch.render_many` with the number of workers.
+
+Writes a catalog of synthetic drafts to a temporary directory, and renders
+it with 1, 2, 4... workers, up to the number of CPUs.
+
+Run it from the root of the repository:
+
+    PYTHONPATH=. python benchmarks/bench_batch_scaling.py [DRAFTS]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from letrista import batch
+
+
+def draft_text(number):
+    """Builds a song with a title, verses, choruses and repeats."""
+
+    lines = ['[Title]', 'Song number %d' % number]
+    for verse in range(6):
+        lines.append('[Verse]')
+        for line in range(8):
+            lines.append('A 08 Verse %d line %d with^B inner rhyme -- note' % (verse, line))
+        lines.append('[Chorus]' if verse == 0 else '[ChorusR]')
+        lines.append('B This is the chorus')
+    lines.append('*****')
+    lines.extend(['Scratch notes'] * 50)
+
+    return '\n'.join(lines)
+
+
+def main():
+    drafts = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = []
+        for number in range(drafts):
+            path = os.path.join(directory, 'draft%05d.e37' % number)
+            with open(path, 'w') as f:
+                f.write(draft_text(number))
+            paths.append(path)
+
+        workers = 1
+        baseline = None
+        print('%8s %10s %12s %8s' % ('workers', 'time (s)', 'drafts/s', 'speedup'))
+        while workers <= (os.cpu_count() or 1):
+            start = time.perf_counter()
+            results = batch.render_many(paths, workers = workers)
+            elapsed = time.perf_counter() - start
+
+            assert all(result.error is None for result in results)
+            if baseline is None:
+                baseline = elapsed
+
+            print('%8d %10.3f %12.1f %7.2fx' % (workers, elapsed, drafts / elapsed, baseline / elapsed))
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main()
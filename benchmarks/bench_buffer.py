@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Appends and edits on the chunked text of a draft.
+
+Two workloads:
+
+  - appends: `Draft.add_text` with one line at a time, from 25k up to 100k
+    lines. With the text kept in chunks, the time per append stays the same
+    as the draft grows (instead of copying the whole text every time).
+  - edits: random `Draft.apply_edit` calls (replacing, inserting and
+    removing lines) on a draft of about 50 MB, before and after reading the
+    full text once (which is joined only on request).
+
+Run it from the root of the repository:
+
+    PYTHONPATH=. python benchmarks/bench_buffer.py
+"""
+
+import random
+import time
+
+from letrista.draft import Draft
+
+
+LINE = 'A 08 This is a line of the verse, with^A some markup -- comment\n'
+
+
+def bench_appends():
+    print('%10s %12s %14s' % ('appends', 'total (s)', 'per append (us)'))
+
+    for count in (25000, 50000, 100000):
+        draft = Draft()
+
+        start = time.perf_counter()
+        for _ in range(count):
+            draft.add_text(LINE)
+        elapsed = time.perf_counter() - start
+
+        assert draft.draft_line_count == count
+        print('%10d %12.3f %14.2f' % (count, elapsed, elapsed / count * 1e6))
+
+
+def bench_edits(size = 50 * 1024 * 1024, edits = 2000):
+    draft = Draft(LINE * (size // len(LINE)))
+    line_count = draft.draft_line_count
+    rng = random.Random(37)
+
+    print('\n%d lines (%.1f MB), %d random edits' % (line_count, size / 1024 / 1024, edits))
+
+    start = time.perf_counter()
+    for _ in range(edits):
+        row = rng.randrange(line_count)
+        action = rng.randrange(3)
+        if action == 0:
+            draft.apply_edit(row, row + 1, 'B An edited line\n')
+        elif action == 1:
+            draft.apply_edit(row, row, 'C An inserted line\nD And another one\n')
+        else:
+            draft.apply_edit(row, row + 2, '')
+        line_count = draft.draft_line_count
+    elapsed = time.perf_counter() - start
+
+    print('%-28s %10.3f s %10.2f us/edit' % ('edits', elapsed, elapsed / edits * 1e6))
+
+    start = time.perf_counter()
+    text = draft._draft_lyrics
+    elapsed = time.perf_counter() - start
+
+    print('%-28s %10.3f s (%d characters)' % ('joining the full text', elapsed, len(text)))
+
+
+def main():
+    bench_appends()
+    bench_edits()
+
+
+if __name__ == '__main__':
+    main()
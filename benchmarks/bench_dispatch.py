@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Benchmark of the dispatch of instructions with many languages.
+
+Registers synthetic language packs (each one with an identifier for every
+section type) on top of the built-in ones, and times how long it takes to
+find the type of a set of instructions, without the cache of parsed
+instructions. The time should not grow with the number of languages.
+
+Run it from the root of the repository:
+
+    PYTHONPATH=. python benchmarks/bench_dispatch.py
+"""
+
+import timeit
+
+from letrista.section_registry import create_default_registry
+
+INSTRUCTIONS = ('[Chorus]', '[Verse 2R]', '[Pre-coro]', '[Outro]', '[Unknown]', '[Puente]')
+
+# Types of section with identifiers in the synthetic packs.
+registry_types = create_default_registry().types
+
+
+def language_pack(number):
+    """Creates the loader of a synthetic language pack."""
+
+    def load():
+        return dict((section_type, (section_type[:3] + 'lang%d' % number,)) for section_type in registry_types)
+
+    return load
+
+
+def main():
+    print('%10s %14s' % ('languages', 'time (us)'))
+
+    for language_count in (0, 5, 10, 20, 40):
+        registry = create_default_registry()
+        for number in range(language_count):
+            registry.register_language('lang%d' % number, language_pack(number))
+
+        number = 20000
+        elapsed = timeit.timeit(lambda: [registry.find_type(text) for text in INSTRUCTIONS], number=number)
+
+        print('%10d %14.3f' % (language_count + 2, elapsed / (number * len(INSTRUCTIONS)) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Memory used per line by `Draft.lines` and by the `LineTable`.
+
+Both are measured with `tracemalloc`, from the text of the draft: the
+`LineTable` is built and every line classified within the measure, and so
+is the `Draft` whose `lines` are created. The text itself is built before,
+so it is not counted (but the chunks the table keeps of it are).
+
+Then, the peak memory of indexing and classifying a (brainstorming) draft
+of about 10 MB is checked to stay close to the size of its text.
+
+Run it from the root of the repository:
+
+    PYTHONPATH=. python benchmarks/bench_line_table_memory.py
+"""
+
+import tracemalloc
+
+from letrista.draft import Draft
+from letrista.line_table import LineTable
+
+# Size of the large (brainstorming) draft, in characters.
+LARGE_DRAFT_SIZE = 10 * 1024 * 1024
+
+# Highest peak memory allowed for the large draft, as times its size: the
+# table keeps a copy of the text in chunks, along with the offsets and type
+# of each line.
+PEAK_RATIO_LIMIT = 2.0
+
+
+def build_text(verses):
+    """Builds the text of a draft with the given number of 8-line verses."""
+
+    lines = []
+    for number in range(verses):
+        lines.append('[Verse]')
+        for _ in range(3):
+            lines.append('A 08 This is a line of the verse %d' % number)
+            lines.append('B This line^B has some markup -- and a comment')
+        lines.append('')
+
+    return '\n'.join(lines) + '\n'
+
+
+def measure(build):
+    """Returns the result of `build`, the bytes it allocated (and still
+    alive) and the peak of the bytes allocated while it ran."""
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+    return result, size, peak
+
+
+def build_lines(text):
+    lines = Draft(text).lines
+    for line in lines:
+        line.type
+
+    return lines
+
+
+def build_table(text):
+    table = LineTable(text)
+    for index in range(len(table)):
+        table.type(index)
+
+    return table
+
+
+def main():
+    text = build_text(5000)
+    line_count = len(LineTable(text))
+
+    lines, lines_size, _ = measure(lambda: build_lines(text))
+    del lines
+    table, table_size, _ = measure(lambda: build_table(text))
+    del table
+
+    print('lines in draft:    %d' % line_count)
+    print('Draft.lines:       %8.1f bytes/line' % (lines_size / line_count))
+    print('LineTable:         %8.1f bytes/line' % (table_size / line_count))
+
+    text = build_text(LARGE_DRAFT_SIZE // len(build_text(1)))
+
+    _, _, peak = measure(lambda: build_table(text))
+
+    print('\n%.1f MB draft' % (len(text) / 1024 / 1024))
+    print('LineTable peak:    %8.2f times the text' % (peak / len(text)))
+
+    assert peak <= PEAK_RATIO_LIMIT * len(text), 'LineTable peak memory too high'
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Micro-benchmark of the text extraction of a line.
+
+Compares the fused `extractor.extract_text` with the original three-pass
+processing (prefix, inline comment, and the character by character removal
+of the hats), for lines from 40 characters up to 100 KB.
+
+Run it from the root of the repository:
+
+    PYTHONPATH=. python benchmarks/bench_line_text.py
+"""
+
+import timeit
+
+from letrista import extractor
+from letrista.line import Line
+
+
+def original_text(text, line_type):
+    """The processing `Line.text` did before the fused extractor."""
+
+    text = text.strip()
+    if line_type == Line.TYPE_COUNT:
+        text = text[5:]
+    elif line_type == Line.TYPE_SCHEMA:
+        text = text[2:]
+
+    comment_pos = text.find('--')
+    if comment_pos > -1:
+        text = text[:comment_pos].strip()
+
+    new_string = ''
+    hat_flag = False
+    for i in range(len(text)):
+        if text[i] == '^':
+            hat_flag = True
+        elif hat_flag is True:
+            if text[i].isupper():
+                hat_flag = False
+            elif text[i].isdigit():
+                hat_flag = True
+            else:
+                new_string += text[i]
+        else:
+            new_string += text[i]
+
+    return new_string
+
+
+def build_line(size, with_markers):
+    """Builds a TYPE_COUNT line of (about) the given size."""
+
+    word = 'rhyme^A ' if with_markers else 'rhyme '
+    body = (word * (size // len(word) + 1))[:size - 5]
+
+    return 'A 08 ' + body
+
+
+def main():
+    print('%10s %8s %14s %14s %8s' % ('size', 'markers', 'original (s)', 'fused (s)', 'gain'))
+
+    for size in (40, 400, 4000, 40000, 100000):
+        for with_markers in (False, True):
+            text = build_line(size, with_markers)
+            assert original_text(text, Line.TYPE_COUNT) == extractor.extract_text(text, Line.TYPE_COUNT)
+
+            number = max(1, 200000 // size)
+            before = timeit.timeit(lambda: original_text(text, Line.TYPE_COUNT), number=number)
+            after = timeit.timeit(lambda: extractor.extract_text(text, Line.TYPE_COUNT), number=number)
+
+            print('%10d %8s %14.6f %14.6f %7.1fx' % (size, with_markers, before, after, before / after))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Benchmark of drafts with hundreds of repeated sections.
+
+Each draft has a few choruses with lyrics, and then the given number of
+repeat instructions pointing at them: either at sections defined before the
+repeat (`[Chorus2R]` after the second chorus) or at sections defined later
+(the repeats come first, resolved once the whole draft is processed).
+
+Reports the time to process the draft and render its text, the time to
+render it again after editing one of the repeated choruses, and the number
+of `Line` objects held by the sections (the repeats share the lines of the
+choruses, so it does not grow with the number of repeats).
+
+Run it from the root of the repository:
+
+    PYTHONPATH=. python benchmarks/bench_repeats.py
+"""
+
+import timeit
+
+from letrista.draft import Draft
+
+# Choruses to be repeated, and lines in each of them.
+CHORUS_COUNT = 4
+CHORUS_LINES = 8
+
+
+def chorus_text(number):
+    """Builds the text of a chorus (its instruction included)."""
+
+    lines = ['[Chorus]']
+    for index in range(CHORUS_LINES):
+        lines.append('A 07 Chorus %d line %d with a rhyme^B here' % (number, index))
+
+    return '\n'.join(lines) + '\n\n'
+
+
+def draft_text(repeat_count, forward):
+    """Builds a draft with the choruses and the repeats pointing at them."""
+
+    choruses = ''.join([chorus_text(number) for number in range(1, CHORUS_COUNT + 1)])
+
+    # If the repeats come first, the choruses are numbered after them.
+    first_ordinal = 1
+    if forward:
+        first_ordinal += repeat_count
+
+    repeats = []
+    for index in range(repeat_count):
+        ordinal = first_ordinal + index % CHORUS_COUNT
+        repeats.append('[Chorus%dR]\nA 05 Tag line %d\n\n' % (ordinal, index))
+
+    if forward:
+        return ''.join(repeats) + choruses
+
+    return choruses + ''.join(repeats)
+
+
+def held_lines(draft):
+    """Number of distinct `Line` objects held by the sections."""
+
+    lines = set()
+    for section in draft._sections.values():
+        for line in section.lines:
+            lines.add(id(line))
+
+    return len(lines)
+
+
+def main():
+    print('%8s %8s %12s %12s %8s' % ('repeats', 'forward', 'render (s)', 'edit (s)', 'lines'))
+
+    for repeat_count in (100, 300, 1000):
+        for forward in (False, True):
+            text = draft_text(repeat_count, forward)
+
+            render = timeit.timeit(lambda: Draft(text).to_marke37(), number=5) / 5
+
+            # Edit the first lyrics line of the first repeated chorus.
+            draft = Draft(text)
+            draft.to_marke37()
+            chorus_id = 'Chorus' + str(repeat_count + 1 if forward else 1)
+            row = draft._sections[chorus_id].lines[0].draft_line_number
+
+            def edit():
+                draft.apply_edit(row, row + 1, 'A 07 An edited line for the chorus')
+                draft.to_marke37()
+
+            edit_time = timeit.timeit(edit, number=5) / 5
+
+            print('%8d %8s %12.6f %12.6f %8d' % (repeat_count, forward, render, edit_time, held_lines(draft)))
+
+
+if __name__ == '__main__':
+    main()
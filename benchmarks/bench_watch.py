@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Polls of a tree of drafts, with and without changes.
+
+Builds a tree of 10k drafts (100 directories of 100), renders it once, then
+times the polls with no change, with one draft changed, and with one draft
+touched (saved with the same content).
+
+Run it from the root of the repository:
+
+    PYTHONPATH=. python benchmarks/bench_watch.py
+"""
+
+import os
+import tempfile
+import time
+
+from letrista.watch import Watcher
+
+
+DRAFT = '[Verse]\nA 08 This is line %d\nB 07 And this is^B another\n\n[Chorus]\nThe chorus line\n'
+
+
+def build_tree(root, directories = 100, drafts = 100):
+    """Writes the drafts, returning the path of the first one."""
+
+    for directory in range(directories):
+        path = os.path.join(root, 'album%03d' % directory)
+        os.mkdir(path)
+        for number in range(drafts):
+            with open(os.path.join(path, 'song%03d.e37' % number), 'w') as f:
+                f.write(DRAFT % number)
+
+    return os.path.join(root, 'album000', 'song000.e37')
+
+
+def timed_poll(watcher):
+    start = time.perf_counter()
+    results = watcher.poll()
+
+    return time.perf_counter() - start, results
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        first = build_tree(root)
+        watcher = Watcher(root)
+
+        elapsed, results = timed_poll(watcher)
+        print('%-24s %10.1f ms (%d rendered)' % ('first poll', elapsed * 1000, len(results)))
+
+        elapsed, results = timed_poll(watcher)
+        print('%-24s %10.1f ms (%d rendered)' % ('no changes', elapsed * 1000, len(results)))
+
+        stat = os.stat(first)
+        with open(first, 'w') as f:
+            f.write(DRAFT % 1000)
+        os.utime(first, ns = (stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+        elapsed, results = timed_poll(watcher)
+        print('%-24s %10.1f ms (%d rendered, %d written)' % ('one draft changed', elapsed * 1000, len(results), sum(result.written for result in results)))
+
+        os.utime(first, ns = (stat.st_atime_ns, stat.st_mtime_ns + 2000000000))
+
+        elapsed, results = timed_poll(watcher)
+        print('%-24s %10.1f ms (%d rendered)' % ('one draft touched', elapsed * 1000, len(results)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Rendering of drafts from asyncio code.
+
+Reading the files and processing the drafts is blocking work, so it is done
+in a bounded pool of threads, a section at a time. The event loop is free
+between sections, which is also when a render can be cancelled (a step
+already running in a thread cannot be stopped, so it is waited for). A
+semaphore limits how many renders are in progress at once.
+
+The text is built with `Draft.to_marke37`, so the `render_cache` and the
+`section_cache` of `Draft` are used if set.
+"""
+
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from letrista.draft import Draft
+
+# Threads for the blocking work, shared by all the renders. The processing
+# is Python code, which threads cannot run in parallel: more threads only
+# compete with the event loop for the interpreter (and add to its lag).
+MAX_WORKERS = 1
+# Renders in progress at once (the rest wait for their turn).
+MAX_CONCURRENT_RENDERS = 64
+
+_executor = None
+# One semaphore per event loop, since they cannot be shared between loops.
+_semaphores = weakref.WeakKeyDictionary()
+
+
+async def render_text(text, executor = None):
+    """Renders the text of a draft to marke37.
+
+    The work is done in `executor` (by default, a shared pool of
+    `MAX_WORKERS` threads).
+    """
+
+    async with _get_semaphore():
+        executor = executor or _get_executor()
+
+        # Even indexing the lines of the text is done out of the loop.
+        draft = await _run_step(executor, Draft, text)
+
+        return await _render_draft(draft, executor)
+
+
+async def render_file(path, executor = None):
+    """Reads the draft in the given path and renders it to marke37.
+
+    The file is read in chunks, along with the processing of the sections,
+    and the lines after the end of lyrics are never read. The file is closed
+    once no step reading it is running, even if the render is cancelled.
+    """
+
+    async with _get_semaphore():
+        executor = executor or _get_executor()
+
+        f = await _run_step(executor, partial(open, path, 'r', encoding = 'utf-8'), discard = _close)
+        try:
+            return await _render_draft(Draft.from_stream(f), executor)
+        finally:
+            f.close()
+
+
+async def _render_draft(draft, executor):
+    """Processes the draft a section at a time, then builds the text."""
+
+    # Each step processes the lines until the next section is found. The
+    # task may be cancelled while waiting for any of them.
+    sections = draft.iter_sections()
+    while await _run_step(executor, next, sections, None) is not None:
+        pass
+
+    # The draft is processed already, but the caches are used from here.
+    return await _run_step(executor, draft.to_marke37)
+
+
+async def _run_step(executor, function, *args, discard = None):
+    """Runs a blocking step in the executor, returning its result.
+
+    If the task is cancelled while the step runs, the cancellation waits
+    for the step to end (so what it uses is not released while it runs),
+    and its result is given to `discard`, if any.
+    """
+
+    future = executor.submit(function, *args)
+
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # The step is cancelled if it did not start yet.
+        if not future.cancel():
+            await _wait_step(future)
+
+            if discard is not None and future.exception() is None:
+                discard(future.result())
+
+        raise
+
+
+async def _wait_step(future):
+    """Waits for a step to end, even if the task is cancelled again."""
+
+    loop = asyncio.get_running_loop()
+    done = asyncio.Event()
+    future.add_done_callback(lambda _: loop.call_soon_threadsafe(done.set))
+
+    while not done.is_set():
+        try:
+            await done.wait()
+        except asyncio.CancelledError:
+            pass
+
+
+def _close(f):
+    """Closes the file opened by a cancelled render."""
+
+    f.close()
+
+
+def _get_executor():
+    """Returns the shared pool of threads, creating it if needed."""
+
+    global _executor
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers = MAX_WORKERS, thread_name_prefix = 'letrista')
+
+    return _executor
+
+
+def _get_semaphore():
+    """Returns the semaphore of the running event loop."""
+
+    loop = asyncio.get_running_loop()
+
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_RENDERS)
+        _semaphores[loop] = semaphore
+
+    return semaphore
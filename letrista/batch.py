@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Rendering of many drafts at once, using a pool of processes.
+
+Each draft is read and rendered in one of the worker processes, and only
+the path and the resulting text travel between processes. An error in one
+draft is reported in its result, without stopping the rest of the batch.
+"""
+
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from letrista.draft import Draft
+
+# Result of rendering one draft: either `text` or `error` is None.
+RenderResult = namedtuple('RenderResult', ('path', 'text', 'error'))
+
+# Chunks of work per worker, to balance the load when drafts differ in size.
+CHUNKS_PER_WORKER = 4
+
+# Extension of the drafts (and of the rendered text).
+DRAFT_EXTENSION = '.e37'
+RENDER_EXTENSION = '.me37'
+
+
+def render_many(paths, workers = None, chunksize = None):
+    """Renders the drafts in the given paths to marke37.
+
+    Returns a list of `RenderResult`, in the same order as `paths`.
+
+    The drafts are rendered by `workers` processes (by default, one per
+    CPU). With a single worker, they are rendered in the current process.
+    The paths are sent to the workers in chunks of `chunksize` (by default,
+    the paths split in `CHUNKS_PER_WORKER` chunks per worker).
+    """
+
+    return list(iter_render_many(paths, workers, chunksize))
+
+
+def iter_render_many(paths, workers = None, chunksize = None):
+    """Renders the drafts in the given paths, yielding each result in order.
+
+    Works as `render_many`, but each result is yielded as soon as it (and the
+    ones before it) is ready.
+    """
+
+    paths = list(paths)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield render_path(path)
+
+        return
+
+    if chunksize is None:
+        chunksize = max(1, len(paths) // (workers * CHUNKS_PER_WORKER))
+
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        for result in executor.map(render_path, paths, chunksize = chunksize):
+            yield result
+
+
+def render_path(path):
+    """Renders the draft in the given path, returning a `RenderResult`.
+
+    Any error is reported in the result, as text (since the exception may
+    not be able to travel between processes).
+    """
+
+    try:
+        with open(path, 'r', encoding = 'utf-8') as f:
+            # The notes below the end of lyrics are never read.
+            text = Draft.from_stream(f).to_marke37()
+    except Exception as e:
+        return RenderResult(path, None, '%s: %s' % (type(e).__name__, e))
+
+    return RenderResult(path, text, None)
+
+
+def find_drafts(directory):
+    """Returns the paths of the drafts within a directory (and below it).
+
+    The drafts are the files ending in `DRAFT_EXTENSION`, sorted by path so
+    the order is the same in every run.
+    """
+
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        for name in files:
+            if name.endswith(DRAFT_EXTENSION):
+                paths.append(os.path.join(root, name))
+
+    return sorted(paths)
+
+
+def output_name(path):
+    """Returns the path of the rendered text of a draft (as `RENDER_EXTENSION`)."""
+
+    root, extension = os.path.splitext(path)
+    if extension != DRAFT_EXTENSION:
+        root = path
+
+    return root + RENDER_EXTENSION
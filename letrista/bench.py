@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Throughput of letrista on synthetic drafts, to compare machines and releases.
+
+Each workload is run on a synthetic draft of a given number of lines, a few
+times (one fresh draft per run), and reported with:
+
+  - lines_per_second: lines of all the runs over the time of all the runs.
+  - p50_ms and p99_ms: latency of a single run (a draft), in milliseconds.
+  - peak_traced_bytes: the peak of the memory allocated by a single run, as
+    traced by `tracemalloc` (in a run of its own, since tracing slows the
+    allocations down).
+
+The highest resident memory of the process (which never goes down, so it is
+the one of the heaviest workload) is reported once, for the whole report.
+
+The workloads are:
+
+  - classify: the type of every line (`Line.type`).
+  - extract: the printed text of every line (`Line.text`).
+  - process_lines: `Draft.process_lines`, from the text.
+  - to_marke37: `Draft.to_marke37`, from the text.
+  - repeats: `Draft.to_marke37` of a draft where most sections are repeats
+    of the same chorus (so the cloning of the sections dominates).
+"""
+
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from collections import OrderedDict
+from itertools import chain, cycle, islice
+
+from letrista import __version__
+from letrista.draft import Draft
+from letrista.line import Line
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows.
+    resource = None
+
+# Sizes of the drafts (in lines) measured by default.
+DEFAULT_LINE_COUNTS = (1000, 10000, 100000)
+
+# Runs of each workload (the latency percentiles come from them).
+DEFAULT_RUNS = 5
+
+# Lines of the synthetic drafts, repeated as needed.
+DRAFT_LINES = (
+    '[Verse]',
+    'A 08 The verse line %d with a^A hat -- and a comment',
+    'B 07 The next line^B rhymes %d',
+    'X __ A line %d still without count',
+    'A Only the rhyme letter, line %d',
+    '',
+    '[Chorus]',
+    'C 06 The chorus^C line %d',
+    '-- A commented line %d',
+    'C 06 Another chorus^C line %d',
+    '',
+)
+
+REPEAT_LINES = (
+    '[Verse]',
+    'A 08 The verse line %d with a^A hat',
+    '',
+    '[ChorusR]',
+    '',
+)
+
+
+def build_draft(line_count, repeats = False):
+    """Builds a synthetic draft with the given number of lines.
+
+    With `repeats`, the draft is a chorus followed by verses, each one
+    followed by a repeat of the chorus.
+    """
+
+    if repeats:
+        # The chorus of the draft (the one to be repeated), then the rest.
+        pattern = chain(DRAFT_LINES[6:], cycle(REPEAT_LINES))
+    else:
+        pattern = cycle(DRAFT_LINES)
+
+    lines = []
+    for number, line in enumerate(islice(pattern, line_count)):
+        lines.append(line.replace('%d', str(number)))
+
+    return '\n'.join(lines) + '\n'
+
+
+def classify_lines(text):
+    """Classifies each line of the text."""
+
+    for line_text in text.splitlines():
+        Line(line_text).type
+
+
+def extract_lines(text):
+    """Extracts the printed text of each line of the text."""
+
+    for line_text in text.splitlines():
+        Line(line_text).text
+
+
+def process_draft(text):
+    """Processes the lines of a new draft."""
+
+    Draft(text).process_lines()
+
+
+def render_draft(text):
+    """Renders a new draft to marke37."""
+
+    Draft(text).to_marke37()
+
+
+# Name -> (function run with the text of the draft, uses a draft with repeats).
+WORKLOADS = OrderedDict((
+    ('classify', (classify_lines, False)),
+    ('extract', (extract_lines, False)),
+    ('process_lines', (process_draft, False)),
+    ('to_marke37', (render_draft, False)),
+    ('repeats', (render_draft, True)),
+))
+
+
+def percentile(values, percent):
+    """Returns the percentile of the values (by the nearest rank)."""
+
+    ordered = sorted(values)
+    rank = max(1, int(math.ceil(percent / 100.0 * len(ordered))))
+
+    return ordered[rank - 1]
+
+
+def peak_rss():
+    """Returns the peak resident memory of the process, in bytes (or None)."""
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Reported in bytes on macOS, and in kilobytes elsewhere.
+    if sys.platform == 'darwin':
+        return peak
+
+    return peak * 1024
+
+
+def peak_traced(function, text):
+    """Returns the peak of the memory allocated by running `function`, in bytes."""
+
+    tracemalloc.start()
+    try:
+        function(text)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+
+def run_workload(name, line_count, runs = DEFAULT_RUNS):
+    """Runs a workload on a draft of `line_count` lines, returning its report."""
+
+    function, repeats = WORKLOADS[name]
+    text = build_draft(line_count, repeats)
+
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function(text)
+        latencies.append(time.perf_counter() - start)
+
+    return OrderedDict((
+        ('workload', name),
+        ('lines', line_count),
+        ('runs', runs),
+        ('lines_per_second', line_count * runs / sum(latencies)),
+        ('p50_ms', percentile(latencies, 50) * 1000),
+        ('p99_ms', percentile(latencies, 99) * 1000),
+        ('peak_traced_bytes', peak_traced(function, text)),
+    ))
+
+
+def run(workloads = None, line_counts = DEFAULT_LINE_COUNTS, runs = DEFAULT_RUNS):
+    """Runs the workloads (all, by default) on every size of draft.
+
+    Returns the report, ready to be dumped as JSON.
+    """
+
+    if workloads is None:
+        workloads = list(WORKLOADS)
+
+    results = []
+    for line_count in line_counts:
+        for name in workloads:
+            results.append(run_workload(name, line_count, runs))
+
+    return OrderedDict((
+        ('letrista', __version__),
+        ('python', platform.python_version()),
+        ('implementation', platform.python_implementation()),
+        ('platform', platform.platform()),
+        ('results', results),
+        ('peak_rss_bytes', peak_rss()),
+    ))
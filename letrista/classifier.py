@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Single-pass classifier for the lines of a draft.
+
+The `Line` object used to find its type with a cascade of checks (strip,
+build the rulers, lowercase the whole line, and so on). Here the same rules
+are applied by looking at the first few characters only once, with the
+help of tables that are computed when the module is loaded.
+
+The type codes are the same ones exposed as `Line.TYPE_*` constants.
+"""
+
+from array import array
+
+# Constants for line type (see `Line` for the description of each one).
+TYPE_UNSET       = 0  # The type of the line has not been yet determined
+TYPE_COUNT       = 1  # "X ## lyrics"  -- Includes rhyme scheme and syllable count
+TYPE_SCHEMA      = 2  # "X lyrics"     -- Includes only the rhyme scheme
+TYPE_SKIP        = 3  # "\n"           -- Just a line skip
+TYPE_LYRICS      = 4  # "lyrics"       -- Just lyrics, no indicators
+TYPE_INSTRUCTION = 5  # "["            -- Line that begins with "["
+TYPE_COMMENT     = 6  # "A-## lyrics"  -- Any line with "-" in second position
+TYPE_END         = 7  # "********"     -- End of lyrics (5 or more same char)
+TYPE_IGNORED     = 8  # Any line after the TYPE_END line.
+
+# Symbols used to mark the end of document or end of lyrics.
+SYMBOLS_FOR_EOD = ('*', '-', '#', '/')
+
+# The rulers are the first five characters of an end of lyrics line, so
+# they are built once instead of on every check.
+_END_RULERS = frozenset(symbol * 5 for symbol in SYMBOLS_FOR_EOD)
+
+# Positions 3 and 4 of a line with an undetermined syllable count. The digits
+# are checked apart, since `str.isdigit` also accepts non-ASCII digits.
+_UNDEFINED_COUNT_MARKERS = frozenset(('__', 'xx', 'xX', 'Xx', 'XX'))
+
+
+def classify_line(text):
+    """Returns the `Line.TYPE_*` code of a line of text.
+
+    The priority of search is the one described in `Line.type`, minus the
+    TYPE_IGNORED, which depends on the lines above (and is then a concern of
+    the caller).
+    """
+
+    # The ruler is checked against the original text, since it has to be at
+    # the beginning of the line. Five characters are never an empty line, so
+    # doing this before TYPE_SKIP changes nothing.
+    if text[:5] in _END_RULERS:
+        return TYPE_END
+
+    stripped = text.strip()
+    length = len(stripped)
+
+    if length == 0:
+        return TYPE_SKIP
+
+    if length > 1 and stripped[1] == '-':
+        return TYPE_COMMENT
+
+    if stripped[0] == '[':
+        return TYPE_INSTRUCTION
+
+    # As with the ruler, the count is looked for in the original text.
+    if length >= 4:
+        marker = text[2:4]
+        if marker.isdigit() or marker in _UNDEFINED_COUNT_MARKERS:
+            return TYPE_COUNT
+
+    if length >= 2 and stripped[0].isupper() and not stripped[1].isalnum():
+        return TYPE_SCHEMA
+
+    return TYPE_LYRICS
+
+
+def classify_lines(lines):
+    """Classifies a list of strings at once.
+
+    Returns an `array('b')` with the type code of each line, in the same
+    order the lines were received.
+    """
+
+    return array('b', map(classify_line, lines))
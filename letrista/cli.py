@@ -1,16 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
 """Console script for letrista."""
+import json
+import os
 import sys
+import time
+
 import click
 
+from letrista import batch
+from letrista import bench as benchmark
+from letrista import watch as watching
+from letrista.draft import Draft
+
+# Path given for the standard input.
+STDIN_PATH = '-'
 
-@click.command()
-def main(args=None):
-    """Console script for letrista."""
-    click.echo("Replace this message by putting your code into "
-               "letrista.cli.main")
-    click.echo("See click documentation at https://click.palletsprojects.com/")
+
+@click.group(invoke_without_command=True)
+@click.pass_context
+def main(ctx, args=None):
+    """Renders lyrics drafts (e37) to marke37."""
+    if ctx.invoked_subcommand is None:
+        click.echo(ctx.get_help())
     return 0
 
 
+@main.command()
+@click.argument('files', nargs=-1, required=True, type=click.Path())
+@click.option('-j', '--jobs', type=click.IntRange(min=1), default=None,
+              help='Processes rendering the drafts (one per CPU by default).')
+@click.option('-o', '--output-dir', type=click.Path(file_okay=False), default=None,
+              help='Writes each draft to DIR (as .me37) instead of the standard output.')
+def render(files, jobs, output_dir):
+    """Renders the drafts in FILES to marke37.
+
+    A directory stands for all the drafts (.e37) within it, and '-' for the
+    standard input. Each draft is written as soon as it (and the ones before
+    it) is rendered, in the same order as given. The standard input is always
+    written to the standard output.
+    """
+
+    inputs = expand_paths(files)
+    if output_dir is not None:
+        check_output_paths(inputs)
+
+    failed = False
+
+    for path, output_path, result in render_inputs(inputs, jobs):
+        if result.error is not None:
+            click.echo('letrista: %s: %s' % (path, result.error), err=True)
+            failed = True
+        elif output_dir is None or output_path is None:
+            click.echo(result.text)
+        else:
+            write_output(os.path.join(output_dir, output_path), result.text)
+
+    sys.exit(1 if failed else 0)
+
+
+@main.command()
+@click.argument('directory', type=click.Path(exists=True, file_okay=False))
+@click.option('-o', '--output-dir', type=click.Path(file_okay=False), default=None,
+              help='Writes the drafts to DIR (by default, next to each draft).')
+@click.option('-i', '--interval', type=click.FloatRange(min=0), default=watching.POLL_INTERVAL,
+              show_default=True, help='Seconds between polls of the directory.')
+@click.option('-j', '--jobs', type=click.IntRange(min=1), default=1,
+              help='Processes rendering the drafts, when several change at once.')
+@click.option('--manifest', type=click.Path(dir_okay=False), default=None,
+              help='Keeps the manifest of the drafts in FILE, between runs.')
+@click.option('--once', is_flag=True, help='Polls once, then exits.')
+def watch(directory, output_dir, interval, jobs, manifest, once):
+    """Renders the drafts in DIRECTORY to marke37 as they change.
+
+    Only the drafts whose content changed are rendered again, and their
+    output is written only if it changed.
+    """
+
+    watcher = watching.Watcher(directory, output_dir, manifest, jobs)
+    failed = False
+
+    try:
+        while True:
+            for result in watcher.poll():
+                if result.error is not None:
+                    click.echo('letrista: %s: %s' % (result.path, result.error), err=True)
+                    failed = True
+                elif result.written:
+                    click.echo(result.output_path)
+
+            if once:
+                break
+
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+
+    sys.exit(1 if once and failed else 0)
+
+
+@main.command()
+@click.option('-n', '--lines', 'line_counts', type=click.IntRange(min=1), multiple=True,
+              help='Lines of the synthetic drafts (may be repeated; 1000, 10000 and 100000 by default).')
+@click.option('-r', '--runs', type=click.IntRange(min=1), default=benchmark.DEFAULT_RUNS,
+              show_default=True, help='Drafts run by each workload, for the latencies.')
+@click.option('-w', '--workload', 'workloads', type=click.Choice(list(benchmark.WORKLOADS)), multiple=True,
+              help='Workload to run (may be repeated; all of them by default).')
+def bench(line_counts, runs, workloads):
+    """Measures the throughput on synthetic drafts, reported as JSON.
+
+    For each workload and size of draft, reports the lines per second, the
+    p50 and p99 latency of a draft, and the peak memory allocated by a draft.
+    """
+
+    report = benchmark.run(workloads or None, line_counts or benchmark.DEFAULT_LINE_COUNTS, runs)
+
+    click.echo(json.dumps(report, indent=2))
+
+
+def expand_paths(files):
+    """Returns the drafts to render, as (path, output path) pairs.
+
+    The drafts of a directory are written below the output directory with
+    the same path they have within it; the rest of the files, with their
+    name. The output path of the standard input is None.
+    """
+
+    inputs = []
+    for path in files:
+        if path == STDIN_PATH:
+            inputs.append((path, None))
+        elif os.path.isdir(path):
+            for draft_path in batch.find_drafts(path):
+                inputs.append((draft_path, batch.output_name(os.path.relpath(draft_path, path))))
+        else:
+            inputs.append((path, batch.output_name(os.path.basename(path))))
+
+    return inputs
+
+
+def check_output_paths(inputs):
+    """Makes sure no two drafts are written to the same output path.
+
+    As the files are written with their name, two files with the same name
+    (in different directories) would overwrite each other. Raises a
+    `click.UsageError` naming both (nothing is rendered then).
+    """
+
+    sources = {}
+    for path, output_path in inputs:
+        if output_path is None:
+            continue
+
+        output_path = os.path.normpath(output_path)
+        source = sources.setdefault(output_path, path)
+
+        # The same draft given twice is written twice, with the same text.
+        if os.path.abspath(source) != os.path.abspath(path):
+            raise click.UsageError("'%s' and '%s' would both be written to '%s'" % (source, path, output_path))
+
+
+def render_inputs(inputs, jobs):
+    """Renders the drafts, yielding (path, output path, result) in order.
+
+    The files are rendered by a pool of `jobs` processes, while the standard
+    input is read and rendered in this one, when its turn comes.
+    """
+
+    paths = [path for path, _ in inputs if path != STDIN_PATH]
+    results = batch.iter_render_many(paths, workers=jobs)
+
+    for path, output_path in inputs:
+        if path == STDIN_PATH:
+            yield path, output_path, render_stdin()
+        else:
+            yield path, output_path, next(results)
+
+
+def render_stdin():
+    """Renders the draft in the standard input, as a `RenderResult`."""
+
+    try:
+        text = Draft.from_stream(sys.stdin).to_marke37()
+    except Exception as e:
+        return batch.RenderResult(STDIN_PATH, None, '%s: %s' % (type(e).__name__, e))
+
+    return batch.RenderResult(STDIN_PATH, text, None)
+
+
+def write_output(path, text):
+    """Writes a rendered draft, creating its directory if needed."""
+
+    directory = os.path.dirname(path)
+    if directory != '':
+        os.makedirs(directory, exist_ok=True)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
 if __name__ == "__main__":
     sys.exit(main())  # pragma: no cover
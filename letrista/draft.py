@@ -4,13 +4,24 @@
 
 # Used because Sublime Text has Python 3.3,
 # which has unordered dictionaries.
-from collections import OrderedDict
+from collections import Counter, OrderedDict, namedtuple
+from bisect import bisect_left
+from itertools import islice
 
+from letrista.draft_stats import create_draft_stats
+from letrista.editable_line import EditableLine
 from letrista.line import Line
+from letrista.line_table import LineTable
+from letrista.render_cache import CachedRender, RenderCache
 from letrista.section import Section
+from letrista.section_registry import default_registry
 from letrista.unassigned_section import UnassignedSection
 from letrista.instruction import Instruction
 
+# A line changed by the bulk operations (`toggle_comment`, `scaffold_counts`):
+# its row (starting at zero) and its text before and after the change.
+TextEdit = namedtuple('TextEdit', ('line', 'old', 'new'))
+
 class Draft:
     """Contains and clasifies all lines in the draft.
 
@@ -22,35 +33,86 @@ class Draft:
     It uses the following internal variables to keep tabs:
 
     _draft_lyrics:
-        A string with all the text of the draft.
+        A string with all the text of the draft (joined by the line table
+        only when requested).
+    _line_table:
+        The lines of the draft, kept in chunks of text and indexed once, as
+        text is added or edited.
     string_list:
         Takes [_draft_lyrics] and explodes them.
     """
 
+    # Characters read at a time from a stream (see `from_stream`).
+    STREAM_CHUNK_SIZE = 65536
+
+    # A `RenderCache` for `to_marke37` to use (for all drafts if set in the
+    # class, or for a single one if set in the object).
+    render_cache = None
+
+    # A `RenderCache` for the sections, keyed by their type and content (and
+    # the state of the `section_registry`), so the sections that do not
+    # change between revisions of a draft (or are the same in several drafts)
+    # are not rendered again.
+    section_cache = None
+
+    # The `SectionRegistry` with the types of section and their identifiers
+    # (the `default_registry`, unless set in the class or the object).
+    section_registry = None
+
     def __init__(self, draft_lyrics = ''):
         """Generates the draft from the initial string."""
 
-        self._draft_lyrics = draft_lyrics
+        self._line_table = LineTable()
+
+        self._section_count = self.__create_section_count()
+
+        # State of the parsing, kept between calls to `process_lines` so only
+        # the lines added since the last call are processed.
+        self._sections = None
+        self._current_section = None
+        self._parsed_line_count = 0
+        self._end_of_lyrics_reached = False
+
+        # Index of the sections by the row of their instruction (in order),
+        # and the repeat sections cloning each section; used by `apply_edit`.
+        self._section_rows = []
+        self._section_list = []
+        self._repeated_by = {}
+
+        # Index of the sections by type and number (as in ('Chorus', 2)) and
+        # the other way around, and the repeat instructions, resolved once
+        # the lines are processed (if instructions were found since the last
+        # time).
+        self._section_index = {}
+        self._section_keys = {}
+        self._repeats = []
+        self._repeats_dirty = False
+
+        # Stream to read the lines from (see `from_stream`), and the text read
+        # that does not make a complete line yet.
+        self._stream = None
+        self._stream_chunk_size = self.STREAM_CHUNK_SIZE
+        self._stream_pending = ''
+
+        # Render found in the `render_cache`, while the draft is not processed.
+        self._cached_render = None
+
+        # Cache of `Line` objects for the `lines` property.
+        self._lines = []
 
-        self._section_count = {
-            # This value of unassigned is hardcoded since is only one.
-            Section.TYPE_UNASSIGNED: 1,
-            Section.TYPE_TITLE: 0,
-            Section.TYPE_INTRO: 0,
-            Section.TYPE_VERSE: 0,
-            Section.TYPE_PRECHORUS: 0,
-            Section.TYPE_CHORUS: 0,
-            Section.TYPE_POSTCHORUS: 0,
-            Section.TYPE_BRIDGE: 0,
-            Section.TYPE_OUTRO: 0,
-        }
+        # Number of processed lines of each type, and the `DraftStats`
+        # created from the sections (until the draft changes).
+        self._line_type_counts = Counter()
+        self._stats = None
 
-        # Make sure the last line has end of line.
-        if len(draft_lyrics) > 0 and draft_lyrics[-1] != '\n':
-            self._draft_lyrics = self._draft_lyrics + '\n'
+        # Adding the text makes sure the last line has end of line.
+        self.add_text(draft_lyrics)
 
-        # Draft word count.
-        self._word_count = -1
+    @property
+    def _draft_lyrics(self):
+        """Returns the full text of the draft, joined from the line table."""
+
+        return self._line_table.buffer
 
     @property
     def string_list(self):
@@ -72,116 +134,837 @@ class Draft:
         number within the draft (or draft_line_number).
         """
 
-        return len(self.string_list)
+        return len(self._line_table)
 
     @property
     def lines(self):
-        """Lines in the draft (as Line objects)."""
+        """Lines in the draft (as Line objects).
 
-        self._lines = []
+        The objects are created once; only the lines added since the last
+        call are created.
+        """
 
-        for index, line_str in enumerate(self.string_list):
-            self._lines.append(Line(line_str, draft_line_number = (index + 1)))
+        for index in range(len(self._lines), len(self._line_table)):
+            self._lines.append(self._line_table.line(index))
 
         return self._lines
 
+    @property
+    def line_table(self):
+        """Lines in the draft, as a compact `LineTable`.
+
+        This is an alternative to `lines` when the draft has to be kept in
+        memory: the table slices the text and creates the `Line` objects only
+        when a given row is requested.
+        """
+
+        return self._line_table
+
     @property
     def text(self):
         """Return the processed text."""
 
-        text = ''
+        if self._sections is None and self._cached_render is not None:
+            return self._cached_render.text
 
-        for section in self._sections.values():
-            # Make sure the section has content.
-            if section.word_count > 0:
-                text += section.text
-                text += '\n'
+        chunks = []
+        self.__write_sections(chunks.append)
 
-        text = text.strip()
-
-        self._text = text
+        self._text = ''.join(chunks)
 
         return self._text
 
+    @property
+    def stats(self):
+        """Returns the `DraftStats`: the counts of words, lines and sections.
+
+        The draft is processed first (only the lines added since the last
+        time). The stats are created once, and kept until the draft changes.
+        """
+
+        self.process_lines()
+
+        if self._stats is None:
+            self._stats = create_draft_stats(self._sections, self._line_type_counts)
+
+        return self._stats
+
     @property
     def word_count(self):
         """Returns the word count of the printable lines."""
 
-        # Return the calculated value.
-        if self._word_count > -1:
-            return self._word_count
+        if self._sections is None and self._cached_render is not None:
+            return self._cached_render.word_count
 
-        self._word_count = 0
-        # Sum the word count from each section.
-        for section in self._sections:
-            wc = self._sections[section].word_count
-            self._word_count += wc
-
-        return self._word_count
+        return self.stats.word_count
 
     @property
     def line_count(self):
         """Line count in the draft."""
 
-        self._line_count = 0
+        if self._sections is None and self._cached_render is not None:
+            return self._cached_render.line_count
 
-        for section in self._sections.values():
-            if section.line_count > 0:
-                self._line_count += section.line_count
-
-        return self._line_count
+        return self.stats.line_count
 
     def add_text(self, new_lines):
         """Adds lines (as text) to the draft.
 
         Adds an arbitrary amount of new lines (including one) to the current
         draft lyrics, ensuring it has the end of line character at the end.
+        Nothing is returned: the full text (`_draft_lyrics`) is joined only
+        when requested.
         """
 
-        self._draft_lyrics = self._draft_lyrics + new_lines
-
         if len(new_lines) > 0 and new_lines[-1] != '\n':
-            self._draft_lyrics = self._draft_lyrics + '\n'
+            new_lines = new_lines + '\n'
 
-        return self._draft_lyrics
+        # Only the new lines are indexed; the table holds the text (and the
+        # full text is not joined until requested).
+        self._line_table.append(new_lines)
+        self._cached_render = None
+        self._stats = None
 
     def add_file(self, file_path):
-        """Adds the content of a file as string."""
+        """Adds the content of a file (encoded in UTF-8) as string."""
+
+        with open(file_path, "r", encoding = "utf-8") as f:
+            # Call the function that adds text.
+            self.add_text(f.read())
+
+    @classmethod
+    def from_stream(cls, stream, chunk_size = STREAM_CHUNK_SIZE):
+        """Creates a draft that reads its lines from a stream.
 
-        f = open(file_path, "r")
+        The `stream` is any object with a `read(size)` method (such as an
+        open file). It is read in chunks of `chunk_size` characters, as the
+        lines are processed, and reading stops once the end of lyrics is
+        found; therefore, the draft only holds the text read so far.
 
-        # Call the function that adds text.
-        self.add_text(f.read())
+        The stream is not closed by the draft.
+        """
+
+        draft = cls()
+        draft._stream = stream
+        draft._stream_chunk_size = chunk_size
+
+        return draft
+
+    def __read_stream(self):
+        """Adds the complete lines of the next chunk of the stream.
+
+        The text after the last end of line waits for the next chunk, since
+        the line may not be complete. Returns False once the stream is over.
+        """
+
+        if self._stream is None:
+            return False
+
+        chunk = self._stream.read(self._stream_chunk_size)
+
+        # At the end of the stream, the pending text is the last line.
+        if len(chunk) == 0:
+            self._stream = None
+            if len(self._stream_pending) == 0:
+                return False
+
+            self.add_text(self._stream_pending)
+            self._stream_pending = ''
+
+            return True
+
+        text = self._stream_pending + chunk
+        last_eol = text.rfind('\n') + 1
+
+        self._stream_pending = text[last_eol:]
+        if last_eol > 0:
+            self.add_text(text[:last_eol])
+
+        return True
 
     def to_marke37(self):
-        """Generates the marke37 lyrics markup from the draft."""
+        """Generates the marke37 lyrics markup from the draft.
+
+        If a `render_cache` is set, a draft with the same text rendered
+        before (with the same section registry) is taken from it, and the
+        draft is not processed.
+        """
+
+        cache = self.render_cache
+        # A stream is not fully read yet, so its text is not known.
+        if cache is None or self._stream is not None:
+            self.process_lines()
+
+            return self.text
+
+        if self._cached_render is None:
+            # The same text renders differently with other sections (or
+            # wrappers) registered.
+            key = (self.__get_section_registry().generation, RenderCache.key_for(self._draft_lyrics))
+            self._cached_render = cache.get(key)
+
+            if self._cached_render is None:
+                self.process_lines()
+                cache.put(key, CachedRender(self.text, self.word_count, self.line_count))
+
+                return self.text
+
+        return self._cached_render.text
+
+    def render_to(self, writer):
+        """Writes the marke37 lyrics markup from the draft to `writer`.
+
+        The `writer` is either an object with a `write` method (such as an
+        open file) or a callable receiving each chunk of text. The sections
+        are written one chunk at a time, so the full text is never built.
+        """
+
+        write = getattr(writer, 'write', writer)
 
         self.process_lines()
+        self.__write_sections(write)
+
+    def __write_sections(self, write):
+        """Writes the sections with content, separated by an empty line.
+
+        The output has no leading whitespace (nor trailing end of lines),
+        as if the whole text was stripped.
+        """
+
+        started = False
+
+        def write_stripped(chunk):
+            nonlocal started
+
+            # Skip the whitespace until the first printable chunk.
+            if not started:
+                chunk = chunk.lstrip()
+                if len(chunk) == 0:
+                    return
+
+                started = True
+
+            write(chunk)
+
+        for section in self._sections.values():
+            # Make sure the section has content.
+            if section.word_count > 0:
+                if started:
+                    write('\n\n')
 
-        return self.text
+                section.write_to(write_stripped)
 
     def process_lines(self):
-        """Processes the lines `Line` in the list, to create the sections."""
+        """Processes the lines `Line` in the list, to create the sections.
+
+        The parsing is incremental: the lines processed by a prior call are
+        not processed again, and the new ones (appended with `add_text`)
+        continue the section that was current at the end of that call.
+        """
+
+        for section in self.iter_sections():
+            pass
+
+        if self.section_cache is not None:
+            self.__use_section_cache(self.section_cache)
+
+        return self._sections
+
+    def __use_section_cache(self, cache):
+        """Takes the sections not rendered yet from the cache (or adds them)."""
+
+        # The same section renders differently with another class registered
+        # for its type.
+        generation = self.__get_section_registry().generation
+
+        for section in self._section_list:
+            # The unassigned section is never printed.
+            if section.is_rendered or section.type == Section.TYPE_UNASSIGNED:
+                continue
+
+            key = (generation, section.content_key())
+            cached_render = cache.get(key)
+
+            if cached_render is None:
+                cache.put(key, section.to_cached_render())
+            else:
+                section.use_cached_render(cached_render)
+
+    def iter_sections(self):
+        """Processes the lines, yielding each section once it is complete.
+
+        A section is complete when the instruction of the next one is found;
+        the last one is yielded when there are no more lines to process (or
+        the end of lyrics is reached).
+
+        For drafts created with `from_stream`, the stream is read a chunk at
+        a time, and only as the lines are needed.
+        """
+
+        if self._sections is None:
+            self.__start_parsing()
+
+        table = self._line_table
+        line_for_row = self._line_for_row
+        line_type_counts = self._line_type_counts
+        # The section that was current may get more lines.
+        continued_section = self._current_section
+
+        # Once the end of lyrics is found, nothing else is processed.
+        while not self._end_of_lyrics_reached:
+            # Loop thru the index of lines to find which are instructions. The
+            # lines after the end of lyrics are neither sliced nor classified.
+            index = self._parsed_line_count
+            while index < len(table):
+                line = line_for_row(index)
+                line_type_counts[line._type] += 1
+
+                if line.is_instruction:
+                    completed_section = self._current_section
+                    self._current_section = self.__parse_instruction(line, index)
+                    self._parsed_line_count = index + 1
+
+                    # The lines added to the section that was current change
+                    # the sections repeating it.
+                    if completed_section is continued_section:
+                        self.__invalidate_repeats(completed_section)
+
+                    yield completed_section
+                elif line.is_end_of_lyrics:
+                    # The row of the end of lyrics is kept as the processed count.
+                    line_type_counts[line._type] -= 1
+                    self._end_of_lyrics_reached = True
+                    self._parsed_line_count = index
+
+                    break
+                else:
+                    # If no instruction or end of lyrics, add line to section.
+                    self._current_section.add_line(line)
+                    self._parsed_line_count = index + 1
+
+                index += 1
+
+            if self._end_of_lyrics_reached or not self.__read_stream():
+                break
+
+        # The rest of the stream (if any) is never read.
+        if self._end_of_lyrics_reached:
+            self._stream = None
+
+        # Now that every section is known, the repeats can be resolved (and
+        # the ones sharing the lines of the continued section updated).
+        if self._repeats_dirty:
+            self.__resolve_repeats()
+            self._repeats_dirty = False
+
+        self.__invalidate_repeats(continued_section)
+
+        yield self._current_section
+
+    def apply_edit(self, start_line, end_line, new_text):
+        """Replaces the lines from `start_line` up to (not including) `end_line`.
+
+        This is meant for editors, so the line numbers start at zero, as in a
+        list (that is, `draft_line_number - 1`). The `new_text` may have any
+        number of lines: an empty string removes the lines, and an empty range
+        inserts the text before `start_line`.
+
+        If the draft was processed, only the section holding the lines is
+        processed again (along with the sections that repeat it). Adding or
+        removing instructions splits or merges the sections around them, and
+        the sections that follow are only numbered again. Adding or removing
+        the end of lyrics changes the lines processed, so in that case the
+        whole draft is processed again.
+
+        Raises `ValueError` unless `0 <= start_line <= end_line`; a range past
+        the last line is taken up to the last line.
+        """
+
+        start_line, end_line = self._edit_range(start_line, end_line)
+
+        if len(new_text) > 0 and new_text[-1] != '\n':
+            new_text = new_text + '\n'
+
+        # If not processed yet, there is only the text to update.
+        if self._sections is None:
+            self.__replace_rows(start_line, end_line, new_text)
+
+            return
+
+        # Make sure the lines added before this edit are processed.
+        self.process_lines()
+
+        # The lines after the end of lyrics are not processed.
+        if self._end_of_lyrics_reached and start_line > self._parsed_line_count:
+            self.__replace_rows(start_line, end_line, new_text)
+
+            return
+
+        old_instruction = None
+        if end_line - start_line == 1 and self._line_table.type(start_line) == Line.TYPE_INSTRUCTION:
+            old_instruction = Instruction(self._line_table.text(start_line), self.section_registry)
+
+        table = self._line_table
+        removed_line_types = Counter(map(table.type, range(start_line, end_line)))
+
+        # The new rows are all above the end of lyrics (if any).
+        structure_types = self.__structure_types(start_line, end_line, True)
+        new_line_count = self.__replace_rows(start_line, end_line, new_text)
+        structure_types |= self.__structure_types(start_line, start_line + new_line_count, False)
+
+        if old_instruction is not None and new_line_count == 1:
+            # Editing an instruction keeps the sections as long as it means
+            # the same (for instance, when fixing a typo).
+            new_line = self._line_for_row(start_line)
+            if new_line.is_instruction and self.__same_instruction(old_instruction, new_line):
+                section_index = bisect_left(self._section_rows, start_line)
+                self._section_list[section_index].replace_lines(0, 1, [new_line])
+
+                return
+
+        if Line.TYPE_END in structure_types:
+            self.__start_parsing()
+            self.process_lines()
+
+            return
+
+        if Line.TYPE_INSTRUCTION in structure_types:
+            self.__update_sections(start_line, end_line, new_line_count)
+        else:
+            self.__update_section_rows(start_line, end_line, new_line_count)
+
+        self._line_type_counts.subtract(removed_line_types)
+        self._line_type_counts.update(map(table.type, range(start_line, start_line + new_line_count)))
+
+    def _edit_range(self, start_line, end_line):
+        """Checks the rows of an edit, returning them within the draft."""
+
+        if not 0 <= start_line <= end_line:
+            raise ValueError('Invalid range of lines to edit: %d to %d' % (start_line, end_line))
+
+        row_count = len(self._line_table)
+
+        return min(start_line, row_count), min(end_line, row_count)
+
+    def toggle_comment(self, start_line, end_line):
+        """Comments (or uncomments) the lines from `start_line` to `end_line`.
+
+        As in a block comment, if all the lines are comments they are
+        uncommented; otherwise, they are all commented. The empty lines are
+        left as they are. The rows are counted as in `apply_edit`.
+
+        Returns the list of `TextEdit` with the lines that changed.
+        """
+
+        table = self._line_table
+        end_line = min(end_line, len(table))
+
+        rows = [row for row in range(start_line, end_line) if table.type(row) != Line.TYPE_SKIP]
+        uncomment = len(rows) > 0 and all(table.type(row) == Line.TYPE_COMMENT for row in rows)
+
+        edits = []
+        for row in rows:
+            line = EditableLine(table.text(row))
+            if uncomment:
+                line.uncomment()
+            else:
+                line.comment()
+
+            if line._original_text != table.text(row):
+                edits.append(TextEdit(row, table.text(row), line._original_text))
+
+        self.__apply_text_edits(edits)
+
+        return edits
+
+    def scaffold_counts(self, section):
+        """Adds the undetermined syllable count ('__') to a section.
+
+        The `section` is either its id (as in 'Verse2') or the `Section`. Its
+        lines of lyrics, with or without rhyme scheme, get the count (see
+        `EditableLine.add_syllable_count`); the empty lines, which separate
+        the stanzas, are left as they are.
+
+        Returns the list of `TextEdit` with the lines that changed.
+        """
+
+        self.process_lines()
+
+        if not isinstance(section, Section):
+            section = self._sections[section]
+
+        section_index = self._section_list.index(section)
+        table = self._line_table
+
+        edits = []
+        for row in range(self._section_rows[section_index] + 1, self.__section_end_row(section_index)):
+            if table.type(row) not in (Line.TYPE_LYRICS, Line.TYPE_SCHEMA):
+                continue
+
+            line = EditableLine(table.text(row))
+            line.add_syllable_count()
+            edits.append(TextEdit(row, table.text(row), line._original_text))
+
+        self.__apply_text_edits(edits)
+
+        return edits
+
+    def __apply_text_edits(self, edits):
+        """Applies the edits (in order of row) as a single `apply_edit`.
+
+        The block goes from the first to the last edited row, so the rows in
+        between that did not change are replaced by the same text.
+        """
+
+        if len(edits) == 0:
+            return
+
+        table = self._line_table
+        first_row = edits[0].line
+        last_row = edits[-1].line
+
+        new_texts = {}
+        for edit in edits:
+            new_texts[edit.line] = edit.new
+
+        block = []
+        for row in range(first_row, last_row + 1):
+            block.append(new_texts.get(row, table.text(row)) + '\n')
+
+        self.apply_edit(first_row, last_row + 1, ''.join(block))
+
+    def __replace_rows(self, start_line, end_line, new_text):
+        """Replaces the rows in the text, returning the new number of rows."""
+
+        row_count = len(self._line_table)
+
+        self._line_table.replace(start_line, end_line, new_text)
+
+        new_line_count = len(self._line_table) - row_count + (end_line - start_line)
+
+        self._replace_cached_lines(start_line, end_line, new_line_count)
+        self._cached_render = None
+        self._stats = None
+
+        return new_line_count
+
+    def _line_for_row(self, index):
+        """Returns the `Line` of a row, for the sections to hold."""
+
+        return self._line_table.line(index)
+
+    def _replace_cached_lines(self, start_line, end_line, new_line_count):
+        """Updates the cached `Line` objects (of `lines`) after an edit.
+
+        The rows from `start_line` up to `end_line` were replaced by
+        `new_line_count` rows.
+        """
+
+        # The objects are created again from the edit onwards.
+        del self._lines[start_line:]
+
+    def __structure_types(self, start_line, end_line, processed_only):
+        """Returns the types of the rows that change the sections.
+
+        That is, the set with the instructions and the end of lyrics found in
+        the rows. With `processed_only`, the rows after the end of lyrics are
+        skipped.
+        """
+
+        if processed_only:
+            # The row with the end of lyrics is considered processed.
+            last_row = self._parsed_line_count
+            if self._end_of_lyrics_reached:
+                last_row += 1
+
+            end_line = min(end_line, last_row)
+
+        structure_types = set()
+        for index in range(start_line, end_line):
+            line_type = self._line_table.type(index)
+            if line_type in (Line.TYPE_INSTRUCTION, Line.TYPE_END):
+                structure_types.add(line_type)
+
+        return structure_types
+
+    def __same_instruction(self, instruction, line):
+        """Determines if an instruction line yields the same section."""
+
+        new_instruction = Instruction(line.instruction_text, self.section_registry)
+
+        return (instruction.section_type == new_instruction.section_type
+            and instruction.is_repeat == new_instruction.is_repeat
+            and instruction.section_to_repeat == new_instruction.section_to_repeat)
+
+    def __update_section_rows(self, start_line, end_line, new_line_count):
+        """Replaces the lines of the section that holds the edited rows.
+
+        The rows hold no instructions, so they all belong to one section:
+        the last one starting before `start_line`.
+        """
+
+        section_index = bisect_left(self._section_rows, start_line) - 1
+        section = self._section_list[section_index]
+
+        # The lines of the section from the draft are the last ones, after
+        # the instruction and the lines of the repeated section.
+        position = len(section.lines) - (self.__section_end_row(section_index) - start_line)
+        new_lines = []
+        for index in range(start_line, start_line + new_line_count):
+            new_lines.append(self._line_for_row(index))
+
+        section.replace_lines(position, position + (end_line - start_line), new_lines)
+
+        delta = new_line_count - (end_line - start_line)
+        if delta != 0:
+            self._parsed_line_count += delta
+            self.__shift_section_rows(section_index + 1, delta)
+
+        self.__invalidate_repeats(section)
+
+    def __update_sections(self, start_line, end_line, new_line_count):
+        """Parses again the sections around edited rows with instructions.
+
+        Only the sections holding the rows are replaced, by the ones found in
+        their lines after the edit: the first one keeps its instruction (it
+        starts before `start_line`), and the last one ends where the next
+        section starts. Of the sections that follow, only the ones of the
+        types added or removed are numbered again (and their repeats resolved
+        again); the rest only get their rows moved.
+        """
+
+        first_index = bisect_left(self._section_rows, start_line) - 1
+        last_index = bisect_left(self._section_rows, end_line)
+        delta = new_line_count - (end_line - start_line)
+
+        first_row = self._section_rows[first_index]
+        end_row = self.__section_end_row(last_index - 1) + delta
+
+        # The sections of the rows after the edit, with their instructions.
+        if first_row < 0:
+            new_sections = [(self.__create_unassigned_section(), None)]
+        else:
+            ins, section = self.__create_section(self._line_for_row(first_row))
+            new_sections = [(section, ins)]
+        new_rows = [first_row]
+
+        for index in range(first_row + 1, end_row):
+            line = self._line_for_row(index)
+            if line.is_instruction:
+                ins, section = self.__create_section(line)
+                new_sections.append((section, ins))
+                new_rows.append(index)
+            else:
+                new_sections[-1][0].add_line(line)
+
+        old_sections = self._section_list[first_index:last_index]
+        if last_index == len(self._section_list):
+            self._current_section = new_sections[-1][0]
+
+        self._section_list[first_index:last_index] = [section for section, _ in new_sections]
+        self._section_rows[first_index:last_index] = new_rows
+
+        next_index = first_index + len(new_sections)
+        if delta != 0:
+            self._parsed_line_count += delta
+            self.__shift_section_rows(next_index, delta)
+
+        # The sections that follow take their rows from a new position only
+        # if the number of sections changed.
+        end_index = next_index
+        if len(new_sections) != len(old_sections):
+            end_index = len(self._section_list)
+
+        for index in range(first_index, end_index):
+            self._section_list[index].number_lines(self._section_rows, index)
+
+        self.__index_new_sections(first_index, old_sections, new_sections)
+
+    def __index_new_sections(self, first_index, old_sections, new_sections):
+        """Replaces the old sections by the new ones in the indexes.
+
+        The sections are at `first_index` in the list already. The sections
+        of the types of either the old or the new ones that follow them get
+        their number (and id) again, and the repeats of those types are
+        resolved again.
+        """
+
+        section_index = self._section_index
+        section_keys = self._section_keys
+        section_count = self._section_count
+
+        # The new sections of each type (the unassigned one is always first).
+        sections_by_type = OrderedDict()
+        for section, ins in new_sections:
+            if ins is None:
+                section_index[(Section.TYPE_UNASSIGNED, 1)] = section
+                section_keys[section] = (Section.TYPE_UNASSIGNED, 1)
+            else:
+                sections_by_type.setdefault(ins.section_type, []).append(section)
+
+        # The number of sections of each type before the new ones.
+        preceding_counts = {}
+        old_counts = Counter()
+        for section in old_sections:
+            section_type, ordinal = section_keys.pop(section)
+            if section_type != Section.TYPE_UNASSIGNED:
+                sections_by_type.setdefault(section_type, [])
+                preceding_counts.setdefault(section_type, ordinal - 1)
+                old_counts[section_type] += 1
+
+        self.__count_preceding_sections(first_index, preceding_counts, sections_by_type)
+
+        for section_type, type_sections in sections_by_type.items():
+            preceding_count = preceding_counts[section_type]
+            count = section_count.get(section_type, 0)
+
+            # The sections of the type that follow keep their order.
+            for ordinal in range(preceding_count + old_counts[section_type] + 1, count + 1):
+                type_sections.append(section_index[(section_type, ordinal)])
+
+            for ordinal in range(preceding_count + 1, count + 1):
+                del section_index[(section_type, ordinal)]
+
+            for ordinal, section in enumerate(type_sections, preceding_count + 1):
+                section_index[(section_type, ordinal)] = section
+                section_keys[section] = (section_type, ordinal)
+
+            section_count[section_type] = preceding_count + len(type_sections)
+
+        # The repeats of the types (but the old ones), with their new numbers.
+        repeats = []
+        for section, section_type, ordinal, repeat_ordinal in self._repeats:
+            if section_type in sections_by_type and section in section_keys:
+                repeats.append((section, section_type, section_keys[section][1], repeat_ordinal))
+
+        for section, ins in new_sections:
+            if ins is not None and ins.is_repeat:
+                repeats.append((section, ins.section_type, section_keys[section][1], ins.repeat_ordinal))
+
+        # In the order of the draft, within each type.
+        repeats.sort(key = lambda repeat: (repeat[1], repeat[2]))
+
+        # The ids before the new sections do not change, but the rest are
+        # added again (to keep the order of the draft).
+        sections = self._sections
+        while len(sections) > first_index:
+            sections.popitem()
+
+        for section in islice(self._section_list, first_index, None):
+            section_type, ordinal = section_keys[section]
+            sections[section_type + str(ordinal)] = section
+
+        # The old sections stop repeating (and being repeated) once the
+        # repeats of their types are resolved again.
+        for section in old_sections:
+            if section.clone_source is not None:
+                self._repeated_by[section.clone_source].remove(section)
+
+        self._repeats = [repeat for repeat in self._repeats if repeat[1] not in sections_by_type] + repeats
+        self.__resolve_repeats(repeats)
+
+        for section in old_sections:
+            self._repeated_by.pop(section, None)
+
+    def __count_preceding_sections(self, section_index, counts, section_types):
+        """Finds the number of sections of each type before the given one.
+
+        The `counts` already known (by type) are kept; the rest are added,
+        looking back from the given section to the last one of each type.
+        """
+
+        missing_types = set(section_types) - set(counts)
+
+        index = section_index - 1
+        while len(missing_types) > 0 and index > 0:
+            section_type, ordinal = self._section_keys[self._section_list[index]]
+            if section_type in missing_types:
+                counts[section_type] = ordinal
+                missing_types.discard(section_type)
+
+            index -= 1
+
+        for section_type in missing_types:
+            counts[section_type] = 0
+
+    def __section_end_row(self, section_index):
+        """Returns the row where the given section ends (not included)."""
+
+        if section_index + 1 < len(self._section_rows):
+            return self._section_rows[section_index + 1]
+
+        return self._parsed_line_count
+
+    def __shift_section_rows(self, first_section_index, delta):
+        """Moves the rows of the sections from the given one onwards.
+
+        The lines are numbered from the rows of their sections, so they are
+        renumbered without changing them. The list is changed in place, since
+        the sections keep it.
+        """
+
+        section_rows = self._section_rows
+        section_rows[first_section_index:] = [row + delta for row in islice(section_rows, first_section_index, None)]
+
+    def __invalidate_repeats(self, section):
+        """Invalidates the sections that repeat (share lines with) the given one."""
+
+        for repeat_section in self._repeated_by.get(section, ()):
+            repeat_section._invalidate()
+
+            # The repeat may be repeated as well.
+            self.__invalidate_repeats(repeat_section)
+
+    def __start_parsing(self):
+        """Sets the state to parse the draft from its first line."""
 
         self._sections = OrderedDict()
+        self._section_count = self.__create_section_count()
 
         # Create an unassigned section, where everything will fall until
         # another section is created (hopefully the [Title]).
         self._sections['Unassigned1'] = self.__create_unassigned_section()
 
         # The current section will be the unassigned section.
-        current_section = self._sections['Unassigned1']
-        # Loop thru each object line to find which are instructions.
-        for line in self.lines:
-            if line.is_instruction:
-                current_section = self.__parse_instruction(line)
-            elif line.is_end_of_lyrics:
-                break
-            else:
-                # If no instruction or end of lyrics, add line to section.
-                current_section.add_line(line)
+        self._current_section = self._sections['Unassigned1']
+        self._parsed_line_count = 0
+        self._end_of_lyrics_reached = False
 
-        return self._sections
+        # The unassigned section has no instruction, so it starts before the
+        # first row.
+        self._section_rows = [-1]
+        self._section_list = [self._current_section]
+        self._current_section.number_lines(self._section_rows, 0)
+        self._repeated_by = {}
+
+        self._section_index = {(Section.TYPE_UNASSIGNED, 1): self._current_section}
+        self._section_keys = {self._current_section: (Section.TYPE_UNASSIGNED, 1)}
+        self._repeats = []
+        self._repeats_dirty = False
+
+        self._line_type_counts = Counter()
+        self._stats = None
+
+    def __create_section_count(self):
+        """Creates the counter of sections per type."""
+
+        section_count = {
+            # This value of unassigned is hardcoded since is only one.
+            Section.TYPE_UNASSIGNED: 1,
+        }
+
+        for section_type in self.__get_section_registry().types:
+            section_count[section_type] = 0
+
+        return section_count
+
+    def __get_section_registry(self):
+        """Returns the `SectionRegistry` of the instructions."""
+
+        if self.section_registry is None:
+            return default_registry
+
+        return self.section_registry
 
     def __create_unassigned_section(self):
         """Creates the UnassignedSection"""
@@ -190,56 +973,128 @@ class Draft:
 
         return unassigned_section
 
-    def __parse_instruction(self, line):
-        """Receives the instruction line to create a new section."""
+    def __parse_instruction(self, line, row):
+        """Receives the instruction line (and its row) to create a new section."""
+
+        ins, new_section = self.__create_section(line)
+
+        self._repeats_dirty = True
+        self._section_rows.append(row)
+        self._section_list.append(new_section)
+        new_section.number_lines(self._section_rows, len(self._section_list) - 1)
 
-        ins = Instruction(line.instruction_text)
         # Creates the id of the new section.
-        self._section_count[ins.section_type] += 1
-        new_section_id = ins.section_type + str(self._section_count[ins.section_type])
+        section_type = ins.section_type
+        self._section_count[section_type] = self._section_count.get(section_type, 0) + 1
+        ordinal = self._section_count[section_type]
 
-        self._sections[new_section_id] = ins.create_section()
+        self._sections[section_type + str(ordinal)] = new_section
+        self._section_index[(section_type, ordinal)] = new_section
+        self._section_keys[new_section] = (section_type, ordinal)
+
+        # If instruction is a repeat instruction, the target may come later
+        # in the draft (see `__resolve_repeats`).
+        if ins.is_repeat:
+            self._repeats.append((new_section, section_type, ordinal, ins.repeat_ordinal))
+
+            # A repeat of an earlier section is resolved right away, so it has
+            # its lines when yielded by `iter_sections`; the repeats of later
+            # sections wait until the lines are processed.
+            target_ordinal = self.__target_ordinal(ordinal, ins.repeat_ordinal)
+            if target_ordinal < ordinal:
+                self.__set_repeat_target(new_section, self._section_index[(section_type, target_ordinal)])
+
+        return new_section
+
+    def __create_section(self, line):
+        """Creates the section of an instruction line, returning (instruction, section)."""
+
+        ins = Instruction(line.instruction_text, self.section_registry)
+
+        new_section = ins.create_section()
 
         # Add the instruction line as first line.
-        self._sections[new_section_id].add_line(line)
+        new_section.add_line(line)
 
-        # If instruction is a repeat instruction, clone lines.
-        self.__parse_repeat_instruction(ins, self._sections[new_section_id])
+        return ins, new_section
 
-        return self._sections[new_section_id]
+    @staticmethod
+    def __target_ordinal(ordinal, repeat_ordinal):
+        """Returns the number of the section to repeat, within its type."""
 
-    def __parse_repeat_instruction(self, instruction, current_section):
-        """Copies the lines from another section into the new one."""
+        # A section repeating itself repeats the first one instead.
+        if repeat_ordinal == ordinal:
+            return 1
 
-        # If instruction is not repeat, nothing to do here.
-        if not instruction.is_repeat:
-            return
+        return repeat_ordinal
+
+    def __resolve_repeats(self, repeats = None):
+        """Shares the lines of the repeated sections with the repeats.
+
+        If the section to repeat does not exist (yet), the first section of
+        the type is repeated instead. A section is never repeated if it would
+        end up repeating itself, directly or through other repeats; the
+        repeats of earlier sections are resolved first, so they win over the
+        ones looking ahead.
 
-        # If instruction type has nothing to be able to clone, we bail.
-        if self._section_count[instruction.section_type] < 2:
+        The targets are found again every time (since the lines added may
+        bring the missing sections), but only the repeats whose target
+        changed are updated. Given the `repeats` (of `_repeats`) of some
+        types of section, only those are resolved: a section repeats another
+        one of its type, so the repeats of other types are not affected.
+        """
+
+        targets = {}
+
+        if repeats is None:
+            repeats = self._repeats
+
+        # The repeats of earlier sections first (the sort is stable).
+        ordered_repeats = sorted(repeats, key = lambda repeat: self.__target_ordinal(repeat[2], repeat[3]) > repeat[2])
+
+        for section, section_type, ordinal, repeat_ordinal in ordered_repeats:
+            target_ordinal = self.__target_ordinal(ordinal, repeat_ordinal)
+            target_section = self._section_index.get((section_type, target_ordinal))
+            if target_section is None:
+                target_section = self._section_index.get((section_type, 1))
+
+            if target_section is not None and not self.__repeats_section(targets, target_section, section):
+                targets[section] = target_section
+
+        # The repeats whose target changed stop repeating first, so there is
+        # never a cycle of repeats while the new targets are set.
+        for section, section_type, ordinal, repeat_ordinal in repeats:
+            if section.clone_source is not targets.get(section):
+                self.__set_repeat_target(section, None)
+
+        for section, section_type, ordinal, repeat_ordinal in repeats:
+            self.__set_repeat_target(section, targets.get(section))
+
+    def __repeats_section(self, targets, section, other_section):
+        """Determines if a section is (or repeats) the other one."""
+
+        while section is not None:
+            if section is other_section:
+                return True
+
+            section = targets.get(section)
+
+        return False
+
+    def __set_repeat_target(self, section, target_section):
+        """Makes the section repeat the target one (if any), instead of the prior one."""
+
+        prior_target = section.clone_source
+        if prior_target is target_section:
             return
 
-        # If target section is current section.
-        current_section_id = current_section.type + str(self._section_count[instruction.section_type])
-        if current_section_id == instruction.section_to_repeat:
-            # If the ids are the same, we try to copy the first section in the draft.
-            section_to_repeat = instruction.section_type + '1'
-        else:
-            # If not current section, we try to search for the given section number.
-            section_to_repeat = instruction.section_to_repeat
-
-        target_section = None
-        # Look for the wanted section in the dictionary (as long as is not itself)
-        if section_to_repeat in self._sections:
-            target_section = self._sections[section_to_repeat]
-
-        # If the id is not present, we assume the id is wrong, so we
-        # default to the 'Section1'.
-        if target_section is None:
-            section_to_repeat = instruction.section_type + '1'
-            if section_to_repeat in self._sections:
-                target_section = self._sections[section_to_repeat]
-
-        # Here, we already have the target section to clone.
-        line_no = current_section.lines[0].draft_line_number
-        current_section.clone(target_section, line_no)
+        if prior_target is not None:
+            self._repeated_by[prior_target].remove(section)
+
+        section.clone(target_section, section.lines[0].draft_line_number)
+        # The lines of the section changed, so those of its repeats did too.
+        self.__invalidate_repeats(section)
+
+        # Keep track of the repeat, to invalidate it if the target is edited.
+        if target_section is not None:
+            self._repeated_by.setdefault(target_section, []).append(section)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Statistics of a processed draft, as immutable objects.
+
+They are created by `Draft.stats` from the counts the sections already keep
+(so only the sections changed since the last request are counted again),
+and the draft drops them whenever its text changes.
+"""
+
+from collections import namedtuple
+from types import MappingProxyType
+
+# Counts of a single section, identified as in `Draft._sections` ('Verse2').
+SectionStats = namedtuple('SectionStats', ('id', 'type', 'word_count', 'line_count'))
+
+# Counts of the whole draft:
+#   word_count, line_count:
+#       the words and printable lines of all the sections.
+#   sections:
+#       a tuple with the `SectionStats` of each section, in order.
+#   section_types:
+#       a mapping of section type to the number of sections of the type.
+#   line_types:
+#       a mapping of line type (the `Line.TYPE_*` codes) to the number of
+#       processed lines of the type (the end of lyrics and the lines after
+#       it are not processed).
+DraftStats = namedtuple('DraftStats', ('word_count', 'line_count', 'sections', 'section_types', 'line_types'))
+
+
+def create_draft_stats(sections, line_type_counts):
+    """Creates the `DraftStats` from the sections (by id) and line types."""
+
+    word_count = 0
+    line_count = 0
+    section_stats = []
+    section_types = {}
+
+    for section_id, section in sections.items():
+        section_word_count = section.word_count
+        section_line_count = section.line_count
+
+        word_count += section_word_count
+        line_count += section_line_count
+        section_stats.append(SectionStats(section_id, section.type, section_word_count, section_line_count))
+        section_types[section.type] = section_types.get(section.type, 0) + 1
+
+    line_types = {}
+    for line_type, count in line_type_counts.items():
+        if count > 0:
+            line_types[line_type] = count
+
+    return DraftStats(
+        word_count,
+        line_count,
+        tuple(section_stats),
+        MappingProxyType(section_types),
+        MappingProxyType(line_types),
+    )
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+from collections import namedtuple
+
+from letrista.draft import Draft
+from letrista.editable_line import EditableLine
+
+# An edit of the draft, as recorded for undo and redo: the first row, the
+# text of the rows before and after the edit (end of lines included), and
+# the number of rows each one has.
+EditDelta = namedtuple('EditDelta', ('line', 'old_text', 'new_text', 'old_line_count', 'new_line_count'))
+
+class EditableDraft(Draft):
+    """Draft whose lines are `EditableLine` objects, kept in sync with it.
+
+    The lines in `lines` are the same objects the sections hold, so editing
+    one of them (with `comment`, `uncomment`, `toggle_comment` or
+    `add_syllable_count`) is applied to the draft right away, as an
+    `apply_edit` of its row: the text, the sections and the stats are updated
+    without building the draft again.
+
+    Every edit (of a line, `apply_edit`, or the bulk operations) is recorded
+    as an `EditDelta`, to be reverted with `undo` and applied again with
+    `redo`. The text added with `add_text` is not an edit.
+
+    The `EditableLine` objects are kept while their row is not removed, even
+    if the rows above change. Their draft line number is taken from the
+    section holding them, so the lines below an edit are not changed; only
+    the lines after the end of lyrics (held by no section) are renumbered.
+    """
+
+    def __init__(self, draft_lyrics = ''):
+        """Generates the draft from the initial string."""
+
+        # Edits to undo (the last one at the end), and the undone ones.
+        self._undo_deltas = []
+        self._redo_deltas = []
+        self._recording = True
+
+        super().__init__(draft_lyrics)
+
+    @property
+    def lines(self):
+        """Lines in the draft (as `EditableLine` objects).
+
+        The draft is processed the first time, so the lines are numbered by
+        the sections holding them.
+        """
+
+        if self._sections is None:
+            self.process_lines()
+
+        for index in range(len(self._lines), len(self._line_table)):
+            self._lines.append(self.__create_line(index))
+
+        return self._lines
+
+    @property
+    def can_undo(self):
+        """Determines if there are edits to undo."""
+
+        return len(self._undo_deltas) > 0
+
+    @property
+    def can_redo(self):
+        """Determines if there are undone edits to apply again."""
+
+        return len(self._redo_deltas) > 0
+
+    def apply_edit(self, start_line, end_line, new_text):
+        """Replaces the lines, recording the edit (see `Draft.apply_edit`)."""
+
+        table = self._line_table
+        start_line, end_line = self._edit_range(start_line, end_line)
+
+        if len(new_text) > 0 and new_text[-1] != '\n':
+            new_text = new_text + '\n'
+
+        old_text = table.slice(start_line, end_line)
+        row_count = len(table)
+
+        super().apply_edit(start_line, end_line, new_text)
+
+        new_line_count = len(table) - row_count + (end_line - start_line)
+        self.__renumber_lines(max(start_line, self._parsed_line_count))
+
+        if self._recording:
+            self._undo_deltas.append(EditDelta(start_line, old_text, new_text, end_line - start_line, new_line_count))
+            self._redo_deltas = []
+
+    def undo(self):
+        """Reverts the last edit, returning its `EditDelta` (None if no edits)."""
+
+        if not self.can_undo:
+            return None
+
+        delta = self._undo_deltas.pop()
+        self.__apply_delta(delta.line, delta.line + delta.new_line_count, delta.old_text)
+        self._redo_deltas.append(delta)
+
+        return delta
+
+    def redo(self):
+        """Applies the last undone edit, returning its `EditDelta` (or None)."""
+
+        if not self.can_redo:
+            return None
+
+        delta = self._redo_deltas.pop()
+        self.__apply_delta(delta.line, delta.line + delta.old_line_count, delta.new_text)
+        self._undo_deltas.append(delta)
+
+        return delta
+
+    def _line_for_row(self, index):
+        """The sections hold the `EditableLine` objects of the draft."""
+
+        if index >= len(self._lines):
+            return self.lines[index]
+
+        return self._lines[index]
+
+    def _replace_cached_lines(self, start_line, end_line, new_line_count):
+        """Keeps the lines of the replaced rows, updating their text.
+
+        If there are more rows than before, the new ones get new objects; if
+        less, the objects of the rows removed are dropped.
+        """
+
+        lines = self._lines
+        if start_line >= len(lines):
+            return
+
+        if end_line > len(lines):
+            self.__drop_lines(start_line, len(lines))
+
+            return
+
+        table = self._line_table
+        kept_count = min(end_line - start_line, new_line_count)
+
+        for index in range(start_line, start_line + kept_count):
+            line = lines[index]
+            text = table.text(index)
+
+            # The lines edited by themselves have the text already.
+            if line._original_text != text:
+                line._original_text = text
+                line._invalidate()
+
+            line._type = table.type(index)
+
+        self.__drop_lines(start_line + kept_count, end_line)
+
+        new_lines = []
+        for index in range(start_line + kept_count, start_line + new_line_count):
+            new_lines.append(self.__create_line(index))
+
+        lines[start_line + kept_count:start_line + kept_count] = new_lines
+
+    def __renumber_lines(self, start_line):
+        """Numbers the lines from `start_line` by their row.
+
+        The rows from the end of lyrics onwards are held by no section (or
+        by the ones before the edit, if the end of lyrics moved up), so they
+        are numbered by themselves.
+        """
+
+        lines = self._lines
+
+        for index in range(start_line, len(lines)):
+            line = lines[index]
+            line._anchor = None
+            line._draft_line_number = index + 1
+
+    def __create_line(self, index):
+        """Creates the `EditableLine` of a row, listening to its changes."""
+
+        table = self._line_table
+
+        line = EditableLine(table.text(index), draft_line_number = (index + 1))
+        line._type = table.type(index)
+        line._listener = self.__line_changed
+
+        return line
+
+    def __drop_lines(self, start, end):
+        """Removes the lines from the draft, so they are no longer listened."""
+
+        for line in self._lines[start:end]:
+            line._listener = None
+
+        del self._lines[start:end]
+
+    def __line_changed(self, line, old_text):
+        """Applies the change of a line to the draft."""
+
+        row = line.draft_line_number - 1
+
+        # The end of line is added, so an empty text does not remove the row.
+        self.apply_edit(row, row + 1, line._original_text + '\n')
+
+    def __apply_delta(self, start_line, end_line, text):
+        """Replaces the rows without recording the edit."""
+
+        self._recording = False
+        try:
+            self.apply_edit(start_line, end_line, text)
+        finally:
+            self._recording = True
@@ -20,8 +20,14 @@ class EditableLine(Line):
         uncomment()
         toggle_comment()
         add_syllable_count()
+
+    If the line has a `_listener` (as the lines of an `EditableDraft` do),
+    it is called with the line and its prior text after every change.
     """
 
+    # Callable to notify of the changes of the text.
+    _listener = None
+
     def comment(self):
         """Comments the current line.
 
@@ -39,13 +45,14 @@ class EditableLine(Line):
         if (self.type in (Line.TYPE_SCHEMA, Line.TYPE_COUNT)
             and self._original_text[1] == ' '):
             # If the line is has schema or count, we define what to do based on our second position.
-            self._original_text = self._original_text[0] + '-' + self._original_text[2:]
+            new_text = self._original_text[0] + '-' + self._original_text[2:]
         else:
             # For everything else, we just append two dashes at the beginning.
-            self._original_text = '--' + self._original_text;
+            new_text = '--' + self._original_text;
 
-        # Reset the type (for if this happens to be a TYPE_END line).
-        self._type = self.TYPE_UNSET
+        # Reset the type (for if this happens to be a TYPE_END line), and
+        # the text calculated from it.
+        self._set_original_text(new_text)
 
     def uncomment(self):
         """Removes the comment symbol from a given line."""
@@ -55,12 +62,12 @@ class EditableLine(Line):
             return
 
         if self._original_text.startswith('--'):
-            self._original_text = self._original_text[2:]
+            new_text = self._original_text[2:]
         else:
-            self._original_text = self._original_text[0] + ' ' + self._original_text[2:]
+            new_text = self._original_text[0] + ' ' + self._original_text[2:]
 
-        # Reset the type.
-        self._type = self.TYPE_UNSET
+        # Reset the type and the text calculated from it.
+        self._set_original_text(new_text)
 
     def toggle_comment(self):
         """Comments an uncommented line. Uncomments a commented one."""
@@ -87,8 +94,24 @@ class EditableLine(Line):
 
         # Add the default count if has schema. Schema and count otherwise.
         if self.type == Line.TYPE_SCHEMA:
-            self._original_text = self._original_text[0] + ' __ ' + self._original_text[2:]
+            new_text = self._original_text[0] + ' __ ' + self._original_text[2:]
         else:
-            self._original_text = 'X __ ' + self._original_text
-        # New type is TYPE_COUNT.
-        self._type = self.TYPE_COUNT
+            new_text = 'X __ ' + self._original_text
+        # New type is TYPE_COUNT (the text has to be calculated again).
+        self._set_original_text(new_text, self.TYPE_COUNT)
+
+    def _set_original_text(self, text, line_type = Line.TYPE_UNSET):
+        """Changes the text of the line, and notifies the `_listener`.
+
+        The values calculated from the prior text are dropped, and the type
+        is set to `line_type` (or calculated again, if TYPE_UNSET).
+        """
+
+        old_text = self._original_text
+        self._original_text = text
+
+        self._invalidate()
+        self._type = line_type
+
+        if self._listener is not None:
+            self._listener(self, old_text)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Fused extraction of the printable text of a line.
+
+Getting the text of a line takes three steps: cutting the count or schema
+prefix, cutting the inline comment (started with --), and removing the inner
+rhyme scheme (the ^A or ^00 markers). They are done here in one go, slicing
+the original text instead of building the output a character at a time.
+
+The marks removed that way (rhyme letter, syllable count and hats) are read
+by `extract_prosody`, so they do not have to be parsed again from the text.
+"""
+
+from collections import namedtuple
+
+from letrista import classifier
+
+# Length of the prefix to cut for each of the printable types.
+_PREFIX_LENGTHS = {
+    classifier.TYPE_COUNT: 5,   # "X ## lyrics"
+    classifier.TYPE_SCHEMA: 2,  # "X lyrics"
+    classifier.TYPE_LYRICS: 0,  # "lyrics"
+}
+
+# Marks of a line:
+#   rhyme_letter:
+#       the first character of count and schema lines ('' for the rest).
+#   declared_count:
+#       the syllable count of count lines, as an integer; None for the rest,
+#       and for the undetermined counts ('__' or 'xx').
+#   hat_positions:
+#       a tuple with the position of each hat (^) within the original text,
+#       leaving out the ones in the inline comment.
+Prosody = namedtuple('Prosody', ('rhyme_letter', 'declared_count', 'hat_positions'))
+
+# Marks of the lines that do not print anything.
+_NO_PROSODY = Prosody('', None, ())
+
+
+def extract_text(text, line_type):
+    """Returns the printable text of a line of the given type.
+
+    The types not in `_PREFIX_LENGTHS` (instructions, comments, empty lines,
+    and so on) do not print anything.
+    """
+
+    prefix_length = _PREFIX_LENGTHS.get(line_type)
+    if prefix_length is None:
+        return ''
+
+    text = text.strip()
+
+    # The inline comment is searched after the prefix, and the text before it
+    # is trimmed (only in that case, as the original processing did).
+    comment_pos = text.find('--', prefix_length)
+    if comment_pos > -1:
+        text = text[prefix_length:comment_pos].strip()
+    elif prefix_length > 0:
+        text = text[prefix_length:]
+
+    # Fast path: most lines have no inner rhyme scheme.
+    if '^' not in text:
+        return text
+
+    return _remove_hats(text)
+
+
+def extract_prosody(text, line_type):
+    """Returns the `Prosody` marks of a line of the given type."""
+
+    prefix_length = _PREFIX_LENGTHS.get(line_type)
+    if prefix_length is None:
+        return _NO_PROSODY
+
+    stripped = text.lstrip()
+    leading_length = len(text) - len(stripped)
+
+    rhyme_letter = ''
+    declared_count = None
+    if prefix_length > 0:
+        rhyme_letter = stripped[0]
+
+    if line_type == classifier.TYPE_COUNT:
+        # As in the classifier, the count is in the original text.
+        count_marker = text[2:4]
+        if count_marker.isdecimal():
+            declared_count = int(count_marker)
+
+    # The hats are searched as the text is extracted: after the prefix, and
+    # up to the inline comment.
+    start = leading_length + prefix_length
+    end = text.find('--', start)
+    if end < 0:
+        end = len(text)
+
+    hat_positions = []
+    hat_pos = text.find('^', start, end)
+    while hat_pos > -1:
+        hat_positions.append(hat_pos)
+        hat_pos = text.find('^', hat_pos + 1, end)
+
+    return Prosody(rhyme_letter, declared_count, tuple(hat_positions))
+
+
+def _remove_hats(text):
+    """Removes the inner rhyme scheme, denoted by the ^A or ^00.
+
+    After a hat, digits and more hats are removed until an uppercase letter
+    is found, which is also removed. Any other character is kept, and the
+    search for that uppercase letter goes on.
+    """
+
+    parts = []
+    length = len(text)
+
+    # Text before the first hat is kept as is.
+    hat_pos = text.find('^')
+    parts.append(text[:hat_pos])
+    i = hat_pos + 1
+
+    while i < length:
+        char = text[i]
+
+        if char == '^' or char.isdigit():
+            # Still within the marker.
+            i += 1
+        elif char.isupper():
+            # End of the marker: copy everything up to the next hat.
+            hat_pos = text.find('^', i + 1)
+            if hat_pos < 0:
+                parts.append(text[i + 1:])
+
+                break
+
+            parts.append(text[i + 1:hat_pos])
+            i = hat_pos + 1
+        else:
+            # Keep the run of characters that do not end the marker.
+            run_start = i
+            i += 1
+            while i < length:
+                char = text[i]
+                if char == '^' or char.isdigit() or char.isupper():
+                    break
+                i += 1
+
+            parts.append(text[run_start:i])
+
+    return ''.join(parts)
@@ -2,6 +2,8 @@
 # -*- coding: utf-8 -*-
 # Copyright (c) 2023 Carlos Ramos.
 
+from letrista import classifier
+from letrista import extractor
 
 class Line:
     """Represents a line within the draft.
@@ -25,24 +27,29 @@ class Line:
     The properties this class uses are:
       - _draft_line_number:
           to know the original number the line of text held in the draft.
+      - _anchor and _line_offset:
+          the section numbering the line (if any), and the offset of the line
+          from the first line of the section. When set, the number is taken
+          from the section, so the line is not changed when the rows above it
+          are edited.
       - _original_text:
           is the unprocessed text, as was received for the string list. As such,
           is the line of text without the end of line.
     """
 
-    # Constants for line type.
-    TYPE_UNSET       = 0  # The type of the line has not been yet determined
-    TYPE_COUNT       = 1  # "X ## lyrics"  -- Includes rhyme scheme and syllable count
-    TYPE_SCHEMA      = 2  # "X lyrics"     -- Includes only the rhyme scheme
-    TYPE_SKIP        = 3  # "\n"           -- Just a line skip
-    TYPE_LYRICS      = 4  # "lyrics"       -- Just lyrics, no indicators
-    TYPE_INSTRUCTION = 5  # "["            -- Line that begins with "["
-    TYPE_COMMENT     = 6  # "A-## lyrics"  -- Any line with "-" in second position
-    TYPE_END         = 7  # "********"     -- End of lyrics (5 or more same char)
-    TYPE_IGNORED     = 8  # Any line after the TYPE_END line.
+    # Constants for line type (the codes are shared with the classifier).
+    TYPE_UNSET       = classifier.TYPE_UNSET        # The type of the line has not been yet determined
+    TYPE_COUNT       = classifier.TYPE_COUNT        # "X ## lyrics"  -- Includes rhyme scheme and syllable count
+    TYPE_SCHEMA      = classifier.TYPE_SCHEMA       # "X lyrics"     -- Includes only the rhyme scheme
+    TYPE_SKIP        = classifier.TYPE_SKIP         # "\n"           -- Just a line skip
+    TYPE_LYRICS      = classifier.TYPE_LYRICS       # "lyrics"       -- Just lyrics, no indicators
+    TYPE_INSTRUCTION = classifier.TYPE_INSTRUCTION  # "["            -- Line that begins with "["
+    TYPE_COMMENT     = classifier.TYPE_COMMENT      # "A-## lyrics"  -- Any line with "-" in second position
+    TYPE_END         = classifier.TYPE_END          # "********"     -- End of lyrics (5 or more same char)
+    TYPE_IGNORED     = classifier.TYPE_IGNORED      # Any line after the TYPE_END line.
 
     # Symbols used to mark the end of document or end of lyrics.
-    SYMBOLS_FOR_EOD = ('*', '-', '#', '/')
+    SYMBOLS_FOR_EOD = classifier.SYMBOLS_FOR_EOD
 
     def __init__(self, text, draft_line_number = 0, eol_or_unassigned = False):
         """Creates the object with the text and original draft number.
@@ -58,16 +65,24 @@ class Line:
 
         self._original_text = text
         self._draft_line_number = draft_line_number
+        self._anchor = None
+        self._line_offset = 0
 
         if eol_or_unassigned is True:
             self._type = self.TYPE_IGNORED
         else:
             self._type = self.TYPE_UNSET
 
+        # Values calculated from the text, only once (see `_invalidate`).
+        self._text = None
+        self._word_count = -1
+        self._is_printable = None
+        self._prosody = None
+
     def __str__(self):
         """Returns the draft line number and original text."""
 
-        string  = str(self._draft_line_number).zfill(3)
+        string  = str(self.draft_line_number).zfill(3)
         string += " "
         string += self._original_text
 
@@ -112,62 +127,14 @@ class Line:
               If we do not have anything else special in the line, this is just lyrics.
         """
 
-        text = self._original_text.strip()
-
         # First check: TYPE_UNSET or TYPE_IGNORED
         # This will return the TYPE_IGNORED if set in the constructor, or the
         # already calculated type from a prior run of this function.
         if self._type != self.TYPE_UNSET:
             return self._type
 
-        # Second check: TYPE_SKIP
-        if len(text) == 0:
-            self._type = self.TYPE_SKIP
-
-            # If we found a match, we return.
-            return self._type
-
-        # Third check: TYPE_END
-        for symbol in self.SYMBOLS_FOR_EOD:
-            # This test is performed with original text rather than the trimmed
-            # version, since we want to ensure the ruler is at the beginning of
-            # the line only.
-            if self._original_text.startswith(symbol * 5):
-                self._type = self.TYPE_END
-
-                # If we found a match, we return.
-                return self._type
-
-        # Fourth check: TYPE_COMMENT
-        if len(text) > 1 and text[1] == '-':
-            self._type = self.TYPE_COMMENT
-
-            # If we found a match, we return.
-            return self._type
-
-        # Fifth check: TYPE_INSTRUCTION
-        if text.startswith('['):
-            self._type = self.TYPE_INSTRUCTION
-
-            # If we found a match, we return.
-            return self._type
-
-        # Sixth check: TYPE_COUNT
-        if len(text) >= 4 and self.__line_has_count_indicator():
-            self._type = self.TYPE_COUNT
-
-            # If we found a match, we return.
-            return self._type
-
-        # Seventh check: TYPE_SCHEMA
-        if len(text) >= 2 and self.__line_has_schema_indicator():
-            self._type = self.TYPE_SCHEMA
-
-            # If we found a match, we return.
-            return self._type
-
-        # Last check: TYPE_LYRICS (the only reason we should have reached this place)
-        self._type = self.TYPE_LYRICS
+        # The rest of the checks are done in one pass by the classifier.
+        self._type = classifier.classify_line(self._original_text)
 
         return self._type
 
@@ -175,44 +142,24 @@ class Line:
     def text(self):
         """Returns the processed text of the line, depending on type"""
 
-        empty_types = (
-            self.TYPE_UNSET,       # Any unset line.
-            self.TYPE_SKIP,        # Any empty line.
-            self.TYPE_COMMENT,     # Any line that is a comment.
-            self.TYPE_IGNORED,     # Any line after the end of lyrics.
-            self.TYPE_INSTRUCTION, # Instructions do not print text.
-            self.TYPE_END          # The end of lyrics also yields no text.
-        )
-
-        if self.type in empty_types:
-            self._text = ''
-
+        # Return the calculated text if available.
+        if self._text is not None:
             return self._text
 
-        # With that, six of the nine types are done (and the processing starts).
-        text = self._original_text.strip()
-
-        # If TYPE_COUNT, remove the first five characters; if TYPE_SCHEMA, remove two.
-        if self.type == self.TYPE_COUNT:
-            text = text[5:]
-        elif self.type == self.TYPE_SCHEMA:
-            text = text[2:]
-
-        # Find and strip the inline comments.
-        text = self.__remove_inline_comments_from_text(text)
-        # Find and strip the inner rhyme scheme.
-        text = self.__remove_hat_inner_rhyme_scheme(text)
-
-        # Assign the processed text to the output.
-        self._text = text
+        # The prefix, inline comments and inner rhyme scheme are removed in
+        # one go (types that print nothing yield an empty string).
+        self._text = extractor.extract_text(self._original_text, self.type)
 
         return self._text
 
     @property
     def draft_line_number(self):
-        """Line number set at the constructor."""
+        """Line number set at the constructor (or by the section holding it)."""
 
-        return self._draft_line_number
+        if self._anchor is None:
+            return self._draft_line_number
+
+        return self._anchor.first_line_number + self._line_offset
 
     @property
     def is_instruction(self):
@@ -241,94 +188,63 @@ class Line:
     def is_printable(self):
         """Determines if a line has content to print."""
 
-        if len(self.text) > 0:
-            return True
+        if self._is_printable is None:
+            self._is_printable = len(self.text) > 0
 
-        return False
+        return self._is_printable
 
     @property
     def word_count(self):
         """Count the number of words in the printable text."""
 
-        return len(self.text.split())
-
-    def __line_has_count_indicator(self):
-        """Determines if a line has the syllable count indicator.
-
-        This functions looks at positions 3 and 4 (2 and 3 in programming)
-        for the following patterns:
-            [digit][digit]: Is the count of syllables.
-            __: Two underscores used as an undetermined amount.
-            xx: Used also as undetermined amount, wether caps or not.
-        """
-
-        text = self._original_text.lower()
-
-        # There is a count indicator if those two positions are digits.
-        if text[2].isdigit() and text[3].isdigit():
-            return True
+        # Return the calculated value.
+        if self._word_count > -1:
+            return self._word_count
 
-        # Or if the those two positions are '__':
-        if text[2] == '_' and text[3] == '_':
-            return True
+        self._word_count = len(self.text.split())
 
-        # Or if the those two positions are 'xx' (since this was lowered):
-        if text[2] == 'x' and text[3] == 'x':
-            return True
+        return self._word_count
 
-        return False
+    @property
+    def prosody(self):
+        """Returns the marks of the line (an `extractor.Prosody`).
 
-    def __line_has_schema_indicator(self):
-        """Determines if a line of text has teh schema indicator.
+        These are the rhyme letter, the declared syllable count and the
+        position of the hats, which are removed from the printable text.
+        """
 
-        This really does not need a function of itself, unless one wants to
-        add ignored syllables, such as 'A' (very common in English) and 'Y'
-        (which is very common in Spanish).
+        if self._prosody is None:
+            self._prosody = extractor.extract_prosody(self._original_text, self.type)
 
-        Since these are edge cases, I decided not to ignore them, as the line
-        can be converted from:
-          "A sunny day"
-        to:
-          "A A sunny day"
-        being the first 'A' part of the rhyme scheme (therefore overriding the
-        bad identification of the lyrics 'A').
-        """
+        return self._prosody
 
-        text = self._original_text.strip()
+    @property
+    def rhyme_letter(self):
+        """Rhyme scheme letter of the line ('' if the line has none)."""
 
-        if text[0].isupper() and not text[1].isalnum():
-            return True
+        return self.prosody.rhyme_letter
 
-        return False
+    @property
+    def declared_count(self):
+        """Syllable count written in the line (None if not given, as in '__')."""
 
-    def __remove_inline_comments_from_text(self, text):
-        """Finds and strips the inner comment, started with --, from the line."""
-        comment_pos = text.find('--')
-        if comment_pos > -1:
-            text = text[:comment_pos].strip()
+        return self.prosody.declared_count
 
-        return text
+    @property
+    def hat_positions(self):
+        """Positions of the hats (inner rhyme scheme) in the original text."""
 
-    def __remove_hat_inner_rhyme_scheme(self, text):
-        """Removes the inner rhyme scheme, denoted by the ^A or ^00."""
+        return self.prosody.hat_positions
 
-        new_string = ''
-        hat_flag = False
+    def _invalidate(self):
+        """Forgets the values calculated from the original text.
 
-        for i in range(len(text)):
-            if text[i] == '^':
-                hat_flag = True
-            elif hat_flag is True:
-                if text[i].isupper():
-                    # Hat flag is false, we skip this char but not the next.
-                    hat_flag = False
-                elif text[i].isdigit():
-                    # Hat flag keeps on being True, to remove all digits.
-                    hat_flag = True
-                else:
-                    new_string += text[i]
-            else:
-                # If no special condition, we just paste the character as is.
-                new_string += text[i]
+        Must be called every time `_original_text` changes, so the type, text
+        and word count are calculated again on the next access.
+        """
 
-        return new_string
+        self._type = self.TYPE_UNSET
+        self._text = None
+        self._word_count = -1
+        self._is_printable = None
+        self._prosody = None
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+import re
+from array import array
+from bisect import bisect_left
+from itertools import groupby
+
+from letrista import classifier
+from letrista.line import Line
+
+class LineTable:
+    """Compact, column-based storage of the lines of a draft.
+
+    Instead of a `Line` object per line (each one with its own `__dict__`),
+    the table keeps one array per property:
+
+      - _chunks and _row_chunks:
+          the text is kept in chunks of whole lines (of about `CHUNK_SIZE`
+          characters), and each row keeps the id of the chunk it is in (the
+          rows of a chunk are contiguous; `_chunk_rows` has their number).
+      - _starts and _ends:
+          offsets of each line within its chunk (the end of line characters
+          are left out, as `str.splitlines` does).
+      - _types:
+          the `Line.TYPE_*` code of each line, as a byte. It remains as
+          TYPE_UNSET until the type of the line is requested.
+
+    The text of a line is sliced from its chunk only when requested, and the
+    `Line` objects are created on demand, as views of a given row.
+
+    Appending text, or replacing rows, builds again only the chunks holding
+    the rows involved (instead of the whole text of the draft), so both take
+    time in proportion to the chunk and the new text. The full text is
+    joined only when `buffer` is requested (and kept until the next change).
+    """
+
+    # Same line boundaries recognized by `str.splitlines`.
+    LINE_BREAK = re.compile('\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+
+    # Characters from which a chunk is split (at the start of a line).
+    CHUNK_SIZE = 16384
+
+    def __init__(self, buffer = ''):
+        """Indexes the lines of the buffer."""
+
+        self._chunks = {}
+        self._chunk_rows = {}
+        self._next_chunk_id = 0
+        self._row_chunks = array('l')
+        self._starts = array('l')
+        self._ends   = array('l')
+        self._types  = array('b')
+
+        # The full text, joined on request (see `buffer`).
+        self._buffer = ''
+
+        self.append(buffer)
+
+    def __len__(self):
+        """Number of lines in the table."""
+
+        return len(self._starts)
+
+    def __getitem__(self, index):
+        """Returns a `Line` view of the given row."""
+
+        return self.line(index)
+
+    def __iter__(self):
+        """Iterates over the `Line` views of every row."""
+
+        for index in range(len(self)):
+            yield self.line(index)
+
+    @property
+    def buffer(self):
+        """Returns the full text of the table.
+
+        The chunks are joined only when needed, and the result is kept until
+        the table changes.
+        """
+
+        if self._buffer is None:
+            chunks = self._chunks
+            self._buffer = ''.join([chunks[chunk_id] for chunk_id, _ in groupby(self._row_chunks)])
+
+        return self._buffer
+
+    def text(self, index):
+        """Returns the original text of a line (without the end of line)."""
+
+        return self._chunks[self._row_chunks[index]][self._starts[index]:self._ends[index]]
+
+    def slice(self, start, end):
+        """Returns the text of the rows from `start` up to (not including) `end`.
+
+        Unlike `text`, the end of line characters are included.
+        """
+
+        if start >= end:
+            return ''
+
+        chunks = self._chunks
+        row_chunks = self._row_chunks
+        last = end - 1
+
+        # Only the chunks holding the rows are sliced.
+        pieces = []
+        row = start
+        while row <= last:
+            chunk_id = row_chunks[row]
+            chunk = chunks[chunk_id]
+
+            if row_chunks[last] == chunk_id:
+                pieces.append(chunk[self._starts[row]:self._chunk_offset(end, chunk_id)])
+                break
+
+            pieces.append(chunk[self._starts[row]:])
+            row = self._chunk_bounds(row)[1]
+
+        return ''.join(pieces)
+
+    def type(self, index):
+        """Returns the type code of a line, classifying it if needed."""
+
+        line_type = self._types[index]
+
+        if line_type == classifier.TYPE_UNSET:
+            line_type = classifier.classify_line(self.text(index))
+            self._types[index] = line_type
+
+        return line_type
+
+    def line(self, index):
+        """Creates the `Line` object for a row, with its type already set."""
+
+        text = self.text(index)
+        line = Line(text, draft_line_number = (index + 1))
+
+        # Classify with the text already sliced, if not done before.
+        line_type = self._types[index]
+        if line_type == classifier.TYPE_UNSET:
+            line_type = classifier.classify_line(text)
+            self._types[index] = line_type
+
+        line._type = line_type
+
+        return line
+
+    def append(self, text):
+        """Appends text to the table, indexing only the new lines.
+
+        The last row is indexed again, since the appended text may complete
+        it (or complete its end of line, as in a '\r' followed by '\n'). So
+        the rows are always the ones of the whole text (as if the table was
+        built from it), but the number of rows may not grow by the number of
+        line breaks appended: a '\n' after a lone '\r' adds no row, as
+        '\r\n' is a single line break. `Draft.add_text` ends its text with
+        '\n', so the rows of a draft never change this way.
+        """
+
+        if len(text) == 0:
+            return
+
+        row_count = len(self._starts)
+
+        if row_count == 0:
+            self._rebuild(0, 0, text)
+        else:
+            last = row_count - 1
+            last_text = self._chunks[self._row_chunks[last]][self._starts[last]:]
+            self._rebuild(last, row_count, last_text + text)
+
+    def replace(self, start, end, text):
+        """Replaces the rows from `start` up to (not including) `end`.
+
+        The `text` takes the place of those lines, and has to end with an end
+        of line (unless empty, which removes the rows). Only the new lines
+        are indexed; the rows below keep their type.
+        """
+
+        self._rebuild(start, end, text)
+
+    def _rebuild(self, start, end, text):
+        """Puts `text` in place of the rows from `start` up to `end`.
+
+        The rows of the chunk before the text (the prefix) and of the chunk
+        after it (the suffix) are kept, and joined with the new text into new
+        chunks; the chunks in between are dropped. Only the new text is
+        scanned for lines.
+        """
+
+        chunks = self._chunks
+        row_chunks = self._row_chunks
+        row_count = len(row_chunks)
+
+        # The prefix: the rows before `start` in the same chunk (or the last
+        # chunk, if appending at the end).
+        first = start
+        prefix = ''
+        if row_count > 0:
+            if start < row_count:
+                chunk_id = row_chunks[start]
+                prefix = chunks[chunk_id][:self._starts[start]]
+            else:
+                chunk_id = row_chunks[start - 1]
+                prefix = chunks[chunk_id]
+
+            if len(prefix) > 0:
+                first = self._chunk_bounds(start - 1)[0]
+
+        # The suffix: the rows from `end` to the end of their chunk.
+        last = end
+        suffix = ''
+        suffix_offset = 0
+        if end < row_count and self._starts[end] > 0:
+            suffix_offset = self._starts[end]
+            suffix = chunks[row_chunks[end]][suffix_offset:]
+            last = self._chunk_bounds(end)[1]
+
+        joined = prefix + text + suffix
+        text_offset = len(prefix)
+        text_end = text_offset + len(text)
+
+        starts, ends = self._scan(joined, text_offset, text_end)
+        new_count = len(starts)
+
+        # The offsets of the new lines are extended in place (rather than
+        # concatenated), so they are not copied again.
+        delta = text_end - suffix_offset
+        starts[0:0] = self._starts[first:start]
+        starts.extend(map(delta.__add__, self._starts[end:last]))
+        ends[0:0] = self._ends[first:start]
+        ends.extend(map(delta.__add__, self._ends[end:last]))
+
+        types = self._types[first:start]
+        types.frombytes(bytes(new_count))
+        types.extend(self._types[end:last])
+
+        # The chunks of the rows replaced go away.
+        for chunk_id, _ in groupby(row_chunks[first:last]):
+            del chunks[chunk_id]
+            del self._chunk_rows[chunk_id]
+
+        ids = array('l')
+        self.__split_chunks(joined, starts, ends, ids)
+
+        if first == 0 and last == row_count:
+            # Every row is replaced (as when the table is built), so the new
+            # arrays are kept instead of copied.
+            self._row_chunks = ids
+            self._starts = starts
+            self._ends = ends
+            self._types = types
+        else:
+            row_chunks[first:last] = ids
+            self._starts[first:last] = starts
+            self._ends[first:last] = ends
+            self._types[first:last] = types
+
+        self._buffer = None
+
+    def __split_chunks(self, text, starts, ends, ids):
+        """Stores the text in chunks of about `CHUNK_SIZE`, split at lines.
+
+        Fills `ids` with the chunk of each row, and makes the offsets of the
+        rows relative to the chunk.
+        """
+
+        row_count = len(starts)
+        row = 0
+        chunk_start = 0
+
+        while row < row_count:
+            next_row = row_count
+            if len(text) - chunk_start > self.CHUNK_SIZE:
+                next_row = max(row + 1, bisect_left(starts, chunk_start + self.CHUNK_SIZE, row))
+
+            chunk_end = starts[next_row] if next_row < row_count else len(text)
+
+            chunk_id = self._next_chunk_id
+            self._next_chunk_id += 1
+            self._chunks[chunk_id] = text[chunk_start:chunk_end]
+            self._chunk_rows[chunk_id] = next_row - row
+            ids.extend([chunk_id] * (next_row - row))
+
+            if chunk_start > 0:
+                starts[row:next_row] = array('l', map((-chunk_start).__add__, starts[row:next_row]))
+                ends[row:next_row] = array('l', map((-chunk_start).__add__, ends[row:next_row]))
+
+            row = next_row
+            chunk_start = chunk_end
+
+    def _chunk_bounds(self, index):
+        """Returns the first row of the chunk holding a row, and the row after its last one."""
+
+        row_chunks = self._row_chunks
+        chunk_id = row_chunks[index]
+        row_count = self._chunk_rows[chunk_id]
+
+        # The rows of the chunk are contiguous, so the first one is at most
+        # `row_count` rows above.
+        lowest = max(0, index - row_count + 1)
+        first = lowest + row_chunks[lowest:index + 1].index(chunk_id)
+
+        return first, first + row_count
+
+    def _chunk_offset(self, index, chunk_id):
+        """Returns where a row starts within a chunk (or its end, if past it)."""
+
+        if index < len(self._row_chunks) and self._row_chunks[index] == chunk_id:
+            return self._starts[index]
+
+        return len(self._chunks[chunk_id])
+
+    def _scan(self, text, offset, end_offset):
+        """Finds the lines within a region of a text.
+
+        Returns the arrays with the start and end offsets of each line.
+        """
+
+        starts = array('l')
+        ends = array('l')
+        start = offset
+
+        for match in self.LINE_BREAK.finditer(text, offset, end_offset):
+            starts.append(start)
+            ends.append(match.start())
+            start = match.end()
+
+        # The last line may not have an end of line.
+        if start < end_offset:
+            starts.append(start)
+            ends.append(end_offset)
+
+        return starts, ends
@@ -0,0 +1,10 @@
+"""Identifier packs for the instructions, one module per language.
+
+Each module has an `IDENTIFIERS` dictionary with the identifiers of each
+section type in that language (as in `'Chorus'` for `Section.TYPE_CHORUS`).
+They are registered in `section_registry.default_registry` by name, and only
+imported once the first instruction has to be parsed.
+"""
+
+# Packs registered by default, in order.
+DEFAULT_LANGUAGES = ('en', 'es')
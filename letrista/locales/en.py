@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""English identifiers of the sections."""
+
+from letrista.section import Section
+
+IDENTIFIERS = {
+    Section.TYPE_TITLE: ('Title',),
+    Section.TYPE_VERSE: ('Verse',),
+    Section.TYPE_CHORUS: ('Chorus',),
+    Section.TYPE_PRECHORUS: ('Pre-chorus', 'Prechorus'),
+    Section.TYPE_POSTCHORUS: ('Post-chorus', 'Postchorus'),
+    Section.TYPE_BRIDGE: ('Bridge',),
+    Section.TYPE_INTRO: ('Intro',),
+    Section.TYPE_OUTRO: ('Outro',),
+}
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Spanish identifiers of the sections."""
+
+from letrista.section import Section
+
+IDENTIFIERS = {
+    Section.TYPE_TITLE: ('Título', 'Titulo'),
+    Section.TYPE_VERSE: ('Verso',),
+    Section.TYPE_CHORUS: ('Coro',),
+    Section.TYPE_PRECHORUS: ('Pre-coro', 'Precoro'),
+    Section.TYPE_POSTCHORUS: ('Post-coro', 'Postcoro'),
+    Section.TYPE_BRIDGE: ('Puente',),
+    Section.TYPE_INTRO: ('Intro',),
+    Section.TYPE_OUTRO: ('Outro',),
+}
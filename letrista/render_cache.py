@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+import hashlib
+import sys
+from collections import OrderedDict, namedtuple
+
+# What is kept for each draft: the marke37 text and its statistics.
+CachedRender = namedtuple('CachedRender', ('text', 'word_count', 'line_count'))
+
+class RenderCache:
+    """Cache of rendered drafts, keyed by the hash of the draft text.
+
+    The same draft text is rendered over and over (autosaves, previews, the
+    same song opened by several people), so the output of `to_marke37` and
+    the word and line counts are kept here, for any `Draft` with the same
+    text to use (see `Draft.render_cache`).
+
+    The cache is bounded by a number of entries and, optionally, by the
+    bytes used by the cached texts; when full, the least recently used
+    entries are evicted. The counters of hits, misses and evictions help to
+    choose those bounds.
+    """
+
+    def __init__(self, max_entries = 1024, max_bytes = None):
+        """Creates an empty cache with the given bounds."""
+
+        self._entries = OrderedDict()
+        self._entry_sizes = {}
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._bytes = 0
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self):
+        """Number of entries in the cache."""
+
+        return len(self._entries)
+
+    @property
+    def hits(self):
+        """Number of lookups that found an entry."""
+
+        return self._hits
+
+    @property
+    def misses(self):
+        """Number of lookups that found nothing."""
+
+        return self._misses
+
+    @property
+    def evictions(self):
+        """Number of entries removed to make room for new ones."""
+
+        return self._evictions
+
+    @property
+    def bytes(self):
+        """Bytes used by the cached texts."""
+
+        return self._bytes
+
+    @staticmethod
+    def key_for(text):
+        """Returns the key of a draft text (a 128-bit BLAKE2 digest)."""
+
+        return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size = 16).digest()
+
+    def get(self, key):
+        """Returns the `CachedRender` for the key, or None if not cached."""
+
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self._misses += 1
+
+            return None
+
+        # The entry becomes the most recently used one.
+        self._entries.move_to_end(key)
+        self._hits += 1
+
+        return entry
+
+    def put(self, key, entry):
+        """Adds the `CachedRender` for the key, evicting entries if needed."""
+
+        if key in self._entries:
+            self.__remove(key)
+
+        size = sys.getsizeof(entry.text)
+
+        # An entry that does not fit at all is not cached.
+        if self._max_bytes is not None and size > self._max_bytes:
+            return
+
+        self._entries[key] = entry
+        self._entry_sizes[key] = size
+        self._bytes += size
+
+        while (len(self._entries) > self._max_entries
+            or (self._max_bytes is not None and self._bytes > self._max_bytes)):
+            oldest_key = next(iter(self._entries))
+            self.__remove(oldest_key)
+            self._evictions += 1
+
+    def clear(self):
+        """Removes all the entries (the counters are kept)."""
+
+        self._entries.clear()
+        self._entry_sizes.clear()
+        self._bytes = 0
+
+    def __remove(self, key):
+        """Removes an entry and its size."""
+
+        del self._entries[key]
+        self._bytes -= self._entry_sizes.pop(key)
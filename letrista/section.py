@@ -5,6 +5,7 @@
 from abc import abstractmethod
 
 from letrista.line import Line
+from letrista.render_cache import CachedRender, RenderCache
 
 class Section:
     """Represents a song/lyrics section within `Draft` object."""
@@ -20,6 +21,9 @@ class Section:
     TYPE_INTRO      = 'Intro'
     TYPE_OUTRO      = 'Outro'
 
+    # Letter of the lines without rhyme scheme, in `rhyme_scheme`.
+    UNMARKED_RHYME = '?'
+
     def __init__(self):
         """Initializes the _lines list."""
 
@@ -32,6 +36,21 @@ class Section:
         self._inner_text = None
         # Section word count, created while the section text is created.
         self._word_count = -1
+        # Number of printable lines, created on request.
+        self._line_count = -1
+        # Sum of the declared syllable counts, and rhyme scheme, on request.
+        self._declared_syllables = -1
+        self._rhyme_scheme = None
+        # Section repeated by this one, whose printable lines are shared
+        # (not copied) until the cloned lines are edited.
+        self._clone_source = None
+        self._clone_line_number = 0
+        # Number of lines copied from another section (after the first line).
+        self._cloned_line_count = 0
+        # Rows of the sections of the draft, and the position of this one
+        # in them, to number the lines (see `number_lines`).
+        self._section_rows = None
+        self._section_position = 0
 
     def __str__(self):
         string = ''
@@ -51,23 +70,43 @@ class Section:
 
         # If the section has no content, then no need to print
         # the wrappers.
-        inner_text = self._get_inner_text()
-        if len(inner_text) == 0:
+        chunks = []
+        self.write_to(chunks.append)
+        if len(chunks) == 0:
             return ''
 
-        # We print the wrappers and the content (content is guranteed).
-        string  = self._pre_section_text
-        string += inner_text
-        string += self._post_section_text
-        string += '\n'
+        chunks.append('\n')
 
-        return string
+        return ''.join(chunks)
+
+    def write_to(self, write):
+        """Writes the content of the section with the `write` callable.
+
+        The wrappers and the content are written as separate chunks, with no
+        end of line after them. If the section has no content, nothing is
+        written.
+        """
+
+        inner_text = self._get_inner_text()
+        if len(inner_text) == 0:
+            return
+
+        write(self._pre_section_text)
+        write(inner_text)
+        write(self._post_section_text)
 
     @property
     def lines(self):
-        """Returns the _lines."""
+        """Returns the _lines.
 
-        return self._lines
+        If the section repeats another one, the printable lines of the other
+        section are placed after the first line (the instruction).
+        """
+
+        if self._clone_source is None:
+            return self._lines
+
+        return self._lines[:1] + self.__shared_lines() + self._lines[1:]
 
     @property
     def type(self):
@@ -85,7 +124,7 @@ class Section:
 
         self._word_count = 0
         # Sum the word count from each line object.
-        for line in self._lines:
+        for line in self.lines:
             self._word_count += line.word_count
 
         return self._word_count
@@ -94,26 +133,221 @@ class Section:
     def line_count(self):
         """Get the number of printable lines in the draft."""
 
+        # Return the calculated value.
+        if self._line_count > -1:
+            return self._line_count
+
         self._line_count = 0
 
         for line in self.lines:
-            if len(line.text) > 0:
+            if line.is_printable:
                 self._line_count += 1
 
         return self._line_count
 
+    @property
+    def declared_syllables(self):
+        """Sum of the syllable counts written in the printable lines.
+
+        The lines with no count (or an undetermined one, as in '__') add
+        nothing.
+        """
+
+        if self._declared_syllables > -1:
+            return self._declared_syllables
+
+        self._declared_syllables = 0
+
+        for line in self.lines:
+            if line.is_printable and line.declared_count is not None:
+                self._declared_syllables += line.declared_count
+
+        return self._declared_syllables
+
+    @property
+    def rhyme_scheme(self):
+        """Rhyme letters of the printable lines, as in 'XAXA'.
+
+        The lines with no rhyme letter are marked with `UNMARKED_RHYME`.
+        """
+
+        if self._rhyme_scheme is not None:
+            return self._rhyme_scheme
+
+        letters = []
+        for line in self.lines:
+            if line.is_printable:
+                letters.append(line.rhyme_letter or self.UNMARKED_RHYME)
+
+        self._rhyme_scheme = ''.join(letters)
+
+        return self._rhyme_scheme
+
     def add_line(self, line_obj):
         """Add a line object `Line` to the section."""
 
         self._lines.append(line_obj)
 
+        if self._section_rows is not None:
+            self.__anchor_lines(len(self._lines) - 1)
+
+        # The text and counts have to be calculated again.
+        self._invalidate()
+
+    def replace_lines(self, start, end, new_lines):
+        """Replaces the lines from `start` up to (not including) `end`.
+
+        The positions are the ones within `lines`. If the lines shared with a
+        repeated section are replaced, they are copied first, so the other
+        section is not changed.
+        """
+
+        first_changed = start
+        if self._clone_source is not None:
+            shared_count = len(self.__shared_lines())
+            first_own = 1 + shared_count
+
+            if shared_count > 0 and ((start < first_own and end > 1) or (start == end and 1 <= start < first_own)):
+                self.__copy_shared_lines()
+                first_changed = min(start, 1)
+            elif start >= first_own:
+                # Only the lines of this section change.
+                start -= shared_count
+                end -= shared_count
+                first_changed = start
+
+        self._lines[start:end] = new_lines
+
+        # Only the lines from the change onwards move within the section.
+        if self._section_rows is not None:
+            self.__anchor_lines(first_changed)
+
+        # The text and counts have to be calculated again.
+        self._invalidate()
+
+    @property
+    def is_rendered(self):
+        """Determines if the text of the section is already calculated."""
+
+        return self._inner_text is not None
+
+    def content_key(self):
+        """Returns the key of the section in a `RenderCache`.
+
+        The key is made of the type of section and the hash of the original
+        text of its lines (cloned ones included), so it changes whenever
+        the output of the section may change.
+        """
+
+        text = '\n'.join([line._original_text for line in self.lines])
+
+        return (self._type, RenderCache.key_for(text))
+
+    def to_cached_render(self):
+        """Returns the `CachedRender` with the text and counts of the section."""
+
+        return CachedRender(self._get_inner_text(), self.word_count, self.line_count)
+
+    def use_cached_render(self, cached_render):
+        """Takes the text and counts from a `CachedRender` of the section.
+
+        The lines are not processed again (until they change).
+        """
+
+        self._inner_text = cached_render.text
+        self._word_count = cached_render.word_count
+        self._line_count = cached_render.line_count
+
+    def _invalidate(self):
+        """Forgets the text and counts calculated from the lines."""
+
+        self._inner_text = None
+        self._word_count = -1
+        self._line_count = -1
+        self._declared_syllables = -1
+        self._rhyme_scheme = None
+
     def clone(self, target_section, draft_line_number = 0):
-        """Clones the printable lines from the target section."""
+        """Repeats the printable lines from the target section.
 
-        for line in target_section.lines:
-            if line.is_printable:
-                new_line = Line(line._original_text, draft_line_number = draft_line_number)
-                self.add_line(new_line)
+        The lines are not copied (nor parsed again): the ones of the target
+        section are shared, and so is its text if this section adds nothing.
+        They are copied only when edited through `replace_lines`. Since the
+        target section may change, the sections repeating it have to be
+        invalidated along with it.
+        """
+
+        self._clone_source = target_section
+        self._clone_line_number = draft_line_number
+
+        self._invalidate()
+
+    @property
+    def clone_source(self):
+        """Returns the section whose lines are shared, if any."""
+
+        return self._clone_source
+
+    def number_lines(self, section_rows, position):
+        """Numbers the lines from the row of the section in the draft.
+
+        The row is read from `section_rows` (at `position`) whenever a line
+        number is requested, so moving the rows of the sections renumbers
+        their lines without changing them. The lines copied from a repeated
+        section take the number of the first line (the instruction); shared
+        lines keep the numbers of the section they belong to.
+        """
+
+        same_rows = self._section_rows is section_rows
+
+        self._section_rows = section_rows
+        self._section_position = position
+
+        # The lines are already numbered from the rows (only the position
+        # of the section changed).
+        if not same_rows:
+            self.__anchor_lines(0)
+
+    @property
+    def first_line_number(self):
+        """Returns the draft line number of the first line of the section.
+
+        The unassigned section has no instruction (its row is -1), so it
+        starts at the first line.
+        """
+
+        return max(self._section_rows[self._section_position] + 1, 1)
+
+    def __anchor_lines(self, first_position):
+        """Numbers the lines from the given position from the section."""
+
+        lines = self._lines
+        cloned_line_count = self._cloned_line_count
+
+        for position in range(first_position, len(lines)):
+            line = lines[position]
+            line._anchor = self
+
+            if position > cloned_line_count:
+                line._line_offset = position - cloned_line_count
+            else:
+                line._line_offset = 0
+
+    def __shared_lines(self):
+        """Returns the printable lines of the repeated section."""
+
+        return [line for line in self._clone_source.lines if line.is_printable]
+
+    def __copy_shared_lines(self):
+        """Stops sharing the lines of the repeated section, copying them."""
+
+        copied_lines = []
+        for line in self.__shared_lines():
+            copied_lines.append(Line(line._original_text, draft_line_number = self._clone_line_number))
+
+        self._lines[1:1] = copied_lines
+        self._cloned_line_count = len(copied_lines)
+        self._clone_source = None
 
     def _get_inner_text(self):
         """Returns the string with the content of the section."""
@@ -122,13 +356,19 @@ class Section:
         if self._inner_text is not None:
             return self._inner_text
 
-        self._inner_text = ""
+        # A repeat with no lines of its own has the same text as the section
+        # it repeats.
+        if self._clone_source is not None and not any(line.is_printable for line in self._lines):
+            self._inner_text = self._clone_source._get_inner_text()
 
+            return self._inner_text
+
+        printable_texts = []
         for line in self.lines:
-            if len(line.text) > 0:
-                self._inner_text += line.text + "\n"
+            if line.is_printable:
+                printable_texts.append(line.text)
 
-        # Remove last training end of line.
-        self._inner_text  = self._inner_text.strip()
+        # Remove leading and trailing whitespace of the whole text.
+        self._inner_text = '\n'.join(printable_texts).strip()
 
         return self._inner_text
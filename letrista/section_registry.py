@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+import importlib
+import itertools
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+
+from letrista.locales import DEFAULT_LANGUAGES
+from letrista.section import Section
+from letrista.title import Title
+from letrista.intro import Intro
+from letrista.verse import Verse
+from letrista.prechorus import Prechorus
+from letrista.chorus import Chorus
+from letrista.postchorus import Postchorus
+from letrista.bridge import Bridge
+from letrista.outro import Outro
+
+# What an instruction text means, as found by `SectionRegistry.parse`.
+ParsedInstruction = namedtuple('ParsedInstruction', ('section_type', 'is_repeat', 'repeat_ordinal'))
+
+class SectionRegistry:
+    """Registry of the types of section an instruction may create.
+
+    Each type has the class of its sections, the identifiers used in the
+    instructions (as in '[Chorus]' or '[Coro]'), and optionally the wrappers
+    of its text (`_pre_section_text` and `_post_section_text`), replacing
+    the ones set by the class.
+
+    The identifiers come from `register`, `add_identifiers`, or the language
+    packs of `register_language`, which are loaded only when an instruction
+    has to be parsed. With every change the dispatch table is dropped, and
+    built again (once) for the next instruction.
+
+    The dispatch table maps each identifier to its type, so an instruction
+    is looked up by its prefixes (one per length of identifier) instead of
+    trying every identifier: adding languages does not make it slower.
+    """
+
+    # Number of instruction texts whose parsing is kept (see `parse`).
+    PARSE_CACHE_SIZE = 4096
+
+    # Source of the generations of every registry (see `generation`).
+    _generations = itertools.count()
+
+    def __init__(self, default_type = Section.TYPE_VERSE):
+        """Creates an empty registry.
+
+        The `default_type` is used for the instructions with no known
+        identifier (in order to be forgiving).
+        """
+
+        self._default_type = default_type
+
+        # Section types in order of priority, with their class and wrappers.
+        self._classes = OrderedDict()
+        self._wrappers = {}
+        self._identifiers = {}
+
+        # Language packs (module names or callables) not loaded yet.
+        self._languages = OrderedDict()
+
+        # Built on request (see `__build_dispatch`).
+        self._dispatch = None
+        self._identifier_lengths = ()
+        self._parse = None
+
+        self._generation = next(SectionRegistry._generations)
+
+    @property
+    def types(self):
+        """Returns the registered section types, by priority."""
+
+        return tuple(self._classes)
+
+    @property
+    def generation(self):
+        """Returns the number of the current state of the registry.
+
+        It changes with every registration, and no other registry (nor other
+        state of this one) has the same number, so the output rendered with
+        the registry can be cached by it.
+        """
+
+        return self._generation
+
+    def register(self, section_type, section_class, identifiers = (), pre_section_text = None, post_section_text = None):
+        """Registers a type of section (or replaces its class and wrappers).
+
+        The types registered first have priority if an instruction matches
+        identifiers of several types.
+        """
+
+        self._classes[section_type] = section_class
+        self._identifiers.setdefault(section_type, [])
+
+        if pre_section_text is not None or post_section_text is not None:
+            self._wrappers[section_type] = (pre_section_text, post_section_text)
+
+        self.add_identifiers(section_type, identifiers)
+
+    def add_identifiers(self, section_type, identifiers):
+        """Adds identifiers for a type of section.
+
+        They are not used until the type is registered.
+        """
+
+        self._identifiers.setdefault(section_type, []).extend(identifiers)
+        self.__changed()
+
+    def register_language(self, name, pack):
+        """Registers the identifiers of a language, to be loaded when needed.
+
+        The `pack` is either the name of a module with an `IDENTIFIERS`
+        dictionary (see `letrista.locales`), or a callable returning such a
+        dictionary.
+        """
+
+        self._languages[name] = pack
+        self.__changed()
+
+    def section_class(self, section_type):
+        """Returns the class of the sections of a type (verses, by default)."""
+
+        return self._classes.get(section_type, self._classes.get(self._default_type, Verse))
+
+    def create_section(self, section_type):
+        """Creates a `Section` of the given type, with its wrappers."""
+
+        section = self.section_class(section_type)()
+        section._type = section_type
+
+        wrappers = self._wrappers.get(section_type)
+        if wrappers is not None:
+            pre_section_text, post_section_text = wrappers
+            if pre_section_text is not None:
+                section._pre_section_text = pre_section_text
+            if post_section_text is not None:
+                section._post_section_text = post_section_text
+
+        return section
+
+    def find_type(self, text):
+        """Returns the type of section of an instruction text.
+
+        The type is given by the identifier at the start of the instruction
+        ('[' + identifier). If none matches, returns None.
+        """
+
+        if self._dispatch is None:
+            self.__build_dispatch()
+
+        if not text.startswith('['):
+            return None
+
+        found = None
+        dispatch = self._dispatch
+        for length in self._identifier_lengths:
+            entry = dispatch.get(text[1:length + 1])
+            if entry is not None and (found is None or entry[0] < found[0]):
+                found = entry
+
+        if found is None:
+            return None
+
+        return found[1]
+
+    def parse(self, text):
+        """Finds what an instruction text means, as a `ParsedInstruction`.
+
+        The same instructions ('[Chorus]', '[Verse]') are found over and over,
+        so the results for the most recent texts are kept (until the registry
+        changes).
+        """
+
+        if self._dispatch is None:
+            self.__build_dispatch()
+
+        return self._parse(text)
+
+    def __parse_text(self, text):
+        """Parses an instruction text (see `parse`)."""
+
+        section_type = self.find_type(text)
+        if section_type is None:
+            section_type = self._default_type
+
+        is_repeat = text.find("R]") > 0
+
+        # The id is given by the Section.TYPE constant, regardless of the
+        # language used (i.e. 'Chorus' or 'Coro')
+        # Therefore, is useless to trim the section type, hence why there
+        # is a blind search for digits.
+        # This is based on https://stackoverflow.com/a/36434101
+        repeat_ordinal = int('0' + ''.join(filter(str.isdigit, text)))
+
+        if repeat_ordinal <= 0:
+            repeat_ordinal = 1
+
+        return ParsedInstruction(section_type, is_repeat, repeat_ordinal)
+
+    def __changed(self):
+        """Drops the dispatch table, and moves on to a new generation."""
+
+        self._dispatch = None
+        self._generation = next(SectionRegistry._generations)
+
+    def __load_languages(self):
+        """Adds the identifiers of the languages not loaded yet."""
+
+        while len(self._languages) > 0:
+            name, pack = self._languages.popitem(last = False)
+
+            if callable(pack):
+                identifiers = pack()
+            else:
+                identifiers = importlib.import_module(pack).IDENTIFIERS
+
+            # The identifiers of types not registered are kept, in case the
+            # type is registered later.
+            for section_type, type_identifiers in identifiers.items():
+                self._identifiers.setdefault(section_type, []).extend(type_identifiers)
+
+    def __build_dispatch(self):
+        """Builds the table of identifier to (priority, type)."""
+
+        self.__load_languages()
+
+        dispatch = {}
+        for priority, section_type in enumerate(self._classes):
+            for identifier in self._identifiers[section_type]:
+                # With the same identifier, the type registered first wins.
+                dispatch.setdefault(identifier, (priority, section_type))
+
+        self._identifier_lengths = tuple(sorted(set(map(len, dispatch))))
+        self._parse = lru_cache(maxsize = self.PARSE_CACHE_SIZE)(self.__parse_text)
+        self._dispatch = dispatch
+
+
+def create_default_registry():
+    """Creates the registry with the built-in sections and languages."""
+
+    registry = SectionRegistry()
+
+    # In order of priority.
+    registry.register(Section.TYPE_TITLE, Title)
+    registry.register(Section.TYPE_VERSE, Verse)
+    registry.register(Section.TYPE_CHORUS, Chorus)
+    registry.register(Section.TYPE_PRECHORUS, Prechorus)
+    registry.register(Section.TYPE_POSTCHORUS, Postchorus)
+    registry.register(Section.TYPE_BRIDGE, Bridge)
+    registry.register(Section.TYPE_INTRO, Intro)
+    registry.register(Section.TYPE_OUTRO, Outro)
+
+    for language in DEFAULT_LANGUAGES:
+        registry.register_language(language, 'letrista.locales.' + language)
+
+    return registry
+
+
+# Registry used by the instructions, unless given another one.
+default_registry = create_default_registry()
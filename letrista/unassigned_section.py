@@ -20,6 +20,11 @@ class UnassignedSection(Section):
 
         return ''
 
+    def write_to(self, write):
+        """The unassigned section writes nothing either."""
+
+        return
+
     @property
     def word_count(self):
         """The unassigned section lines do not count towards the word total."""
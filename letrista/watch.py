@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Copyright (c) 2023 Carlos Ramos.
+
+"""Rendering of the drafts of a directory as they change.
+
+The directory is polled: on each pass the drafts are listed along with
+their modification time and size, and only the ones that differ from the
+manifest are read. A draft is rendered again only if its content (its hash)
+changed, and the output is written only if the rendered bytes differ from
+the file already there, so the tools watching the output (such as the
+generator of a static site) are not triggered by saves that change nothing.
+"""
+
+import hashlib
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
+
+from letrista import batch
+from letrista.draft import Draft
+
+# What the manifest keeps of each draft (the digest is of the file bytes).
+ManifestEntry = namedtuple('ManifestEntry', ('mtime_ns', 'size', 'digest'))
+
+# Result of rendering a changed draft: `written` tells whether the output
+# changed (and `error` is None unless the draft could not be rendered).
+WatchResult = namedtuple('WatchResult', ('path', 'output_path', 'written', 'error'))
+
+# Seconds between polls of the directory.
+POLL_INTERVAL = 1.0
+
+# Encoding of the drafts and of the rendered text.
+ENCODING = 'utf-8'
+
+
+class Watcher:
+    """Keeps the rendered text of the drafts of a directory up to date.
+
+    Each call to `poll` renders the drafts added or changed since the
+    previous one (all of them, the first time, unless a saved manifest is
+    given). The output of each draft goes next to it, or to the same path
+    within `output_dir`.
+    """
+
+    def __init__(self, directory, output_dir = None, manifest_path = None, workers = 1):
+        """Creates the watcher of a directory.
+
+        With a `manifest_path`, the manifest is read from that file (if it
+        exists) and saved to it after each poll with changes, so the drafts
+        rendered before are not rendered again after a restart.
+
+        When several drafts change at once, they are rendered by `workers`
+        processes.
+        """
+
+        self._directory = directory
+        self._output_dir = output_dir
+        self._manifest_path = manifest_path
+        self._workers = workers
+
+        # Draft path -> ManifestEntry.
+        self._manifest = {}
+
+        if manifest_path is not None and os.path.exists(manifest_path):
+            self.load_manifest()
+
+    @property
+    def manifest(self):
+        """Returns the manifest (a read-only view), by path of the draft."""
+
+        return MappingProxyType(self._manifest)
+
+    def output_path(self, path):
+        """Returns where the rendered text of a draft is written."""
+
+        if self._output_dir is None:
+            return batch.output_name(path)
+
+        relative_path = os.path.relpath(path, self._directory)
+
+        return os.path.join(self._output_dir, batch.output_name(relative_path))
+
+    def poll(self):
+        """Renders the drafts that changed, returning a list of `WatchResult`.
+
+        The drafts with the same modification time and size as in the
+        manifest are not even read.
+        """
+
+        manifest = self._manifest
+        changed = []
+        found = set()
+        manifest_changed = False
+
+        for path, stat in scan_drafts(self._directory):
+            found.add(path)
+
+            entry = manifest.get(path)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                continue
+
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                # Removed in the meantime (or not readable yet).
+                continue
+
+            new_entry = ManifestEntry(stat.st_mtime_ns, stat.st_size, digest_of(data))
+
+            # Saved again (or touched) with the same content.
+            if entry is not None and entry.digest == new_entry.digest:
+                manifest[path] = new_entry
+                manifest_changed = True
+                continue
+
+            changed.append((path, new_entry, data))
+
+        for path in [path for path in manifest if path not in found]:
+            del manifest[path]
+            manifest_changed = True
+
+        results = []
+        renders = self.__render([data for _, _, data in changed])
+
+        for (path, entry, _), (text, error) in zip(changed, renders):
+            output_path = self.output_path(path)
+            written = False
+            write_failed = False
+
+            if error is None:
+                try:
+                    written = write_if_changed(output_path, text.encode(ENCODING))
+                except OSError as e:
+                    error = '%s: %s' % (type(e).__name__, e)
+                    write_failed = True
+
+            # A draft that cannot be rendered is tried again when it changes,
+            # but an output that cannot be written is tried on the next poll.
+            if not write_failed:
+                manifest[path] = entry
+                manifest_changed = True
+
+            results.append(WatchResult(path, output_path, written, error))
+
+        if manifest_changed and self._manifest_path is not None:
+            self.save_manifest()
+
+        return results
+
+    def load_manifest(self):
+        """Reads the manifest saved in `manifest_path`."""
+
+        with open(self._manifest_path, 'r', encoding = ENCODING) as f:
+            drafts = json.load(f)['drafts']
+
+        self._manifest = {
+            os.path.join(self._directory, relative_path): ManifestEntry(*entry)
+            for relative_path, entry in drafts.items()
+        }
+
+    def save_manifest(self):
+        """Writes the manifest to `manifest_path` (as JSON)."""
+
+        drafts = {
+            os.path.relpath(path, self._directory): list(entry)
+            for path, entry in self._manifest.items()
+        }
+
+        data = json.dumps({'drafts': drafts}, sort_keys = True).encode(ENCODING)
+        write_if_changed(self._manifest_path, data)
+
+    def __render(self, texts):
+        """Renders the drafts, as (text, error) pairs in the same order."""
+
+        if self._workers <= 1 or len(texts) <= 1:
+            return [render_data(data) for data in texts]
+
+        chunksize = max(1, len(texts) // (self._workers * batch.CHUNKS_PER_WORKER))
+
+        with ProcessPoolExecutor(max_workers = self._workers) as executor:
+            return list(executor.map(render_data, texts, chunksize = chunksize))
+
+
+def scan_drafts(directory):
+    """Yields the path and `os.stat_result` of each draft within a directory."""
+
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks = False):
+                yield from scan_drafts(entry.path)
+            elif entry.name.endswith(batch.DRAFT_EXTENSION):
+                yield entry.path, entry.stat()
+        except OSError:
+            # Removed while scanning.
+            continue
+
+
+def digest_of(data):
+    """Returns the digest of the bytes of a draft (a 128-bit BLAKE2, in hex)."""
+
+    return hashlib.blake2b(data, digest_size = 16).hexdigest()
+
+
+def render_data(data):
+    """Renders the bytes of a draft, returning (text, error).
+
+    Any error is returned as text (since the exception may not be able to
+    travel between processes).
+    """
+
+    try:
+        return Draft(data.decode(ENCODING)).to_marke37(), None
+    except Exception as e:
+        return None, '%s: %s' % (type(e).__name__, e)
+
+
+def write_if_changed(path, data):
+    """Writes the bytes to a file, unless it already has them.
+
+    The file is replaced at once (written under another name first), so it
+    is never seen half written. Returns whether it was written.
+    """
+
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+
+    directory = os.path.dirname(path)
+    if directory != '':
+        os.makedirs(directory, exist_ok = True)
+
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as f:
+        f.write(data)
+
+    os.replace(temporary_path, path)
+
+    return True
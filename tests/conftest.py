@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+"""Fixtures shared by the tests."""
+
+import os
+
+import pytest
+
+from letrista.draft import Draft
+
+EXAMPLE_DRAFTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'example_drafts', '')
+
+
+@pytest.fixture
+def example_drafts():
+    """Path of the directory with the example drafts (ending in a slash)."""
+
+    return EXAMPLE_DRAFTS
+
+
+@pytest.fixture
+def expected_text():
+    """Renders an example draft in the current process.
+
+    The draft is given by its name in the example drafts, or by its path.
+    """
+
+    def render(filename):
+        draft = Draft()
+        draft.add_file(os.path.join(EXAMPLE_DRAFTS, filename))
+
+        return draft.to_marke37()
+
+    return render
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+
+"""Tests for the `aio` module."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from letrista import aio
+from letrista.draft import Draft
+from letrista.render_cache import RenderCache
+
+def test_render_text_matches_to_marke37(example_drafts):
+    """Rendering text yields the same output as the draft."""
+
+    with open(example_drafts + 'all_sections.e37') as f:
+        text = f.read()
+
+    assert asyncio.run(aio.render_text(text)) == Draft(text).to_marke37()
+
+def test_render_file_matches_to_marke37(example_drafts, expected_text):
+    """Rendering a file yields the same output as the draft."""
+
+    text = asyncio.run(aio.render_file(example_drafts + 'chorusr_then_2r.e37'))
+
+    assert text == expected_text('chorusr_then_2r.e37')
+
+def test_render_file_raises_for_missing_file(example_drafts):
+    """Errors reading the file reach the caller."""
+
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(aio.render_file(example_drafts + 'missing.e37'))
+
+def test_many_renders_run_concurrently(example_drafts, expected_text):
+    """Many renders at once yield their own output."""
+
+    filenames = ['all_sections.e37', 'chorus_r.e37', 'no_chorus_r.e37'] * 50
+
+    async def render_all():
+        return await asyncio.gather(*[aio.render_file(example_drafts + name) for name in filenames])
+
+    results = asyncio.run(render_all())
+
+    assert results == [expected_text(name) for name in filenames]
+
+def test_render_can_be_cancelled():
+    """A cancelled render raises `CancelledError` in the caller."""
+
+    text = '[Verse]\nLine\n' * 20000
+
+    async def cancel_render():
+        task = asyncio.ensure_future(aio.render_text(text))
+        await asyncio.sleep(0)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_render())
+
+def test_cancelled_render_closes_the_file(monkeypatch, example_drafts):
+    """The file opened while the render is cancelled is closed."""
+
+    opened = []
+    started = threading.Event()
+    cancelled = threading.Event()
+
+    def waiting_open(*args, **kwargs):
+        # The file is opened once the render is cancelled.
+        started.set()
+        cancelled.wait()
+        f = open(*args, **kwargs)
+        opened.append(f)
+
+        return f
+
+    monkeypatch.setattr(aio, 'open', waiting_open, raising = False)
+
+    async def cancel_render():
+        task = asyncio.ensure_future(aio.render_file(example_drafts + 'all_sections.e37', executor))
+        while not started.is_set():
+            await asyncio.sleep(0.001)
+
+        task.cancel()
+        cancelled.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    with ThreadPoolExecutor(max_workers = 1) as executor:
+        asyncio.run(cancel_render())
+
+    assert len(opened) == 1
+    assert opened[0].closed
+
+def test_render_uses_the_section_cache(monkeypatch, example_drafts):
+    """The sections rendered are kept in the section cache of the drafts."""
+
+    cache = RenderCache()
+    monkeypatch.setattr(Draft, 'section_cache', cache)
+
+    text = asyncio.run(aio.render_file(example_drafts + 'all_sections.e37'))
+
+    assert len(cache) > 0
+    assert asyncio.run(aio.render_file(example_drafts + 'all_sections.e37')) == text
+    assert cache.hits == len(cache)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+"""Tests for the `batch` module."""
+
+import pytest
+
+from letrista import batch
+
+@pytest.fixture
+def example_paths(example_drafts):
+    """Paths of the example drafts with an expected output."""
+
+    return [
+        example_drafts + 'all_sections.e37',
+        example_drafts + 'chorus_r.e37',
+        example_drafts + 'chorusr_then_2r.e37',
+        example_drafts + 'no_chorus_r.e37',
+    ]
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_render_many_keeps_input_order(workers, example_paths, expected_text):
+    """The results come in the same order as the paths."""
+
+    paths = example_paths * 3
+
+    results = batch.render_many(paths, workers = workers, chunksize = 2)
+
+    assert [result.path for result in results] == paths
+    assert [result.text for result in results] == [expected_text(path) for path in paths]
+    assert all(result.error is None for result in results)
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_render_many_reports_errors_per_file(workers, example_drafts, example_paths, expected_text):
+    """A missing draft does not stop the rest of the batch."""
+
+    missing = example_drafts + 'missing.e37'
+    paths = [example_paths[0], missing, example_paths[1]]
+
+    results = batch.render_many(paths, workers = workers)
+
+    assert results[0].text == expected_text(paths[0])
+    assert results[1].text is None
+    assert results[1].error.startswith('FileNotFoundError')
+    assert results[2].text == expected_text(paths[2])
+
+def test_render_many_with_no_paths():
+    """An empty batch yields no results."""
+
+    assert batch.render_many([], workers = 2) == []
+
+def test_find_drafts_walks_the_directory(tmp_path):
+    """Only the drafts are found, sorted, including the subdirectories."""
+
+    (tmp_path / 'b').mkdir()
+    (tmp_path / 'b' / 'song.e37').write_text('Line')
+    (tmp_path / 'a.e37').write_text('Line')
+    (tmp_path / 'a.me37').write_text('Line')
+
+    assert batch.find_drafts(str(tmp_path)) == [str(tmp_path / 'a.e37'), str(tmp_path / 'b' / 'song.e37')]
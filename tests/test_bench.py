@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+"""Tests for the `bench` module."""
+
+import pytest
+
+from letrista import bench
+from letrista.draft import Draft
+
+@pytest.mark.parametrize('repeats', [False, True])
+def test_build_draft_has_the_given_lines(repeats):
+    """The synthetic draft has exactly the lines requested."""
+
+    assert len(bench.build_draft(1234, repeats).splitlines()) == 1234
+
+def test_build_draft_with_repeats_repeats_the_chorus():
+    """The sections after the chorus repeat it."""
+
+    sections = Draft(bench.build_draft(20, repeats = True)).process_lines()
+
+    assert sections['Chorus2'].clone_source is sections['Chorus1']
+
+def test_percentile_by_nearest_rank():
+    """The percentile is one of the values."""
+
+    values = [5, 1, 4, 2, 3]
+
+    assert bench.percentile(values, 50) == 3
+    assert bench.percentile(values, 99) == 5
+    assert bench.percentile([7], 99) == 7
+
+def test_run_reports_every_workload_and_size():
+    """There is one result per workload and size of draft."""
+
+    report = bench.run(line_counts = (100, 200), runs = 2)
+    results = report['results']
+
+    assert [(result['workload'], result['lines']) for result in results] == [
+        (name, line_count) for line_count in (100, 200) for name in bench.WORKLOADS
+    ]
+    for result in results:
+        assert result['runs'] == 2
+        assert result['lines_per_second'] > 0
+        assert 0 < result['p50_ms'] <= result['p99_ms']
+        assert result['peak_traced_bytes'] > 0
+        assert 'peak_rss_bytes' not in result
+
+def test_repeats_workload_renders_the_draft():
+    """The repeats are measured up to the rendered text."""
+
+    function, repeats = bench.WORKLOADS['repeats']
+
+    assert function is bench.render_draft
+    assert repeats
+
+def test_peak_traced_is_the_memory_of_the_run():
+    """A run allocating a large string peaks above its size."""
+
+    assert bench.peak_traced(lambda text: text * 100000, 'text') >= 400000
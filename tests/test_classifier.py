@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+"""Tests for the `classifier` module."""
+
+from array import array
+
+import pytest
+
+from letrista import classifier
+from letrista.line import Line
+
+###########################################################
+##### Classifier agrees with the line types           #####
+###########################################################
+
+@pytest.mark.parametrize('text, expected', [
+    ('*****', Line.TYPE_END),
+    ('-----', Line.TYPE_END),
+    ('#####', Line.TYPE_END),
+    ('/////', Line.TYPE_END),
+    (' *****', Line.TYPE_LYRICS),
+    ('****', Line.TYPE_LYRICS),
+    ('', Line.TYPE_SKIP),
+    ('   \t\n', Line.TYPE_SKIP),
+    ('A-00 Is comment', Line.TYPE_COMMENT),
+    ('[Verse]', Line.TYPE_INSTRUCTION),
+    ('X 00 This has a count', Line.TYPE_COUNT),
+    ('X xx This has a count', Line.TYPE_COUNT),
+    ('X Xx This has a count', Line.TYPE_COUNT),
+    ('X __ This has a count', Line.TYPE_COUNT),
+    ('X This has schema', Line.TYPE_SCHEMA),
+    ('X+This has schema', Line.TYPE_SCHEMA),
+    ('X ', Line.TYPE_LYRICS),
+    ('This should be lyrics', Line.TYPE_LYRICS),
+])
+def test_classify_line_returns_line_type(text, expected):
+    """The classifier yields the same types described in `Line`."""
+
+    assert classifier.classify_line(text) == expected
+    assert Line(text).type == expected
+
+def test_count_is_looked_for_in_original_text():
+    """With leading whitespace, positions 3 and 4 are not the count."""
+
+    assert classifier.classify_line('  X 00 Text') == Line.TYPE_SCHEMA
+
+def test_classify_lines_returns_array_of_codes():
+    """The batch API returns an array with a code per line."""
+
+    codes = classifier.classify_lines(['[Verse]', 'A 00 Text', '', '*****'])
+
+    assert isinstance(codes, array)
+    assert codes.typecode == 'b'
+    assert list(codes) == [
+        Line.TYPE_INSTRUCTION,
+        Line.TYPE_COUNT,
+        Line.TYPE_SKIP,
+        Line.TYPE_END,
+    ]
+
+def test_classify_lines_with_no_lines():
+    """An empty list yields an empty array."""
+
+    assert len(classifier.classify_lines([])) == 0
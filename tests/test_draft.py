@@ -2,11 +2,18 @@
 
 """Tests for `draft` class."""
 
+import io
 import os
 import pytest
 
-from letrista.draft import Draft
+from letrista import classifier
+from letrista import extractor
+from letrista.draft import Draft, TextEdit
 from letrista.line import Line
+from letrista.render_cache import RenderCache
+from letrista.section import Section
+from letrista.section_registry import create_default_registry
+from letrista.verse import Verse
 
 def get_expected_output(filename):
     # Gets the file from the testing path.
@@ -24,8 +31,8 @@ def test_draft_adds_one_line():
     """Test draft adds one line to the text."""
 
     draft = Draft()
-    draft.add_text("Test line")
 
+    assert draft.add_text("Test line") is None
     assert draft._draft_lyrics == "Test line\n"
     assert draft.draft_line_count == 1
 
@@ -216,6 +223,42 @@ def test_draft_has_no_section_to_repeat():
 
     assert draft.text == get_expected_output('no_chorus_r.me37')
 
+def test_draft_repeats_section_defined_later():
+    """A repeat may point to a section that comes after it."""
+
+    draft = Draft('[Chorus2R]\n[Verse]\nVerse line\n[Chorus]\nChorus line')
+
+    assert draft.to_marke37() == '**Chorus line**\n\nVerse line\n\n**Chorus line**'
+    assert draft._sections['Chorus1'].clone_source is draft._sections['Chorus2']
+
+def test_draft_repeats_section_added_later():
+    """A repeat pointing to a missing section is resolved once it is added."""
+
+    draft = Draft('[Chorus]\nFirst\n[Chorus3R]\n')
+
+    assert draft.to_marke37() == '**First**\n\n**First**'
+
+    draft.add_text('[Chorus]\nThird\n')
+
+    assert draft.to_marke37() == '**First**\n\n**Third**\n\n**Third**'
+
+def test_draft_repeats_do_not_repeat_themselves():
+    """Two sections repeating each other: the earlier repeat wins."""
+
+    draft = Draft('[Chorus2R]\nFirst\n[ChorusR]\nSecond')
+
+    assert draft.to_marke37() == '**First**\n\n**First\nSecond**'
+    assert draft._sections['Chorus1'].clone_source is None
+
+def test_draft_indexes_sections_by_type_and_number():
+    """The sections are found by their type and number."""
+
+    draft = Draft('[Verse]\nOne\n[Chorus]\nTwo\n[Verse]\nThree')
+    draft.process_lines()
+
+    assert draft._section_index[(Section.TYPE_VERSE, 2)] is draft._sections['Verse2']
+    assert draft._section_index[(Section.TYPE_CHORUS, 1)] is draft._sections['Chorus1']
+
 def test_draft_word_count_of_intro_verse_is_correct():
     draft = Draft()
     draft.add_file(os.path.dirname(__file__)+'/example_drafts/intro_verse.e37')
@@ -223,6 +266,36 @@ def test_draft_word_count_of_intro_verse_is_correct():
 
     assert draft.word_count == 27
 
+def test_draft_word_count_is_updated_after_adding_text():
+    """The counts are not kept once the draft changes."""
+
+    draft = Draft('[Verse]\nOne two\n')
+
+    assert draft.word_count == 2
+    assert draft.line_count == 1
+
+    draft.add_text('Three four five\n')
+
+    assert draft.word_count == 5
+    assert draft.line_count == 2
+
+def test_draft_stats_are_kept_while_the_draft_does_not_change():
+    """The same stats object is returned until the draft changes."""
+
+    draft = Draft('[Verse]\nOne two\n[Chorus]\nThree\n')
+    stats = draft.stats
+
+    assert draft.stats is stats
+    assert stats.section_types[Section.TYPE_CHORUS] == 1
+    assert stats.line_types == {Line.TYPE_INSTRUCTION: 2, Line.TYPE_LYRICS: 2}
+    assert [section.word_count for section in stats.sections] == [0, 2, 1]
+
+    draft.apply_edit(3, 4, 'Three four\n\n')
+
+    assert draft.stats is not stats
+    assert draft.stats.word_count == 4
+    assert draft.stats.line_types[Line.TYPE_SKIP] == 1
+
 def test_draft_line_count_counts_printed_lines():
     """Get the line count."""
 
@@ -243,3 +316,570 @@ def test_draft_line_count_counts_printed_lines():
     assert draft.line_count == 26
 
 
+def test_draft_processes_each_line_once_per_render(monkeypatch):
+    """Rendering extracts the text of each line within a section only once."""
+
+    calls = []
+    extract_text = extractor.extract_text
+
+    def counting_extract_text(text, line_type):
+        calls.append(text)
+
+        return extract_text(text, line_type)
+
+    monkeypatch.setattr(extractor, 'extract_text', counting_extract_text)
+
+    draft = Draft()
+    draft.add_file(os.path.dirname(__file__)+'/example_drafts/all_sections.e37')
+    draft.to_marke37()
+    draft.word_count
+    draft.line_count
+
+    # The lines of the unassigned section are never printed.
+    section_lines = 0
+    for section in draft._sections.values():
+        if section.type != Section.TYPE_UNASSIGNED:
+            section_lines += len(section.lines)
+
+    assert len(calls) == section_lines
+
+def test_draft_does_not_classify_lines_after_end_of_lyrics():
+    """Lines below the end of lyrics are left untouched."""
+
+    draft = Draft('[Verse]\nLine 1\n*****\nNotes\nMore notes')
+    draft.process_lines()
+
+    assert draft.line_table._types[2] == Line.TYPE_END
+    assert list(draft.line_table._types[3:]) == [Line.TYPE_UNSET, Line.TYPE_UNSET]
+
+def test_draft_extends_line_index_on_add_text():
+    """Adding text keeps the index of lines and the buffer together."""
+
+    draft = Draft('Line 1')
+    draft.add_text('Line 2\nLine 3')
+
+    assert draft.draft_line_count == 3
+    assert draft.line_table.buffer is draft._draft_lyrics
+    assert draft.string_list == ['Line 1', 'Line 2', 'Line 3']
+
+def test_draft_add_text_after_carriage_return_adds_its_lines():
+    """Text ending in '\r' is completed with '\n', so no row is joined later."""
+
+    draft = Draft('[Verse]\nLine 1\r')
+    draft.process_lines()
+    draft.add_text('\nLine 3')
+
+    assert draft.draft_line_count == 4
+    assert draft.string_list == ['[Verse]', 'Line 1', '', 'Line 3']
+    assert draft.to_marke37() == Draft(draft._draft_lyrics).to_marke37()
+
+###########################################################
+##### Draft parses the appended lines incrementally   #####
+###########################################################
+
+def test_draft_processes_appended_lines_like_a_full_draft():
+    """Adding text after processing yields the same output as one parse."""
+
+    text = get_expected_output('chorusr_then_2r.e37')
+    full_draft = Draft(text)
+
+    draft = Draft()
+    for line in text.splitlines():
+        draft.add_text(line)
+        draft.to_marke37()
+
+    assert draft.to_marke37() == full_draft.to_marke37()
+    assert list(draft._sections) == list(full_draft._sections)
+
+def test_draft_processing_twice_keeps_section_ids():
+    """Processing again does not create the sections again."""
+
+    draft = Draft('[Verse]\nLine 1')
+    draft.process_lines()
+    draft.process_lines()
+
+    assert list(draft._sections) == ['Unassigned1', 'Verse1']
+
+def test_draft_appended_line_is_the_only_one_classified(monkeypatch):
+    """Appending a line to a processed draft classifies only that line."""
+
+    draft = Draft('[Verse]\n' + 'Line\n' * 5000)
+    draft.to_marke37()
+
+    calls = []
+    classify_line = classifier.classify_line
+
+    def counting_classify_line(text):
+        calls.append(text)
+
+        return classify_line(text)
+
+    monkeypatch.setattr(classifier, 'classify_line', counting_classify_line)
+
+    draft.add_text('New line')
+
+    assert draft.to_marke37().endswith('Line\nNew line')
+    assert calls == ['New line']
+
+def test_draft_appended_line_refreshes_current_section():
+    """The section that receives the line is rendered again."""
+
+    draft = Draft('[Chorus]\nLine 1')
+    assert draft.to_marke37() == '**Line 1**'
+    assert draft._sections['Chorus1'].word_count == 2
+
+    draft.add_text('Line 2')
+
+    assert draft.to_marke37() == '**Line 1\nLine 2**'
+    assert draft._sections['Chorus1'].word_count == 4
+
+###########################################################
+##### Draft applies edits of ranges of lines          #####
+###########################################################
+
+def test_draft_apply_edit_replaces_lines_in_text():
+    """Editing a range replaces those lines in the draft text."""
+
+    draft = Draft('Line 1\nLine 2\nLine 3')
+    draft.apply_edit(1, 2, 'New line 2\nNew line 3')
+
+    assert draft._draft_lyrics == 'Line 1\nNew line 2\nNew line 3\nLine 3\n'
+    assert draft.draft_line_count == 4
+
+def test_draft_apply_edit_rejects_invalid_ranges():
+    """The range has to start at zero or later, and end after it starts."""
+
+    draft = Draft('[Verse]\na\nb\n')
+    draft.process_lines()
+
+    with pytest.raises(ValueError):
+        draft.apply_edit(-1, 0, 'Z')
+
+    with pytest.raises(ValueError):
+        draft.apply_edit(5, 2, 'Z')
+
+    assert draft._draft_lyrics == '[Verse]\na\nb\n'
+
+def test_draft_apply_edit_past_the_end_appends():
+    """A range past the last line is moved to the end of the draft."""
+
+    draft = Draft('[Verse]\na\nb\n')
+    draft.process_lines()
+
+    draft.apply_edit(100, 100, 'c')
+
+    assert draft._draft_lyrics == '[Verse]\na\nb\nc\n'
+    assert draft.to_marke37() == Draft('[Verse]\na\nb\nc\n').to_marke37()
+
+def test_draft_apply_edit_updates_only_the_edited_section():
+    """The other sections keep their processed text."""
+
+    draft = Draft('[Verse]\nLine 1\n\n[Chorus]\nChorus line')
+    draft.to_marke37()
+    chorus = draft._sections['Chorus1']
+    chorus_text = chorus._inner_text
+
+    draft.apply_edit(1, 2, 'Edited line 1\nAnd a new one')
+
+    assert draft.to_marke37() == 'Edited line 1\nAnd a new one\n\n**Chorus line**'
+    assert draft._sections['Chorus1'] is chorus
+    assert chorus._inner_text is chorus_text
+    assert chorus.lines[1].draft_line_number == 6
+
+def test_draft_apply_edit_clones_repeat_again():
+    """Editing a section updates the sections repeating it."""
+
+    draft = Draft()
+    draft.add_file(os.path.dirname(__file__)+'/example_drafts/chorusr_then_2r.e37')
+    draft.to_marke37()
+
+    # Row 1 is 'This is the first line' of the chorus.
+    draft.apply_edit(1, 2, 'This is the edited line')
+
+    expected = get_expected_output('chorusr_then_2r.me37').replace(
+        'This is the first line', 'This is the edited line')
+
+    assert draft.to_marke37() == expected
+
+def test_draft_repeat_shares_lines_with_target():
+    """The lines of a repeat are the ones parsed for the target."""
+
+    draft = Draft('[Chorus]\nChorus line\n\n[ChorusR]')
+    draft.to_marke37()
+
+    chorus = draft._sections['Chorus1']
+    repeat = draft._sections['Chorus2']
+
+    assert repeat.lines[1] is chorus.lines[1]
+    assert repeat._get_inner_text() is chorus._get_inner_text()
+
+def test_draft_toggle_comment_comments_block():
+    """The lines are commented, leaving the empty ones out."""
+
+    draft = Draft('[Verse]\nA 05 Line one\n\nLine two\nX-Already commented\n[Chorus]\nChorus line')
+    draft.to_marke37()
+    verse = draft._sections['Verse1']
+
+    edits = draft.toggle_comment(1, 5)
+
+    assert edits == [
+        TextEdit(1, 'A 05 Line one', 'A-05 Line one'),
+        TextEdit(3, 'Line two', '--Line two'),
+    ]
+    assert draft.to_marke37() == '**Chorus line**'
+    assert draft._sections['Verse1'] is verse
+
+def test_draft_toggle_comment_uncomments_commented_block():
+    """If every line is a comment, they are all uncommented."""
+
+    draft = Draft('[Verse]\nA-05 Line one\n--Line two\n')
+    draft.to_marke37()
+
+    edits = draft.toggle_comment(1, 3)
+
+    assert [edit.new for edit in edits] == ['A 05 Line one', 'Line two']
+    assert draft.to_marke37() == 'Line one\nLine two'
+
+def test_draft_toggle_comment_of_large_block_is_not_processed_again():
+    """Commenting a block of lyrics updates only its section."""
+
+    lines = ['[Verse]'] + ['A 07 Line number %d' % number for number in range(2000)] + ['[Chorus]', 'Chorus line']
+    draft = Draft('\n'.join(lines))
+    draft.to_marke37()
+    chorus = draft._sections['Chorus1']
+
+    edits = draft.toggle_comment(1, 2001)
+
+    assert len(edits) == 2000
+    assert draft._sections['Chorus1'] is chorus
+    assert draft.to_marke37() == Draft(draft._draft_lyrics).to_marke37() == '**Chorus line**'
+
+def test_draft_toggle_comment_of_instruction_changes_sections():
+    """Commenting an instruction removes its section."""
+
+    draft = Draft('[Verse]\nLine one\n[Chorus]\nChorus line')
+    draft.to_marke37()
+
+    draft.toggle_comment(2, 3)
+
+    assert draft.to_marke37() == 'Line one\nChorus line'
+    assert list(draft._sections) == ['Unassigned1', 'Verse1']
+
+def test_draft_scaffold_counts_of_section():
+    """The lyrics of the section get the count placeholder."""
+
+    draft = Draft('[Verse]\nLine one\nB Line two\n\nC 07 Has count\n[Chorus]\nChorus line')
+
+    edits = draft.scaffold_counts('Verse1')
+
+    assert edits == [
+        TextEdit(1, 'Line one', 'X __ Line one'),
+        TextEdit(2, 'B Line two', 'B __ Line two'),
+    ]
+    assert draft.to_marke37() == 'Line one\nLine two\nHas count\n\n**Chorus line**'
+    assert draft._sections['Verse1'].declared_syllables == 7
+    assert draft.scaffold_counts(draft._sections['Verse1']) == []
+
+def test_draft_apply_edit_with_new_instruction_processes_again():
+    """Adding an instruction creates the new section."""
+
+    draft = Draft('[Verse]\nLine 1\nLine 2')
+    draft.to_marke37()
+
+    draft.apply_edit(2, 2, '[Chorus]')
+
+    assert draft.to_marke37() == 'Line 1\n\n**Line 2**'
+    assert list(draft._sections) == ['Unassigned1', 'Verse1', 'Chorus1']
+
+def test_draft_apply_edit_with_new_instruction_keeps_other_sections():
+    """Only the edited section is split; the next ones are numbered again."""
+
+    draft = Draft('[Verse]\nLine 1\nLine 2\n[Chorus]\nChorus line\n[Verse]\nLine 3\n[ChorusR]')
+    draft.to_marke37()
+    chorus = draft._sections['Chorus1']
+    verse = draft._sections['Verse2']
+
+    draft.apply_edit(2, 2, '[Verse]')
+
+    assert list(draft._sections) == ['Unassigned1', 'Verse1', 'Verse2', 'Chorus1', 'Verse3', 'Chorus2']
+    assert draft._sections['Chorus1'] is chorus
+    assert draft._sections['Verse3'] is verse
+    assert verse.lines[1].draft_line_number == 8
+    assert draft.to_marke37() == Draft(draft._draft_lyrics).to_marke37()
+
+def test_draft_apply_edit_removing_instruction_updates_repeats():
+    """The repeats of the merged sections repeat the new ones."""
+
+    draft = Draft('[Chorus]\nFirst\n[Chorus]\nSecond\n[Chorus2R]\n[Chorus3R]')
+    draft.to_marke37()
+
+    draft.apply_edit(2, 3, '')
+
+    expected = Draft('[Chorus]\nFirst\nSecond\n[Chorus2R]\n[Chorus3R]')
+
+    assert draft.to_marke37() == expected.to_marke37() == '**First\nSecond**\n\n**First\nSecond**\n\n**First\nSecond**'
+    assert list(draft._sections) == list(expected._sections)
+
+def test_draft_apply_edit_keeps_section_of_equivalent_instruction():
+    """Fixing an instruction that yields the same section keeps it."""
+
+    draft = Draft('[Chorus\nLine 1')
+    draft.to_marke37()
+    chorus = draft._sections['Chorus1']
+
+    draft.apply_edit(0, 1, '[Chorus]')
+
+    assert draft._sections['Chorus1'] is chorus
+    assert chorus.lines[0]._original_text == '[Chorus]'
+
+def test_draft_apply_edit_after_end_of_lyrics_changes_only_text():
+    """Lines below the end of lyrics are not processed."""
+
+    draft = Draft('[Verse]\nLine 1\n*****\nNotes')
+    draft.to_marke37()
+
+    draft.apply_edit(3, 4, '[Chorus]\nMore notes')
+
+    assert draft.to_marke37() == 'Line 1'
+    assert draft._draft_lyrics == '[Verse]\nLine 1\n*****\n[Chorus]\nMore notes\n'
+
+def test_draft_apply_edit_matches_a_new_draft():
+    """A sequence of edits yields the same sections as a new draft."""
+
+    lines = get_expected_output('all_sections.e37').splitlines()
+    draft = Draft('\n'.join(lines))
+    draft.to_marke37()
+
+    edits = [
+        (20, 21, ['X 08 Edited verse line']),
+        (5, 5, ['New title candidate', '']),
+        (40, 42, []),
+        (10, 11, ['[Chorus]']),
+        (70, 70, ['*****']),
+    ]
+    for start, end, new_lines in edits:
+        draft.apply_edit(start, end, ''.join(line + '\n' for line in new_lines))
+        lines[start:end] = new_lines
+
+    expected = Draft('\n'.join(lines))
+
+    assert draft._draft_lyrics == expected._draft_lyrics
+    assert draft.to_marke37() == expected.to_marke37()
+    assert list(draft._sections) == list(expected._sections)
+
+###########################################################
+##### Draft reads and processes streams               #####
+###########################################################
+
+class CountingStream(io.StringIO):
+    """Stream that counts the characters read."""
+
+    def __init__(self, text):
+        super().__init__(text)
+        self.characters_read = 0
+
+    def read(self, size = -1):
+        chunk = super().read(size)
+        self.characters_read += len(chunk)
+
+        return chunk
+
+@pytest.mark.parametrize('filename', [
+    'all_sections.e37',
+    'chorusr_then_2r.e37',
+    'empty_sections.e37',
+    'whitespace.e37',
+])
+def test_draft_from_stream_matches_draft_from_file(filename):
+    """Reading in small chunks yields the same output as reading at once."""
+
+    text = get_expected_output(filename)
+
+    draft = Draft.from_stream(io.StringIO(text), chunk_size = 7)
+
+    assert draft.to_marke37() == Draft(text).to_marke37()
+
+def test_draft_from_stream_stops_at_end_of_lyrics():
+    """The lines below the end of lyrics are not read."""
+
+    text = '[Verse]\nLine 1\n*****\n' + 'Scratch notes\n' * 10000
+    stream = CountingStream(text)
+
+    draft = Draft.from_stream(stream, chunk_size = 64)
+
+    assert draft.to_marke37() == 'Line 1'
+    assert stream.characters_read <= 64
+    assert draft._stream is None
+
+def test_draft_iter_sections_yields_sections_in_order():
+    """Each section is yielded once the next one starts."""
+
+    stream = io.StringIO('Unassigned\n[Verse]\nLine 1\n[Chorus]\nLine 2\n')
+    draft = Draft.from_stream(stream, chunk_size = 4)
+
+    sections = draft.iter_sections()
+
+    assert next(sections).type == Section.TYPE_UNASSIGNED
+    # The chorus is still being read.
+    assert next(sections).type == Section.TYPE_VERSE
+    assert 'Chorus1' in draft._sections
+    assert stream.tell() < len(stream.getvalue())
+
+    assert next(sections).type == Section.TYPE_CHORUS
+    assert list(sections) == []
+    assert draft.to_marke37() == 'Line 1\n\n**Line 2**'
+
+def test_draft_iter_sections_yields_repeats_with_their_lines():
+    """A repeat of an earlier section has its lines once yielded."""
+
+    stream = io.StringIO('[Chorus]\nla\n[ChorusR]\n[Verse]\nv\n')
+    draft = Draft.from_stream(stream, chunk_size = 4)
+
+    texts = [section.text.strip() for section in draft.iter_sections()]
+
+    assert texts == ['', '**la**', '**la**', 'v']
+
+def test_draft_resolves_repeats_after_abandoned_iteration():
+    """The repeats are resolved even if a prior iteration parsed every row."""
+
+    draft = Draft('[Chorus]\nla\n[ChorusR]\n')
+    sections = draft.iter_sections()
+    next(sections)
+    next(sections)
+    del sections
+
+    assert draft.to_marke37() == '**la**\n\n**la**'
+
+    draft = Draft('[Chorus2R]\n[Chorus]\nla\n[Verse]\n')
+    sections = draft.iter_sections()
+    next(sections)
+    next(sections)
+    next(sections)
+    del sections
+
+    assert draft.to_marke37() == '**la**\n\n**la**'
+
+def test_draft_updates_repeats_of_section_continued_by_abandoned_iteration():
+    """The lines added to a repeated section reach its repeats."""
+
+    draft = Draft('[Chorus2R]\n[Chorus]\nla\n')
+    draft.to_marke37()
+
+    draft.add_text('lo\n[Verse]\nv\n')
+    sections = draft.iter_sections()
+    next(sections)
+    del sections
+
+    assert draft.to_marke37() == '**la\nlo**\n\n**la\nlo**\n\nv'
+
+def test_draft_add_file_closes_the_file(monkeypatch):
+    """The file is closed after its text is added."""
+
+    opened = []
+    real_open = open
+
+    def tracking_open(*args, **kwargs):
+        f = real_open(*args, **kwargs)
+        opened.append(f)
+
+        return f
+
+    monkeypatch.setattr('builtins.open', tracking_open)
+
+    draft = Draft()
+    draft.add_file(os.path.dirname(__file__)+'/example_drafts/intro_verse.e37')
+
+    assert len(opened) == 1
+    assert opened[0].closed
+
+###########################################################
+##### Draft renders to a writer                       #####
+###########################################################
+
+def test_draft_render_to_file_object():
+    """Rendering to a file-like object writes the marke37 text."""
+
+    text = get_expected_output('all_sections.e37')
+    output = io.StringIO()
+
+    Draft(text).render_to(output)
+
+    assert output.getvalue() == get_expected_output('all_sections.me37')
+
+def test_draft_render_to_callable_writes_chunks():
+    """Rendering to a callable writes the sections in several chunks."""
+
+    chunks = []
+
+    Draft('[Chorus]\nLine 1\n[Verse]\nLine 2').render_to(chunks.append)
+
+    assert ''.join(chunks) == '**Line 1**\n\nLine 2'
+    assert len(chunks) > 1
+
+def test_draft_render_strips_leading_whitespace():
+    """As the full text used to be stripped, so is the first chunk."""
+
+    draft = Draft('[Title]\nA 00  Title with space')
+
+    assert draft.to_marke37() == 'Title with space\n' + '=' * 17
+
+###########################################################
+##### Draft reuses the sections rendered before       #####
+###########################################################
+
+def test_draft_renders_only_the_edited_section(monkeypatch):
+    """With a section cache, a new revision renders only what changed."""
+
+    monkeypatch.setattr(Draft, 'section_cache', RenderCache())
+
+    verses = []
+    for number in range(30):
+        verses.append('[Verse]\nVerse %d line 1\nVerse %d line 2\n' % (number, number))
+
+    first_revision = Draft(''.join(verses))
+    first_output = first_revision.to_marke37()
+
+    calls = []
+    extract_text = extractor.extract_text
+
+    def counting_extract_text(text, line_type):
+        calls.append(text)
+
+        return extract_text(text, line_type)
+
+    monkeypatch.setattr(extractor, 'extract_text', counting_extract_text)
+
+    verses[10] = '[Verse]\nVerse 10 edited line\nVerse 10 line 2\n'
+    second_revision = Draft(''.join(verses))
+
+    assert second_revision.to_marke37() == first_output.replace('Verse 10 line 1', 'Verse 10 edited line')
+    assert sorted(calls) == ['Verse 10 edited line', 'Verse 10 line 2', '[Verse]']
+    assert second_revision.word_count == first_revision.word_count
+    assert second_revision.line_count == first_revision.line_count
+
+def test_draft_section_cache_tells_repeats_apart(monkeypatch):
+    """A repeat is cached with the content it cloned."""
+
+    monkeypatch.setattr(Draft, 'section_cache', RenderCache())
+
+    Draft('[Chorus]\nFirst chorus\n[ChorusR]').to_marke37()
+
+    draft = Draft('[Chorus]\nSecond chorus\n[ChorusR]')
+
+    assert draft.to_marke37() == '**Second chorus**\n\n**Second chorus**'
+
+def test_draft_section_cache_is_kept_per_registry(monkeypatch):
+    """A section is rendered again once its type has another class."""
+
+    monkeypatch.setattr(Draft, 'section_cache', RenderCache())
+    text = '[Title]\nMy Song\n[Verse]\nHello there\n'
+
+    assert Draft(text).to_marke37() == 'My Song\n=======\n\nHello there'
+
+    registry = create_default_registry()
+    registry.register(Section.TYPE_TITLE, Verse)
+
+    draft = Draft(text)
+    draft.section_registry = registry
+
+    assert draft.to_marke37() == 'My Song\n\nHello there'
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+"""Tests for the `draft_stats` module."""
+
+import pytest
+
+from letrista.draft_stats import DraftStats, SectionStats, create_draft_stats
+from letrista.line import Line
+from letrista.section import Section
+
+###########################################################
+##### Stats are created from the sections             #####
+###########################################################
+
+def create_section(*texts):
+    """Creates a section with a line per text."""
+
+    section = Section()
+    for text in texts:
+        section.add_line(Line(text))
+
+    return section
+
+def test_stats_add_up_the_sections():
+    """The counts of the draft are the sum of the sections."""
+
+    sections = {
+        'Unassigned1': create_section('Line 1'),
+        'Unassigned2': create_section('Line 2', 'Three words here'),
+    }
+
+    stats = create_draft_stats(sections, {})
+
+    assert stats.word_count == 7
+    assert stats.line_count == 3
+    assert stats.sections == (
+        SectionStats('Unassigned1', Section.TYPE_UNASSIGNED, 2, 1),
+        SectionStats('Unassigned2', Section.TYPE_UNASSIGNED, 5, 2),
+    )
+    assert stats.section_types == {Section.TYPE_UNASSIGNED: 2}
+
+def test_stats_leave_out_line_types_with_no_lines():
+    """Only the line types with lines are in the histogram."""
+
+    stats = create_draft_stats({}, {Line.TYPE_LYRICS: 3, Line.TYPE_SKIP: 0})
+
+    assert stats.line_types == {Line.TYPE_LYRICS: 3}
+
+def test_stats_cannot_be_changed():
+    """Neither the fields nor the histograms can be set."""
+
+    stats = create_draft_stats({'Unassigned1': create_section('Line 1')}, {Line.TYPE_LYRICS: 1})
+
+    assert isinstance(stats, DraftStats)
+
+    with pytest.raises(AttributeError):
+        stats.word_count = 10
+
+    with pytest.raises(TypeError):
+        stats.line_types[Line.TYPE_LYRICS] = 10
+
+    with pytest.raises(TypeError):
+        stats.section_types[Section.TYPE_VERSE] = 1
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+"""Tests for the `editable_draft` module."""
+
+import pytest
+
+from letrista.draft import Draft
+from letrista.editable_draft import EditableDraft, EditDelta
+from letrista.editable_line import EditableLine
+
+DRAFT_TEXT = '[Verse]\nA 05 Line one\nLine two\n\n[Chorus]\nChorus line\n\n[ChorusR]\n'
+
+###########################################################
+##### Lines are owned by the draft                    #####
+###########################################################
+
+def test_editable_draft_lines_are_editable():
+    """The lines are `EditableLine`, the same ones in the sections."""
+
+    draft = EditableDraft(DRAFT_TEXT)
+    draft.to_marke37()
+
+    assert all(isinstance(line, EditableLine) for line in draft.lines)
+    assert draft._sections['Verse1'].lines[1] is draft.lines[1]
+    assert draft._sections['Chorus2'].lines[1] is draft.lines[5]
+
+def test_editing_a_line_updates_the_draft():
+    """Commenting a line changes the text, sections and stats."""
+
+    draft = EditableDraft(DRAFT_TEXT)
+    draft.to_marke37()
+    verse = draft._sections['Verse1']
+
+    draft.lines[1].comment()
+
+    assert draft._draft_lyrics == DRAFT_TEXT.replace('A 05 Line one', 'A-05 Line one')
+    assert draft.to_marke37() == 'Line two\n\n**Chorus line**\n\n**Chorus line**'
+    assert draft._sections['Verse1'] is verse
+    assert draft.word_count == 6
+
+def test_editing_a_repeated_line_updates_the_repeats():
+    """The repeats show the change of the line they share."""
+
+    draft = EditableDraft(DRAFT_TEXT)
+    draft.to_marke37()
+
+    draft._sections['Chorus2'].lines[1].add_syllable_count()
+
+    assert draft.lines[5].text == 'Chorus line'
+    assert draft.lines[5]._original_text == 'X __ Chorus line'
+    assert draft._sections['Chorus2'].declared_syllables == 0
+
+def test_editing_an_instruction_processes_the_draft_again():
+    """Commenting an instruction removes its section."""
+
+    draft = EditableDraft(DRAFT_TEXT)
+    draft.to_marke37()
+
+    draft.lines[4].comment()
+
+    assert draft.to_marke37() == Draft(draft._draft_lyrics).to_marke37()
+    assert 'Chorus2' not in draft._sections
+
+def test_lines_are_kept_when_rows_above_change():
+    """The objects below an edit are kept, with their new number."""
+
+    draft = EditableDraft(DRAFT_TEXT)
+    line = draft.lines[5]
+
+    draft.apply_edit(1, 1, 'New line\nAnother one')
+
+    assert draft.lines[7] is line
+    assert line.draft_line_number == 8
+
+    line.comment()
+
+    assert draft.line_table.text(7) == '--Chorus line'
+
+def test_lines_after_end_of_lyrics_are_renumbered():
+    """The lines held by no section get their new number as well."""
+
+    draft = EditableDraft('[Verse]\nLine one\n*****\nA note\n')
+    note = draft.lines[3]
+
+    draft.apply_edit(1, 1, 'New line')
+
+    assert note.draft_line_number == 5
+
+    # Ending the lyrics earlier leaves lines out of the sections.
+    line = draft.lines[2]
+    draft.apply_edit(1, 1, '*****')
+
+    assert line.draft_line_number == 4
+    assert note.draft_line_number == 6
+
+    line.comment()
+
+    assert draft.line_table.text(3) == '--Line one'
+
+def test_removed_lines_are_no_longer_listened():
+    """Editing a line removed from the draft does not change it."""
+
+    draft = EditableDraft(DRAFT_TEXT)
+    line = draft.lines[2]
+
+    draft.apply_edit(2, 3, '')
+    line.comment()
+
+    assert draft._draft_lyrics == DRAFT_TEXT.replace('Line two\n', '')
+
+###########################################################
+##### Edits can be undone                             #####
+###########################################################
+
+def test_edits_are_recorded():
+    """Each edit is a delta with the text before and after it."""
+
+    draft = EditableDraft(DRAFT_TEXT)
+
+    draft.lines[2].comment()
+    draft.apply_edit(3, 3, 'New line')
+
+    assert draft._undo_deltas == [
+        EditDelta(2, 'Line two\n', '--Line two\n', 1, 1),
+        EditDelta(3, '', 'New line\n', 0, 1),
+    ]
+
+def test_edits_past_the_end_are_recorded_at_the_end():
+    """An edit past the last line is recorded where it was applied."""
+
+    draft = EditableDraft(DRAFT_TEXT)
+
+    draft.apply_edit(100, 100, 'New line')
+
+    assert draft._undo_deltas == [EditDelta(8, '', 'New line\n', 0, 1)]
+
+    with pytest.raises(ValueError):
+        draft.apply_edit(-1, 0, 'Z')
+
+    draft.undo()
+
+    assert draft._draft_lyrics == DRAFT_TEXT
+
+def test_undo_and_redo():
+    """The edits are reverted, and applied again."""
+
+    draft = EditableDraft(DRAFT_TEXT)
+    draft.to_marke37()
+
+    draft.toggle_comment(1, 3)
+    draft.apply_edit(5, 6, 'Edited chorus')
+    edited_text = draft.to_marke37()
+
+    assert draft.undo().new_text == 'Edited chorus\n'
+    assert draft.undo().line == 1
+    assert draft.undo() is None
+    assert draft._draft_lyrics == DRAFT_TEXT
+    assert draft.to_marke37() == Draft(DRAFT_TEXT).to_marke37()
+
+    draft.redo()
+    draft.redo()
+
+    assert draft.can_redo is False
+    assert draft.to_marke37() == edited_text
+
+def test_new_edit_drops_the_undone_ones():
+    """After an edit, the undone edits cannot be applied again."""
+
+    draft = EditableDraft(DRAFT_TEXT)
+
+    draft.lines[1].comment()
+    draft.undo()
+
+    assert draft.can_redo is True
+
+    draft.lines[2].comment()
+
+    assert draft.can_redo is False
+    assert draft.redo() is None
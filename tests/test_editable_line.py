@@ -277,3 +277,48 @@ def test_editable_line_does_not_add_count_to_instruction():
 
     line.add_syllable_count()
     assert line._original_text == '[Verse]'
+
+###########################################################
+##### Test the edits invalidate the calculated text   #####
+###########################################################
+
+def test_editable_line_comment_invalidates_text_and_word_count():
+    line = Line('Three words here')
+    assert line.text == 'Three words here'
+    assert line.word_count == 3
+    assert line.is_printable is True
+
+    line.comment()
+    assert line.text == ''
+    assert line.word_count == 0
+    assert line.is_printable is False
+
+    line.uncomment()
+    assert line.text == 'Three words here'
+    assert line.word_count == 3
+    assert line.is_printable is True
+
+def test_editable_line_toggle_comment_invalidates_text():
+    line = Line('A Lyrics line')
+    assert line.text == 'Lyrics line'
+
+    line.toggle_comment()
+    assert line.text == ''
+
+    line.toggle_comment()
+    assert line.text == 'Lyrics line'
+
+def test_editable_line_add_syllable_count_invalidates_text():
+    line = Line('A simple line')
+    assert line.text == 'simple line'
+    assert line.word_count == 2
+
+    line.add_syllable_count()
+    assert line.type == Line.TYPE_COUNT
+    assert line._original_text == 'A __ simple line'
+    assert line.text == 'simple line'
+    assert line.word_count == 2
+
+    line.comment()
+    assert line.text == ''
+    assert line.word_count == 0
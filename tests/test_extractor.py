@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+"""Tests for the `extractor` module."""
+
+import pytest
+
+from letrista import extractor
+from letrista.line import Line
+
+###########################################################
+##### Extractor yields the printable text             #####
+###########################################################
+
+@pytest.mark.parametrize('line_type', [
+    Line.TYPE_UNSET,
+    Line.TYPE_SKIP,
+    Line.TYPE_COMMENT,
+    Line.TYPE_IGNORED,
+    Line.TYPE_INSTRUCTION,
+    Line.TYPE_END,
+])
+def test_non_printable_types_yield_no_text(line_type):
+    """Only count, schema and lyrics lines have text."""
+
+    assert extractor.extract_text('A 00 Some text', line_type) == ''
+
+def test_count_prefix_is_removed():
+    """The first five characters of a count line are cut."""
+
+    assert extractor.extract_text('A 00 Some text', Line.TYPE_COUNT) == 'Some text'
+
+def test_schema_prefix_is_removed():
+    """The first two characters of a schema line are cut."""
+
+    assert extractor.extract_text('A Some text', Line.TYPE_SCHEMA) == 'Some text'
+
+def test_text_without_markers_is_kept():
+    """The fast path returns the text as is."""
+
+    assert extractor.extract_text('  Some text  ', Line.TYPE_LYRICS) == 'Some text'
+
+def test_comment_is_searched_after_the_prefix():
+    """A comment symbol within the prefix does not cut the text."""
+
+    assert extractor.extract_text('A --Some text', Line.TYPE_SCHEMA) == ''
+    assert extractor.extract_text('X-- Text', Line.TYPE_LYRICS) == 'X'
+
+def test_text_after_hats_is_not_trimmed():
+    """The text is trimmed before the hats are removed, not after."""
+
+    assert extractor.extract_text('Inner ^A', Line.TYPE_LYRICS) == 'Inner '
+
+def test_hats_and_comments_are_removed_together():
+    """Hats before the comment are removed; the ones after are not seen."""
+
+    text = 'A 00 Inner^A rhyme^07 here -- and^B comment'
+
+    assert extractor.extract_text(text, Line.TYPE_COUNT) == 'Inner rhyme here'
+
+def test_hat_marker_ends_on_uppercase_letter():
+    """After a hat, the next uppercase letter closes the marker."""
+
+    assert extractor.extract_text('inner^a rhyme Here', Line.TYPE_LYRICS) == 'innera rhyme ere'
+
+def test_long_line_is_processed():
+    """A long line yields the same text as the short one, repeated."""
+
+    text = 'inner^A rhyme ' * 10000
+
+    assert extractor.extract_text(text, Line.TYPE_LYRICS) == ('inner rhyme ' * 10000).strip()
+
+###########################################################
+##### Extractor reads the marks of the line           #####
+###########################################################
+
+def test_prosody_of_count_line():
+    """Count lines have rhyme letter and syllable count."""
+
+    prosody = extractor.extract_prosody('A 07 Some text', Line.TYPE_COUNT)
+
+    assert prosody == extractor.Prosody('A', 7, ())
+
+@pytest.mark.parametrize('marker', ['__', 'xx', 'XX'])
+def test_prosody_of_undetermined_count(marker):
+    """The placeholders of the count are not a number."""
+
+    prosody = extractor.extract_prosody('A ' + marker + ' Some text', Line.TYPE_COUNT)
+
+    assert prosody.rhyme_letter == 'A'
+    assert prosody.declared_count is None
+
+def test_prosody_of_schema_line():
+    """Schema lines have rhyme letter, but no count."""
+
+    prosody = extractor.extract_prosody('  B Some text', Line.TYPE_SCHEMA)
+
+    assert prosody == extractor.Prosody('B', None, ())
+
+def test_prosody_of_non_printable_line():
+    """Lines that print nothing have no marks."""
+
+    assert extractor.extract_prosody('A-07 Text^A', Line.TYPE_COMMENT) == extractor.Prosody('', None, ())
+
+def test_prosody_hats_are_positions_in_original_text():
+    """The hats are found after the prefix and before the comment."""
+
+    text = ' A 00 Inner^A rhyme^07 here -- and^B comment'
+    prosody = extractor.extract_prosody(text, Line.TYPE_COUNT)
+
+    assert prosody.hat_positions == (11, 19)
+    assert [text[position] for position in prosody.hat_positions] == ['^', '^']
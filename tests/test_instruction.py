@@ -5,6 +5,7 @@
 import pytest
 
 from letrista.instruction import Instruction
+from letrista.section_registry import ParsedInstruction
 from letrista.section import Section
 from letrista.verse import Verse
 from letrista.chorus import Chorus
@@ -265,3 +266,36 @@ def test_section_id_to_be_repeated_is_correct_with_spanish_coro_with_number_2():
     ins = Instruction('[Coro2R]')
 
     assert ins.section_to_repeat == 'Chorus2'
+
+def test_repeat_ordinal_is_the_number_in_the_instruction():
+    """The number of the section to repeat, as an integer."""
+
+    assert Instruction('[Coro2R]').repeat_ordinal == 2
+    assert Instruction('[Verso 12R]').repeat_ordinal == 12
+
+def test_repeat_ordinal_defaults_to_first_section():
+    """Without a number (or with zero), the first section is repeated."""
+
+    assert Instruction('[ChorusR]').repeat_ordinal == 1
+    assert Instruction('[Chorus0R]').repeat_ordinal == 1
+
+def test_section_to_repeat_is_calculated_once():
+    """The id is kept after the first request."""
+
+    ins = Instruction('[Chorus2R]')
+
+    assert ins.section_to_repeat is ins.section_to_repeat
+
+def test_same_instruction_text_is_parsed_once():
+    """The parsing of a text is reused by other instructions."""
+
+    first = Instruction('[Coro 3R]')
+    second = Instruction('[Coro 3R]')
+
+    assert second._parsed is first._parsed
+    assert first._parsed == ParsedInstruction(Section.TYPE_CHORUS, True, 3)
+
+def test_create_section_defaults_to_verse():
+    """An unknown identifier creates a verse."""
+
+    assert Instruction('[Hook]').create_section().type == Section.TYPE_VERSE
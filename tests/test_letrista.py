@@ -2,12 +2,18 @@
 
 """Tests for `letrista` package."""
 
+import json
+import os
+import subprocess
+import sys
+
 import pytest
 
 from click.testing import CliRunner
 
 from letrista import letrista
 from letrista import cli
+from letrista.draft import Draft
 
 
 @pytest.fixture
@@ -31,7 +37,114 @@ def test_command_line_interface():
     runner = CliRunner()
     result = runner.invoke(cli.main)
     assert result.exit_code == 0
-    assert 'letrista.cli.main' in result.output
+    assert 'render' in result.output
     help_result = runner.invoke(cli.main, ['--help'])
     assert help_result.exit_code == 0
     assert '--help  Show this message and exit.' in help_result.output
+
+###########################################################
+##### Rendering drafts from the command line          #####
+###########################################################
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_render_writes_the_drafts_in_order(jobs, example_drafts, expected_text):
+    """Each draft is written to the standard output, in the order given."""
+
+    names = ['chorus_r.e37', 'all_sections.e37', 'no_chorus_r.e37']
+
+    result = CliRunner().invoke(cli.main, ['render', '-j', jobs] + [example_drafts + name for name in names])
+
+    assert result.exit_code == 0
+    assert result.output == ''.join(expected_text(name) + '\n' for name in names)
+
+def test_render_reads_the_standard_input(example_drafts):
+    """The path '-' stands for the standard input."""
+
+    with open(example_drafts + 'chorus_r.e37') as f:
+        text = f.read()
+
+    result = CliRunner().invoke(cli.main, ['render', '-'], input = text)
+
+    assert result.exit_code == 0
+    assert result.output == Draft(text).to_marke37() + '\n'
+
+def test_render_writes_a_directory_to_the_output_dir(tmp_path):
+    """The drafts of a directory are written with the same relative path."""
+
+    source = tmp_path / 'drafts'
+    (source / 'album').mkdir(parents = True)
+    (source / 'album' / 'song.e37').write_text('[Chorus]\nLine 1\n')
+    (source / 'other.e37').write_text('[Verse]\nLine 2\n')
+    (source / 'notes.txt').write_text('Not a draft')
+
+    result = CliRunner().invoke(cli.main, ['render', '-j', '2', '-o', str(tmp_path / 'out'), str(source)])
+
+    assert result.exit_code == 0
+    assert result.output == ''
+    assert (tmp_path / 'out' / 'album' / 'song.me37').read_text() == Draft('[Chorus]\nLine 1\n').to_marke37()
+    assert (tmp_path / 'out' / 'other.me37').read_text() == Draft('[Verse]\nLine 2\n').to_marke37()
+    assert not (tmp_path / 'out' / 'notes.me37').exists()
+
+def test_render_refuses_drafts_with_the_same_output_path(tmp_path):
+    """Two files with the same name are not written over each other."""
+
+    for directory in ('a', 'b'):
+        (tmp_path / directory).mkdir()
+        (tmp_path / directory / 'song.e37').write_text('[Verse]\nLine from %s\n' % directory)
+
+    paths = [str(tmp_path / 'a' / 'song.e37'), str(tmp_path / 'b' / 'song.e37')]
+    result = CliRunner().invoke(cli.main, ['render', '-j', '1', '-o', str(tmp_path / 'out')] + paths)
+
+    assert result.exit_code == 2
+    assert "would both be written to 'song.me37'" in result.output
+    assert not (tmp_path / 'out').exists()
+
+def test_render_reads_and_writes_utf8_in_any_locale(tmp_path):
+    """The drafts are UTF-8, even if the locale uses another encoding."""
+
+    text = '[Verse]\nCanción de cuna\n'
+    (tmp_path / 'song.e37').write_bytes(text.encode('utf-8'))
+
+    # With the C locale (and no UTF-8 mode), the default encoding is ASCII.
+    env = dict(os.environ, LC_ALL = 'C', PYTHONUTF8 = '0')
+    command = [sys.executable, '-m', 'letrista.cli', 'render', '-j', '1', '-o', str(tmp_path / 'out'), str(tmp_path / 'song.e37')]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    completed = subprocess.run(command, cwd = root, env = env, stderr = subprocess.PIPE)
+
+    assert completed.returncode == 0, completed.stderr
+    assert (tmp_path / 'out' / 'song.me37').read_bytes() == Draft(text).to_marke37().encode('utf-8')
+
+def test_render_reports_errors_and_continues(tmp_path, example_drafts, expected_text):
+    """A missing draft is reported, and the rest are still rendered."""
+
+    missing = str(tmp_path / 'missing.e37')
+
+    result = CliRunner().invoke(cli.main, ['render', '-j', '1', missing, example_drafts + 'chorus_r.e37'])
+
+    assert result.exit_code == 1
+    assert 'missing.e37: FileNotFoundError' in result.output
+    assert expected_text('chorus_r.e37') in result.output
+
+def test_watch_once_renders_the_directory(tmp_path):
+    """With --once, the drafts are rendered and the command exits."""
+
+    (tmp_path / 'song.e37').write_text('[Verse]\nLine 1\n')
+
+    result = CliRunner().invoke(cli.main, ['watch', '--once', str(tmp_path)])
+
+    assert result.exit_code == 0
+    assert result.output == str(tmp_path / 'song.me37') + '\n'
+    assert (tmp_path / 'song.me37').read_text() == Draft('[Verse]\nLine 1\n').to_marke37()
+
+def test_bench_reports_json():
+    """The report of the benchmark is JSON."""
+
+    result = CliRunner().invoke(cli.main, ['bench', '-n', '100', '-r', '1', '-w', 'classify'])
+
+    assert result.exit_code == 0
+
+    report = json.loads(result.output)
+
+    assert [result['workload'] for result in report['results']] == ['classify']
+    assert report['results'][0]['lines'] == 100
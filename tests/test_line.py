@@ -4,6 +4,7 @@
 
 import pytest
 
+from letrista import extractor
 from letrista.line import Line
 
 
@@ -372,3 +373,51 @@ def test_last_cap_of_consecutive_hats_is_removed():
     line = Line('This is an inner^^^^^^^^^^A rhyme')
 
     assert line.text == 'This is an inner rhyme'
+
+###########################################################
+##### Test the text is calculated only once           #####
+###########################################################
+
+def test_line_text_is_extracted_once(monkeypatch):
+    """Text, word count and printable flag share one extraction."""
+
+    calls = []
+    extract_text = extractor.extract_text
+
+    def counting_extract_text(text, line_type):
+        calls.append(text)
+
+        return extract_text(text, line_type)
+
+    monkeypatch.setattr(extractor, 'extract_text', counting_extract_text)
+
+    line = Line('A 00 Three words here')
+
+    assert line.text == 'Three words here'
+    assert line.text == 'Three words here'
+    assert line.word_count == 3
+    assert line.is_printable is True
+    assert len(calls) == 1
+
+###########################################################
+##### Test the marks of the line are kept             #####
+###########################################################
+
+def test_line_has_rhyme_letter_count_and_hats():
+    """The marks removed from the text are available."""
+
+    line = Line('B 09 Inner^A rhyme')
+
+    assert line.text == 'Inner rhyme'
+    assert line.rhyme_letter == 'B'
+    assert line.declared_count == 9
+    assert line.hat_positions == (10,)
+
+def test_lyrics_line_has_no_marks():
+    """Plain lyrics have no rhyme letter nor count."""
+
+    line = Line('just lyrics')
+
+    assert line.rhyme_letter == ''
+    assert line.declared_count is None
+    assert line.hat_positions == ()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+"""Tests for `LineTable` class."""
+
+import pytest
+
+from letrista.draft import Draft
+from letrista.line import Line
+from letrista.line_table import LineTable
+
+def test_line_table_is_empty():
+    """An empty buffer has no rows."""
+
+    table = LineTable()
+
+    assert len(table) == 0
+
+def test_line_table_splits_like_splitlines():
+    """The rows are the same lines `str.splitlines` yields."""
+
+    buffer = 'Line 1\nLine 2\r\n\nLine 4\rLine 5'
+    table = LineTable(buffer)
+
+    assert [table.text(i) for i in range(len(table))] == buffer.splitlines()
+
+def test_line_table_types_are_lazy():
+    """The type of a row is calculated only when requested."""
+
+    table = LineTable('[Verse]\nA 00 Text\n')
+
+    assert list(table._types) == [Line.TYPE_UNSET, Line.TYPE_UNSET]
+    assert table.type(1) == Line.TYPE_COUNT
+    assert list(table._types) == [Line.TYPE_UNSET, Line.TYPE_COUNT]
+
+def test_line_table_creates_line_views():
+    """A row is returned as a `Line` with its number and type."""
+
+    table = LineTable('[Verse]\nA 00 Text\n')
+
+    line = table[1]
+
+    assert isinstance(line, Line)
+    assert line.draft_line_number == 2
+    assert line.type == Line.TYPE_COUNT
+    assert line.text == 'Text'
+
+def test_line_table_iterates_over_lines():
+    """Iterating yields the same lines as the draft."""
+
+    draft = Draft('[Verse]\nLine 1\n\nLine 3')
+
+    table_lines = [str(line) for line in draft.line_table]
+
+    assert table_lines == [str(line) for line in draft.lines]
+
+def test_line_table_appends_new_lines():
+    """Appending indexes the new lines only."""
+
+    table = LineTable('Line 1\n')
+    table.append('Line 2\nLine 3\n')
+
+    assert len(table) == 3
+    assert table.text(2) == 'Line 3'
+    assert table.buffer == 'Line 1\nLine 2\nLine 3\n'
+
+def test_line_table_append_completes_last_line():
+    """The last row is completed by the appended text."""
+
+    table = LineTable('Line\r')
+    table.append('\nMore text')
+
+    assert len(table) == 2
+    assert [table.text(0), table.text(1)] == ['Line', 'More text']
+
+def test_line_table_append_joins_a_split_line_break():
+    """A '\r' and '\n' appended apart are one line break, adding no row."""
+
+    table = LineTable('Line 1\r')
+    table.append('\n')
+
+    assert len(table) == 1
+    assert table.buffer == 'Line 1\r\n'
+
+    table.append('Line 2\r')
+    table.append('\nLine 3\n')
+
+    assert [table.text(index) for index in range(len(table))] == ['Line 1', 'Line 2', 'Line 3']
+    assert len(table) == len(LineTable(table.buffer))
+
+###########################################################
+##### The text is kept in chunks of whole lines       #####
+###########################################################
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """Makes the chunks small enough to have several in a short text."""
+
+    monkeypatch.setattr(LineTable, 'CHUNK_SIZE', 16)
+
+def test_line_table_splits_text_in_chunks_of_lines(small_chunks):
+    """A large text is split at the start of a line."""
+
+    buffer = ''.join('Line %d\n' % number for number in range(10))
+    table = LineTable(buffer)
+
+    assert len(table._chunks) > 1
+    assert all(chunk.endswith('\n') for chunk in table._chunks.values())
+    assert [table.text(i) for i in range(len(table))] == buffer.splitlines()
+    assert table.buffer == buffer
+
+def test_line_table_appends_only_rebuild_the_last_chunk(small_chunks):
+    """The chunks before the last one are kept as they are."""
+
+    table = LineTable('')
+    for number in range(10):
+        table.append('Line %d\n' % number)
+
+    first_chunk = table._chunks[table._row_chunks[0]]
+    table.append('Line 10\n')
+
+    assert table._chunks[table._row_chunks[0]] is first_chunk
+    assert table.text(10) == 'Line 10'
+
+def test_line_table_replaces_rows_across_chunks(small_chunks):
+    """Replacing rows from several chunks keeps the rest of the rows."""
+
+    lines = ['Line %d' % number for number in range(10)]
+    table = LineTable('\n'.join(lines) + '\n')
+    table.type(9)
+
+    table.replace(2, 7, 'New line\n')
+
+    assert [table.text(i) for i in range(len(table))] == lines[:2] + ['New line'] + lines[7:]
+    assert table._types[-1] == Line.TYPE_LYRICS
+    assert table.slice(1, 4) == 'Line 1\nNew line\nLine 7\n'
+
+def test_line_table_buffer_is_joined_once(small_chunks):
+    """The full text is kept until the table changes."""
+
+    table = LineTable('Line 1\nLine 2\nLine 3\n')
+
+    assert table.buffer is table.buffer
+
+    table.replace(0, 1, '')
+
+    assert table.buffer == 'Line 2\nLine 3\n'
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+"""Tests for `RenderCache` class."""
+
+import pytest
+
+from letrista.draft import Draft
+from letrista.render_cache import CachedRender, RenderCache
+from letrista.section import Section
+from letrista.section_registry import create_default_registry
+
+def entry(text):
+    """Creates an entry with the given text."""
+
+    return CachedRender(text, len(text.split()), 1)
+
+###########################################################
+##### Cache keeps and evicts entries                  #####
+###########################################################
+
+def test_cache_counts_hits_and_misses():
+    """Lookups are counted as hits or misses."""
+
+    cache = RenderCache()
+    key = RenderCache.key_for('Some text')
+
+    assert cache.get(key) is None
+    cache.put(key, entry('Some text'))
+    assert cache.get(key).text == 'Some text'
+
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+def test_cache_keys_depend_on_text():
+    """Different texts have different keys."""
+
+    assert RenderCache.key_for('Text 1') == RenderCache.key_for('Text 1')
+    assert RenderCache.key_for('Text 1') != RenderCache.key_for('Text 2')
+
+def test_cache_evicts_least_recently_used_entry():
+    """Once full, the entry used the longest ago is removed."""
+
+    cache = RenderCache(max_entries = 2)
+    cache.put('a', entry('A'))
+    cache.put('b', entry('B'))
+    cache.get('a')
+    cache.put('c', entry('C'))
+
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.evictions == 1
+
+def test_cache_evicts_by_bytes():
+    """The bytes of the texts are kept under the budget."""
+
+    big_text = 'x' * 1000
+    cache = RenderCache(max_bytes = 2500)
+
+    for key in ('a', 'b', 'c'):
+        cache.put(key, entry(big_text))
+
+    assert len(cache) == 2
+    assert cache.bytes <= 2500
+    assert cache.evictions == 1
+
+def test_cache_skips_entries_over_the_budget():
+    """An entry bigger than the whole budget is not cached."""
+
+    cache = RenderCache(max_bytes = 100)
+    cache.put('a', entry('x' * 1000))
+
+    assert len(cache) == 0
+    assert cache.bytes == 0
+
+###########################################################
+##### Draft uses the cache                            #####
+###########################################################
+
+def test_draft_uses_render_cache(monkeypatch):
+    """A draft with a text rendered before is not processed."""
+
+    cache = RenderCache()
+    monkeypatch.setattr(Draft, 'render_cache', cache)
+
+    text = '[Verse]\nLine 1\nLine 2'
+    first = Draft(text)
+    output = first.to_marke37()
+
+    second = Draft(text)
+
+    assert second.to_marke37() == output
+    assert second._sections is None
+    assert second.word_count == first.word_count
+    assert second.line_count == first.line_count
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+def test_draft_with_new_text_is_rendered_again():
+    """Adding text invalidates the cached render of the draft."""
+
+    draft = Draft('[Chorus]\nLine 1')
+    draft.render_cache = RenderCache()
+    draft.to_marke37()
+
+    draft.add_text('Line 2')
+
+    assert draft.to_marke37() == '**Line 1\nLine 2**'
+    assert draft.render_cache.misses == 2
+
+def test_draft_with_another_registry_is_rendered_again():
+    """The cached render of a draft is kept per section registry."""
+
+    cache = RenderCache()
+    text = '[Hook]\nla la'
+
+    plain = Draft(text)
+    plain.render_cache = cache
+
+    assert plain.to_marke37() == 'la la'
+
+    registry = create_default_registry()
+    registry.register('Hook', Section, ('Hook',), pre_section_text = '_', post_section_text = '_')
+
+    hook = Draft(text)
+    hook.render_cache = cache
+    hook.section_registry = registry
+
+    assert hook.to_marke37() == '_la la_'
+
+    # Registering changes the output of the same registry.
+    registry.register('Hook', Section, (), pre_section_text = '*', post_section_text = '*')
+
+    again = Draft(text)
+    again.render_cache = cache
+    again.section_registry = registry
+
+    assert again.to_marke37() == '*la la*'
+    assert cache.hits == 0
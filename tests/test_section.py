@@ -39,3 +39,103 @@ def test_section_has_right_word_count():
     section.add_line(l2)
 
     assert section.word_count == 4
+
+###########################################################
+##### Repeated sections share the lines               #####
+###########################################################
+
+def create_repeat():
+    """Creates a section with two lines, and another one repeating it."""
+
+    target = Section()
+    target.add_line(Line('[Verse]', draft_line_number = 1))
+    target.add_line(Line('Line 1', draft_line_number = 2))
+    target.add_line(Line('Line 2', draft_line_number = 3))
+
+    repeat = Section()
+    repeat.add_line(Line('[VerseR]', draft_line_number = 5))
+    repeat.clone(target, 5)
+
+    return target, repeat
+
+def test_clone_shares_the_lines():
+    """The printable lines of the target are the same objects."""
+
+    target, repeat = create_repeat()
+
+    assert len(repeat.lines) == 3
+    assert repeat.lines[1] is target.lines[1]
+    assert repeat.lines[2] is target.lines[2]
+
+def test_clone_without_lines_shares_the_text():
+    """A repeat adding no lines takes the text of the target."""
+
+    target, repeat = create_repeat()
+
+    assert repeat._get_inner_text() is target._get_inner_text()
+    assert repeat.word_count == 4
+    assert repeat.line_count == 2
+
+def test_clone_with_lines_adds_them_after_shared_ones():
+    """The lines of the repeat come after the shared ones."""
+
+    target, repeat = create_repeat()
+    repeat.add_line(Line('Line 3', draft_line_number = 6))
+
+    assert repeat._get_inner_text() == 'Line 1\nLine 2\nLine 3'
+    assert repeat.lines[3]._original_text == 'Line 3'
+
+def test_replacing_own_lines_keeps_sharing():
+    """Positions after the shared lines change only the repeat."""
+
+    target, repeat = create_repeat()
+    repeat.add_line(Line('Line 3', draft_line_number = 6))
+
+    repeat.replace_lines(3, 4, [Line('Edited 3', draft_line_number = 6)])
+
+    assert repeat.lines[1] is target.lines[1]
+    assert repeat._get_inner_text() == 'Line 1\nLine 2\nEdited 3'
+
+def test_replacing_shared_lines_copies_them():
+    """The target does not change when the repeat edits the shared lines."""
+
+    target, repeat = create_repeat()
+
+    repeat.replace_lines(1, 2, [Line('Edited 1', draft_line_number = 5)])
+
+    assert repeat.clone_source is None
+    assert repeat._get_inner_text() == 'Edited 1\nLine 2'
+    assert target._get_inner_text() == 'Line 1\nLine 2'
+    assert repeat.lines[2] is not target.lines[2]
+    assert repeat.lines[2].draft_line_number == 5
+
+###########################################################
+##### Sections add up the marks of the lines          #####
+###########################################################
+
+def test_section_declared_syllables_and_rhyme_scheme():
+    """The counts are added, and the rhyme letters joined."""
+
+    section = Section()
+    section.add_line(Line('X 07 The first line'))
+    section.add_line(Line('A 05 Rhymes with'))
+    section.add_line(Line(''))
+    section.add_line(Line('X __ Still no count'))
+    section.add_line(Line('A Another line'))
+    section.add_line(Line('no rhyme here'))
+
+    assert section.declared_syllables == 12
+    assert section.rhyme_scheme == 'XAXA' + Section.UNMARKED_RHYME
+
+def test_section_aggregates_are_calculated_again_after_adding_lines():
+    """Adding a line invalidates the aggregates."""
+
+    section = Section()
+    section.add_line(Line('A 05 Line one'))
+
+    assert section.rhyme_scheme == 'A'
+
+    section.add_line(Line('B 03 Line two'))
+
+    assert section.rhyme_scheme == 'AB'
+    assert section.declared_syllables == 8
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+"""Tests for the `section_registry` module."""
+
+import pytest
+
+from letrista.chorus import Chorus
+from letrista.draft import Draft
+from letrista.instruction import Instruction
+from letrista.section import Section
+from letrista.section_registry import SectionRegistry, create_default_registry
+from letrista.verse import Verse
+
+###########################################################
+##### Registry finds the type of the instructions     #####
+###########################################################
+
+def test_default_registry_knows_every_language():
+    """English and Spanish identifiers are registered."""
+
+    registry = create_default_registry()
+
+    assert registry.find_type('[Chorus2R]') == Section.TYPE_CHORUS
+    assert registry.find_type('[Coro]') == Section.TYPE_CHORUS
+    assert registry.find_type('[Pre-coro 2R]') == Section.TYPE_PRECHORUS
+    assert registry.find_type('[Título]') == Section.TYPE_TITLE
+    assert registry.find_type('[Hook]') is None
+    assert registry.find_type('Chorus') is None
+
+def test_types_registered_first_have_priority():
+    """The first type with a matching identifier wins."""
+
+    registry = SectionRegistry()
+    registry.register(Section.TYPE_PRECHORUS, Section, ('Pre',))
+    registry.register(Section.TYPE_CHORUS, Chorus, ('Pre', 'Chorus'))
+
+    assert registry.find_type('[Pre-chorus]') == Section.TYPE_PRECHORUS
+    assert registry.find_type('[Chorus]') == Section.TYPE_CHORUS
+
+def test_longest_identifier_of_higher_priority_wins():
+    """A longer identifier does not win over a type with more priority."""
+
+    registry = SectionRegistry()
+    registry.register(Section.TYPE_VERSE, Verse, ('Ver',))
+    registry.register(Section.TYPE_CHORUS, Chorus, ('Verse',))
+
+    assert registry.find_type('[Verse]') == Section.TYPE_VERSE
+
+def test_languages_are_loaded_on_first_parse():
+    """The language packs are not loaded when registered."""
+
+    loaded = []
+
+    def load_pack():
+        loaded.append('de')
+
+        return {Section.TYPE_CHORUS: ('Refrain',)}
+
+    registry = create_default_registry()
+    registry.register_language('de', load_pack)
+
+    assert loaded == []
+    assert registry.parse('[Refrain]').section_type == Section.TYPE_CHORUS
+    assert registry.parse('[Refrain2R]').section_type == Section.TYPE_CHORUS
+    assert loaded == ['de']
+
+def test_parse_results_are_dropped_when_registry_changes():
+    """A new identifier is found after being added."""
+
+    registry = create_default_registry()
+
+    assert registry.parse('[Estribillo]').section_type == Section.TYPE_VERSE
+
+    registry.add_identifiers(Section.TYPE_CHORUS, ('Estribillo',))
+
+    assert registry.parse('[Estribillo]').section_type == Section.TYPE_CHORUS
+
+def test_many_languages_are_registered():
+    """Every language pack is found."""
+
+    registry = create_default_registry()
+    for number in range(20):
+        registry.register_language('xx%d' % number, lambda number = number: {
+            Section.TYPE_CHORUS: ('Chorus%dx' % number,),
+            Section.TYPE_BRIDGE: ('Bridge%dx' % number,),
+        })
+
+    assert registry.find_type('[Bridge19x]') == Section.TYPE_BRIDGE
+    assert registry.find_type('[Chorus0x]') == Section.TYPE_CHORUS
+
+###########################################################
+##### Registry creates the sections                   #####
+###########################################################
+
+def test_registered_section_is_created_with_wrappers():
+    """A new type of section, with its own wrappers."""
+
+    registry = create_default_registry()
+    registry.register('Hook', Section, ('Hook', 'Gancho'), pre_section_text = '_', post_section_text = '_')
+
+    section = Instruction('[Gancho]', registry).create_section()
+
+    assert section.type == 'Hook'
+    assert section._pre_section_text == '_'
+    assert section._post_section_text == '_'
+
+def test_wrappers_replace_the_ones_of_the_class():
+    """Only the given wrappers are replaced."""
+
+    registry = create_default_registry()
+    registry.register(Section.TYPE_CHORUS, Chorus, pre_section_text = '> ')
+
+    section = registry.create_section(Section.TYPE_CHORUS)
+
+    assert isinstance(section, Chorus)
+    assert section._pre_section_text == '> '
+    assert section._post_section_text == '**'
+
+def test_unknown_type_creates_verse():
+    """A type that is not registered creates a verse."""
+
+    assert isinstance(create_default_registry().create_section('Hook'), Verse)
+
+def test_draft_uses_its_registry():
+    """The sections of a new type are counted and repeated."""
+
+    registry = create_default_registry()
+    registry.register('Hook', Section, ('Hook',), pre_section_text = '_', post_section_text = '_')
+
+    draft = Draft('[Hook]\nHey hey\n[HookR]\n')
+    draft.section_registry = registry
+
+    assert draft.to_marke37() == '_Hey hey_\n\n_Hey hey_'
+    assert list(draft._sections) == ['Unassigned1', 'Hook1', 'Hook2']
+
+def test_generation_changes_with_every_registration():
+    """No two states of the registries share a generation."""
+
+    registry = create_default_registry()
+    other = create_default_registry()
+    generation = registry.generation
+
+    assert other.generation != generation
+
+    registry.add_identifiers(Section.TYPE_CHORUS, ('Refrain',))
+
+    assert registry.generation not in (generation, other.generation)
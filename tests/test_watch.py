@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+
+"""Tests for the `watch` module."""
+
+import os
+
+import pytest
+
+from letrista import watch
+from letrista.draft import Draft
+
+def write_draft(path, text):
+    """Writes a draft, with a modification time different from the last one."""
+
+    stat = path.stat() if path.exists() else None
+    path.write_text(text)
+
+    # Some file systems keep the time in seconds: move it forward.
+    if stat is not None and path.stat().st_mtime_ns == stat.st_mtime_ns:
+        os.utime(str(path), ns = (stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+@pytest.fixture
+def drafts(tmp_path):
+    """A directory with two drafts (one in a subdirectory)."""
+
+    (tmp_path / 'album').mkdir()
+    write_draft(tmp_path / 'song.e37', '[Verse]\nLine 1\n')
+    write_draft(tmp_path / 'album' / 'other.e37', '[Chorus]\nLine 2\n')
+
+    return tmp_path
+
+def test_first_poll_renders_every_draft(drafts):
+    """The drafts are rendered next to them."""
+
+    watcher = watch.Watcher(str(drafts))
+    results = watcher.poll()
+
+    assert sorted(os.path.basename(result.output_path) for result in results) == ['other.me37', 'song.me37']
+    assert all(result.written and result.error is None for result in results)
+    assert (drafts / 'song.me37').read_text() == Draft('[Verse]\nLine 1\n').to_marke37()
+    assert len(watcher.manifest) == 2
+
+def test_poll_without_changes_renders_nothing(drafts):
+    """The drafts are not read if their time and size are the same."""
+
+    watcher = watch.Watcher(str(drafts))
+    watcher.poll()
+
+    assert watcher.poll() == []
+
+def test_poll_renders_only_the_changed_draft(drafts):
+    """Only the draft with a new content is rendered again."""
+
+    watcher = watch.Watcher(str(drafts))
+    watcher.poll()
+
+    write_draft(drafts / 'song.e37', '[Verse]\nLine 1 changed\n')
+    results = watcher.poll()
+
+    assert [result.path for result in results] == [str(drafts / 'song.e37')]
+    assert results[0].written
+    assert (drafts / 'song.me37').read_text() == Draft('[Verse]\nLine 1 changed\n').to_marke37()
+
+def test_same_content_is_not_rendered_again(drafts):
+    """Saving a draft with the same content only updates the manifest."""
+
+    watcher = watch.Watcher(str(drafts))
+    watcher.poll()
+
+    write_draft(drafts / 'song.e37', '[Verse]\nLine 1\n')
+
+    assert watcher.poll() == []
+
+def test_output_is_not_written_if_it_does_not_change(drafts):
+    """A change that renders to the same text leaves the output untouched."""
+
+    watcher = watch.Watcher(str(drafts))
+    watcher.poll()
+    output_stat = (drafts / 'song.me37').stat()
+
+    # The comment is not part of the rendered text.
+    write_draft(drafts / 'song.e37', '[Verse]\nLine 1 -- a comment\n')
+    results = watcher.poll()
+
+    assert len(results) == 1
+    assert not results[0].written
+    assert (drafts / 'song.me37').stat().st_mtime_ns == output_stat.st_mtime_ns
+
+def test_existing_outputs_are_kept_on_the_first_poll(drafts):
+    """Without a manifest, the outputs with the same text are not written."""
+
+    watch.Watcher(str(drafts)).poll()
+
+    results = watch.Watcher(str(drafts)).poll()
+
+    assert len(results) == 2
+    assert not any(result.written for result in results)
+
+def test_output_dir_keeps_the_relative_paths(drafts, tmp_path_factory):
+    """The outputs are written with the same path within the output dir."""
+
+    output_dir = tmp_path_factory.mktemp('out')
+    watch.Watcher(str(drafts), str(output_dir)).poll()
+
+    assert (output_dir / 'album' / 'other.me37').read_text() == Draft('[Chorus]\nLine 2\n').to_marke37()
+    assert not (drafts / 'song.me37').exists()
+
+def test_saved_manifest_is_used_after_a_restart(drafts, tmp_path_factory):
+    """The drafts of a saved manifest are not rendered again."""
+
+    manifest_path = str(tmp_path_factory.mktemp('state') / 'manifest.json')
+    watch.Watcher(str(drafts), manifest_path = manifest_path).poll()
+
+    watcher = watch.Watcher(str(drafts), manifest_path = manifest_path)
+
+    assert len(watcher.manifest) == 2
+    assert watcher.poll() == []
+
+def test_removed_drafts_leave_the_manifest(drafts):
+    """A removed draft is dropped from the manifest."""
+
+    watcher = watch.Watcher(str(drafts))
+    watcher.poll()
+
+    (drafts / 'song.e37').unlink()
+
+    assert watcher.poll() == []
+    assert list(watcher.manifest) == [str(drafts / 'album' / 'other.e37')]
+
+def test_several_workers_render_in_order(drafts):
+    """With several workers, the results keep the order of the drafts."""
+
+    for number in range(4):
+        write_draft(drafts / ('extra%d.e37' % number), '[Verse]\nLine %d\n' % number)
+
+    results = watch.Watcher(str(drafts), workers = 2).poll()
+
+    assert len(results) == 6
+    for result in results:
+        with open(result.path) as f:
+            with open(result.output_path) as output:
+                assert output.read() == Draft(f.read()).to_marke37()